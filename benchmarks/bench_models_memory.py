@@ -0,0 +1,91 @@
+"""
+Benchmark de memoria del modelo de héroes.
+
+Compara, para N héroes sintéticos:
+- legacy:  dataclasses con __dict__ (el modelo original).
+- slots:   dataclasses con slots=True (models.py actual).
+- compact: CompactHeroStore (stats en array('B'), categorías codificadas).
+
+Uso:
+    python benchmarks/bench_models_memory.py --sizes 10000,100000,1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models import Hero, PowerStats, Appearance, Biography
+from src.loader import hero_from_dict
+from src.compact import CompactHeroStore
+from src.synthetic import iter_payloads
+
+
+def _legacy_class(cls):
+    """Réplica sin slots de una dataclass del modelo (como era originalmente)."""
+    return make_dataclass(cls.__name__ + "Legacy", [(f.name, f.type) for f in fields(cls)])
+
+
+LegacyPowerStats = _legacy_class(PowerStats)
+LegacyAppearance = _legacy_class(Appearance)
+LegacyBiography = _legacy_class(Biography)
+LegacyHero = _legacy_class(Hero)
+
+
+def _to_legacy(hero: Hero):
+    ps, app, bio = hero.powerstats, hero.appearance, hero.biography
+    return LegacyHero(
+        hero.id, hero.name, hero.slug,
+        LegacyPowerStats(ps.intelligence, ps.strength, ps.speed, ps.durability, ps.power, ps.combat),
+        LegacyAppearance(app.gender, app.race, app.height, app.weight, app.eyeColor, app.hairColor),
+        LegacyBiography(bio.fullName, bio.alterEgos, bio.aliases, bio.placeOfBirth,
+                        bio.firstAppearance, bio.publisher, bio.alignment),
+        hero.images,
+    )
+
+
+def build(model: str, size: int):
+    heroes = (hero_from_dict(p) for p in iter_payloads(size, seed=42))
+    if model == "legacy":
+        return [_to_legacy(h) for h in heroes]
+    if model == "slots":
+        return list(heroes)
+    return CompactHeroStore.from_heroes(heroes)
+
+
+def measure(model: str, size: int):
+    """Memoria retenida (bytes) por la estructura final, medida con tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build(model, size)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--models", default="legacy,slots,compact")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    models = args.models.split(",")
+
+    print(f"{'modelo':<10}{'héroes':>10}{'MB':>10}{'bytes/héroe':>14}{'s':>8}")
+    for size in sizes:
+        for model in models:
+            retained, elapsed = measure(model, size)
+            print(f"{model:<10}{size:>10}{retained / 2**20:>10.1f}{retained / size:>14.0f}{elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
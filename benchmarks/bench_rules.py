@@ -0,0 +1,115 @@
+"""
+Benchmark del motor de reglas de validación.
+
+Compara, para N héroes sintéticos ya parseados (sin validar):
+- loop:       el Hero.validate_hero original (listas + .count() por objeto).
+- check:      Hero.validate_hero actual (RuleSet.check_hero compilado, un héroe cada vez).
+- check_hero: RuleSet.check_hero llamado directamente (sin el método de Hero).
+- vectorized: RuleSet.evaluate sobre el lote columnar (incluye construirlo).
+- table:      RuleSet.evaluate reutilizando las columnas de un HeroTable.
+
+Y, para los mismos N registros crudos (la ruta del loader):
+- records:    parseo registro a registro con RuleSet.check_record.
+- batched:    loader actual, lotes de PARSE_BATCH_SIZE con RuleSet.evaluate_records.
+
+Comprueba además que las variantes de cada grupo aceptan exactamente los mismos héroes.
+
+Uso:
+    python benchmarks/bench_rules.py --sizes 10000,100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.loader import _raw_stats, hero_from_dict, iter_parsed_records
+from src.rules import DEFAULT_RULES, RuleBatch
+from src.synthetic import iter_payloads
+from src.table import HeroTable
+
+
+def legacy_validate(hero) -> bool:
+    """Copia literal de las reglas de Hero.validate_hero antes del motor de reglas."""
+    pub = hero.biography.publisher
+    if not pub or pub.strip() != "Marvel Comics":
+        return False
+    stats = [
+        hero.powerstats.intelligence,
+        hero.powerstats.strength,
+        hero.powerstats.speed,
+        hero.powerstats.durability,
+        hero.powerstats.power,
+        hero.powerstats.combat
+    ]
+    if min(stats) <= 15:
+        return False
+    if stats.count(0) >= 3:
+        return False
+    if stats.count(100) >= 3:
+        return False
+    return True
+
+
+def per_record_parse(payloads):
+    """El loader antes de validar por lotes: check_record sobre cada registro."""
+    heroes = []
+    for item in payloads:
+        publisher = (item.get('biography') or {}).get('publisher', 'Unknown')
+        rule, stats = DEFAULT_RULES.check_record(publisher, lambda: _raw_stats(item))
+        if rule is None:
+            heroes.append(hero_from_dict(item, stats))
+    return heroes
+
+
+def timed(func, repeat: int):
+    """Mejor tiempo (s) de `repeat` ejecuciones y el último resultado."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'variante':<12}{'héroes':>10}{'ms':>10}{'x base':>9}{'válidos':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        payloads = list(iter_payloads(size, seed=42))
+        heroes = [hero_from_dict(p) for p in payloads]
+        table = HeroTable(heroes)
+
+        groups = [
+            {
+                "loop": lambda: np.array([legacy_validate(h) for h in heroes], dtype=bool),
+                "check": lambda: np.array([h.validate_hero() for h in heroes], dtype=bool),
+                "check_hero": lambda: np.array([DEFAULT_RULES.check_hero(h) is None for h in heroes], dtype=bool),
+                "vectorized": lambda: DEFAULT_RULES.evaluate(RuleBatch.from_heroes(heroes)).mask,
+                "table": lambda: DEFAULT_RULES.evaluate(RuleBatch.from_table(table)).mask,
+            },
+            {
+                "records": lambda: np.array([h.id for h in per_record_parse(payloads)]),
+                "batched": lambda: np.array([h.id for h in iter_parsed_records(payloads)]),
+            },
+        ]
+        for variants in groups:
+            baseline, expected = None, None
+            for name, func in variants.items():
+                elapsed, result = timed(func, args.repeat)
+                if expected is None:
+                    baseline, expected = elapsed, result
+                elif not np.array_equal(result, expected):
+                    raise SystemExit(f"❌ '{name}' no coincide con '{next(iter(variants))}'")
+                accepted = int(result.sum()) if result.dtype == bool else len(result)
+                print(f"{name:<12}{size:>10}{elapsed * 1000:>10.1f}{baseline / elapsed:>9.1f}{accepted:>9}")
+
+if __name__ == "__main__":
+    main()
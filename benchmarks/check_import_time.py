@@ -0,0 +1,98 @@
+"""
+Control de regresión del tiempo de importación.
+
+Importa cada punto de entrada en un intérprete nuevo con `python -X importtime`
+y comprueba dos cosas:
+- el tiempo acumulado de su import (mejor de --repeat) no supera su presupuesto;
+- no ha cargado dependencias pesadas que solo deberían cargarse al usarlas
+  (matplotlib al dibujar, requests en la primera petición, dotenv al leer
+  la configuración...).
+
+Termina con código 1 si algún punto de entrada incumple, para usarlo en CI.
+
+Uso:
+    python benchmarks/check_import_time.py
+    python benchmarks/check_import_time.py --scale 2   # presupuestos x2 (máquinas lentas)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Módulos que ningún punto de entrada debe cargar al importarse
+LAZY_EVERYWHERE = ("matplotlib", "requests", "dotenv")
+
+# punto de entrada -> (presupuesto en ms, módulos adicionales prohibidos)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "src.settings": (30, ("numpy",)),
+    "src.models": (30, ("numpy",)),
+    "src.search": (40, ("numpy",)),
+    "src.metrics": (30, ("numpy",)),
+    "src.api_marvel": (50, ("numpy",)),
+    "src.image_ai": (50, ("numpy",)),
+    "src.filters": (150, ("streamlit",)),
+    "src.loader": (180, ("streamlit", "pyarrow")),
+    "src.plots": (180, ("streamlit",)),
+    "src.columnar": (150, ("streamlit", "pyarrow")),
+    "src.cli": (250, ("streamlit", "pandas", "pyarrow")),
+    "src.analytics": (600, ("streamlit",)),
+    "src.ui": (700, ("pandas",)),
+}
+
+
+def measure(module: str, forbidden: Tuple[str, ...]) -> Tuple[float, List[str]]:
+    """(ms acumulados del import de `module`, módulos prohibidos que cargó)."""
+    code = (f"import sys, json; import {module}; "
+            f"print(json.dumps([m for m in {list(forbidden)!r} if m in sys.modules]))")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1]) / 1000
+    if cumulative is None:
+        raise RuntimeError(f"No se encontró {module} en la salida de -X importtime")
+    return cumulative, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplica todos los presupuestos")
+    parser.add_argument("--modules", help="lista separada por comas (por defecto, todos)")
+    args = parser.parse_args()
+
+    modules = args.modules.split(",") if args.modules else list(BUDGETS)
+    failures = []
+    print(f"{'módulo':<18}{'ms':>9}{'presupuesto':>13}  estado")
+    for module in modules:
+        budget, extra = BUDGETS[module]
+        budget *= args.scale
+        forbidden = LAZY_EVERYWHERE + extra
+        best, loaded = float("inf"), []
+        for _ in range(args.repeat):
+            elapsed, loaded = measure(module, forbidden)
+            best = min(best, elapsed)
+
+        problems = []
+        if best > budget:
+            problems.append("fuera de presupuesto")
+        if loaded:
+            problems.append(f"carga {', '.join(loaded)}")
+        status = "⚠️ " + "; ".join(problems) if problems else "✅"
+        print(f"{module:<18}{best:>9.1f}{budget:>13.0f}  {status}")
+        if problems:
+            failures.append(module)
+
+    if failures:
+        print(f"\n❌ {len(failures)} puntos de entrada incumplen: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
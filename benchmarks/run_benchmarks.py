@@ -0,0 +1,349 @@
+"""
+Suite de benchmarks de los caminos críticos, sobre datos sintéticos
+deterministas con la forma de SuperHero API (src/synthetic.py).
+
+Caminos medidos (tiempo = mejor de --repeat; memoria = pico de tracemalloc
+en una ejecución aparte):
+- parse:         loader._parse_and_filter_data sobre la lista de registros.
+- load_local:    load_heroes_local en streaming, sin snapshot.
+- load_snapshot: load_heroes_local leyendo el snapshot ya generado.
+- load_parquet / load_arrow: load_heroes_local sobre el dataset validado
+                 exportado con src/columnar.py (*_stats: solo id, nombre y stats).
+- table_build / name_index_build: estructuras derivadas del dataset.
+- rank:          filters.top_10_highest / lowest / balanced para las 6 stats
+                 (rank_table: lo mismo sobre la HeroTable, sin órdenes precalculados).
+- search:        search.search_hero (exactas, prefijos, erratas y fallos).
+- similar_build / similar_knn: similarity.SimilarityIndex (KD-tree por encima
+                 de BRUTE_FORCE_MAX) y 200 consultas de los 5 más parecidos.
+- plot_top / plot_radar: render sin caché de plots.top_heroes_image / hero_radar_image.
+- fetch_cN:      api_marvel.get_heroes_from_api contra src/mock_api.py con concurrencia N.
+
+rank / search / similar* / *_build usan todos los registros del volcado (sin validar),
+para que el tamaño signifique lo mismo en todos los caminos. Los caminos que
+necesitan todo en memoria se omiten por encima de --max-in-memory.
+
+Los volcados sintéticos se guardan en benchmarks/.data para reutilizarlos.
+
+Uso:
+    python benchmarks/run_benchmarks.py --sizes 1k,10k,100k --output results.json
+    python benchmarks/run_benchmarks.py --sizes 1k,10k --save-baseline
+    python benchmarks/run_benchmarks.py --sizes 1k,10k --baseline benchmarks/baseline.json --fail-on-regression
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+from src.api_marvel import FetchConfig, HeroFetcher, get_heroes_from_api
+from src.dataset import HeroDataset
+from src.filters import top_10_balanced, top_10_highest, top_10_lowest
+from src.columnar import write_columnar
+from src.loader import _parse_and_filter_data, iter_heroes_local, load_heroes_local
+from src.mock_api import MockSuperHeroAPI
+from src.models import STAT_FIELDS
+from src.plots import RenderCache, hero_radar_image, top_heroes_image
+from src.rules import RuleSet
+from src.search import normalize_name, search_hero
+from src.similarity import SimilarityIndex
+from src.synthetic import generate_payloads, parse_size, write_dump
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+ALL_PATHS = ("parse", "load_local", "load_snapshot", "columnar", "build", "rank", "search", "similar", "plot", "fetch")
+# Sin reglas: todos los registros pasan (dataset del tamaño pedido)
+NO_RULES = RuleSet(())
+
+
+def measure(func: Callable, repeat: int, memory: bool = True) -> Dict:
+    """Mejor tiempo de `repeat` ejecuciones y pico de memoria (MB) de una más."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    entry = {"seconds": best}
+    if memory:
+        del result
+        gc.collect()
+        tracemalloc.start()
+        result = func()
+        entry["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    entry["items"] = len(result) if hasattr(result, "__len__") else result
+    return entry
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silencia los prints de progreso del loader y del fetcher."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def dump_path(size: int, seed: int) -> str:
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"synthetic-{size}-s{seed}.json")
+    if not os.path.exists(path):
+        print(f"🧪 Generando volcado sintético de {size} héroes...")
+        write_dump(path + ".tmp", size, seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def search_queries(heroes, count: int = 200) -> List[str]:
+    """Mezcla determinista de búsquedas: exactas, prefijos, con errata y sin resultado."""
+    step = max(1, len(heroes) // count)
+    sample = [h.name for h in heroes[::step][:count]]
+    queries = []
+    for i, name in enumerate(sample):
+        kind = i % 4
+        if kind == 0:
+            queries.append(name)
+        elif kind == 1:
+            queries.append(name[:3])
+        elif kind == 2 and len(name) > 3:
+            queries.append(name[:2] + name[3] + name[2] + name[4:])
+        else:
+            queries.append(normalize_name(name)[::-1] + "zzq")
+    return queries
+
+
+def bench_size(size: int, args, paths: set) -> List[Dict]:
+    results = []
+
+    def record(name: str, func: Callable, memory: bool = True, repeat: Optional[int] = None):
+        with quiet():
+            entry = measure(func, repeat or args.repeat, memory)
+        entry.update(name=name, size=size)
+        results.append(entry)
+        print(f"   {name:<18}{size:>9}{entry['seconds'] * 1000:>11.1f}{entry.get('peak_mb', 0):>10.1f}{entry['items']:>9}")
+
+    path = dump_path(size, args.seed)
+    in_memory = size <= args.max_in_memory
+
+    if "parse" in paths and in_memory:
+        payloads = generate_payloads(size, args.seed)
+        record("parse", lambda: _parse_and_filter_data(payloads))
+        del payloads
+
+    if "load_local" in paths:
+        record("load_local", lambda: load_heroes_local(path))
+
+    if "load_snapshot" in paths:
+        snap = path + ".snap"
+        if os.path.exists(snap):
+            os.remove(snap)
+        with quiet():
+            load_heroes_local(path, snapshot=True)  # genera el snapshot
+        record("load_snapshot", lambda: load_heroes_local(path, snapshot=True))
+
+    if "columnar" in paths:
+        try:
+            for suffix, name in ((".parquet", "load_parquet"), (".arrow", "load_arrow")):
+                columnar_path = path + suffix
+                if not os.path.exists(columnar_path):
+                    with quiet():
+                        write_columnar(columnar_path, iter_heroes_local(path))
+                record(name, lambda: load_heroes_local(columnar_path))
+                record(f"{name}_stats", lambda: load_heroes_local(columnar_path, columns="stats"))
+        except ImportError as e:
+            print(f"   ⚠️ columnar omitido: {e}")
+
+    if not in_memory or not paths & {"build", "rank", "search", "similar"}:
+        return results
+
+    with quiet():
+        heroes = load_heroes_local(path, rules=NO_RULES)
+    dataset = HeroDataset(heroes)
+
+    if "build" in paths:
+        record("table_build", lambda: HeroDataset(heroes).table)
+        record("name_index_build", lambda: HeroDataset(heroes).name_index)
+
+    if "rank" in paths:
+        dataset.table
+        rankings = (top_10_highest, top_10_lowest, top_10_balanced)
+        record("rank", lambda: [fn(dataset, stat) for fn in rankings for stat in STAT_FIELDS])
+        # Mismo ranking sin los órdenes precalculados (selección parcial sobre la tabla)
+        record("rank_table", lambda: [fn(dataset.table, stat) for fn in rankings for stat in STAT_FIELDS])
+
+    if "search" in paths:
+        dataset.name_index
+        queries = search_queries(dataset.heroes)
+        record("search", lambda: [search_hero(dataset, q) for q in queries])
+
+    if "similar" in paths:
+        record("similar_build", lambda: SimilarityIndex(dataset.table))
+        index = SimilarityIndex(dataset.table)
+        sample = dataset.heroes[::max(1, len(dataset) // 200)][:200]
+        record("similar_knn", lambda: [index.neighbors(h, 5) for h in sample])
+    return results
+
+
+def bench_plots(args) -> List[Dict]:
+    """El render no depende del tamaño del dataset: se mide una vez, sin cachés."""
+    heroes = _parse_and_filter_data(generate_payloads(2000, args.seed))[:10]
+    results = []
+    for name, func in (
+        ("plot_top", lambda: top_heroes_image(heroes, "strength", cache=RenderCache())),
+        ("plot_radar", lambda: hero_radar_image(heroes[0], cache=RenderCache(), store=_EmptyStore())),
+    ):
+        entry = measure(func, args.repeat)
+        entry.update(name=name, size=len(heroes))
+        results.append(entry)
+        print(f"   {name:<18}{'-':>9}{entry['seconds'] * 1000:>11.1f}{entry['peak_mb']:>10.1f}{entry['items']:>9}")
+    return results
+
+
+class _EmptyStore:
+    """RadarStore que nunca tiene la imagen (fuerza el render en vivo)."""
+
+    def get(self, *args, **kwargs):
+        return None
+
+    def put(self, *args, **kwargs):
+        pass
+
+
+def bench_fetch(args) -> List[Dict]:
+    """get_heroes_from_api contra el servidor simulado, con varias concurrencias."""
+    api = MockSuperHeroAPI(count=args.fetch_ids, seed=args.seed, latency=args.fetch_latency).start()
+    ids = list(range(1, args.fetch_ids + 1))
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            config = FetchConfig(concurrency=concurrency, timeout=10.0)
+            fetcher = HeroFetcher(config, base_url=api.base_url)
+            with quiet():
+                entry = measure(lambda: get_heroes_from_api(ids, fetcher), 1, memory=False)
+            entry.update(name=f"fetch_c{concurrency}", size=len(ids),
+                         requests_per_s=len(ids) / entry["seconds"])
+            results.append(entry)
+            print(f"   {entry['name']:<18}{len(ids):>9}{entry['seconds'] * 1000:>11.1f}{'-':>10}{entry['items']:>9}"
+                  f"   ({entry['requests_per_s']:.0f} req/s)")
+    finally:
+        api.stop()
+    return results
+
+
+def cpu_model() -> str:
+    """Modelo de CPU (de /proc/cpuinfo en Linux; platform.processor() en el resto)."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def machine_meta() -> Dict:
+    """Máquina e intérprete de una ejecución: una línea base solo vale en la misma."""
+    return {
+        "python": platform.python_version(), "numpy": np.__version__,
+        "platform": platform.platform(), "machine": platform.machine(),
+        "cpu": cpu_model(), "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float, min_delta: float = 0.0) -> List[str]:
+    """
+    Imprime la comparación con la línea base y devuelve las regresiones:
+    más de `threshold` (relativo) y de `min_delta` segundos (absoluto) más
+    lentas, para que el ruido de los caminos de décimas de ms no cuente.
+    """
+    previous = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+    meta = baseline.get("meta", {})
+    current = machine_meta()
+    differs = [key for key in ("cpu", "cpus", "python") if key in meta and meta[key] != current[key]]
+    if differs:
+        print(f"\n⚠️ La línea base es de otra máquina ({', '.join(f'{k}: {meta[k]}' for k in differs)}): "
+              f"los tiempos no son comparables, regenérala con --save-baseline.")
+    regressions = []
+    print(f"\n{'camino':<18}{'tamaño':>9}{'base ms':>11}{'ahora ms':>11}{'ratio':>8}")
+    for r in results:
+        old = previous.get((r["name"], r["size"]))
+        if old is None:
+            continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold and r["seconds"] - old["seconds"] > min_delta:
+            flag = "  ⚠️ regresión"
+            regressions.append(f"{r['name']}@{r['size']}")
+        elif ratio < 1 - threshold:
+            flag = "  ✅ mejora"
+        print(f"{r['name']:<18}{r['size']:>9}{old['seconds'] * 1000:>11.1f}{r['seconds'] * 1000:>11.1f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,10k,100k", help="p. ej. 1k,10k,100k,1m")
+    parser.add_argument("--paths", default=",".join(ALL_PATHS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-in-memory", type=parse_size, default=100_000,
+                        help="tamaño máximo para los caminos que cargan todo en memoria")
+    parser.add_argument("--fetch-ids", type=int, default=300)
+    parser.add_argument("--fetch-latency", type=float, default=0.02, help="segundos por petición simulada")
+    parser.add_argument("--concurrency", default="1,5,10,20,40")
+    parser.add_argument("--output", help="fichero JSON con los resultados")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--save-baseline", action="store_true", help=f"guarda los resultados en {DEFAULT_BASELINE}")
+    parser.add_argument("--threshold", type=float, default=0.2, help="margen antes de marcar regresión (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=2.0,
+                        help="ms mínimos de diferencia para marcar regresión (ruido de los caminos rápidos)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    paths = set(args.paths.split(","))
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    results = []
+    print(f"{'camino':<21}{'tamaño':>9}{'ms':>11}{'pico MB':>10}{'items':>9}")
+    for size in (parse_size(s) for s in args.sizes.split(",")):
+        results += bench_size(size, args, paths)
+    if "plot" in paths:
+        results += bench_plots(args)
+    if "fetch" in paths:
+        results += bench_fetch(args)
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **machine_meta(),
+            "sizes": args.sizes, "seed": args.seed, "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    for target in filter(None, (args.output, DEFAULT_BASELINE if args.save_baseline else None)):
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Resultados guardados en {target}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta / 1000)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} regresiones: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
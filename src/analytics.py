@@ -0,0 +1,169 @@
+import collections
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero, STAT_FIELDS
+    from src.table import STAT_COLUMN
+    from src import metrics
+except ImportError:
+    from models import Hero, STAT_FIELDS
+    from table import STAT_COLUMN
+    import metrics
+
+# Columnas por las que se puede agrupar
+GROUP_FIELDS = ("alignment", "gender", "race", "publisher")
+
+# Agregados de group_stats(), en el orden de las columnas del resultado
+AGGREGATES = ("mean", "median", "p90")
+
+# Versiones de dataset cuyas analíticas se conservan (la vigente y alguna anterior)
+MAX_CACHED_VERSIONS = 4
+
+
+# Valores con los que la API marca un dato desconocido (además de vacío)
+UNKNOWN_VALUES = ("null", "-", "none", "n/a")
+UNKNOWN_LABEL = "Desconocido"
+
+
+def _label(value: Optional[str]) -> str:
+    value = (value or "").strip()
+    return UNKNOWN_LABEL if value.lower() in UNKNOWN_VALUES or not value else value
+
+
+def _categorical(codes: np.ndarray, categories: Sequence[str]) -> pd.Categorical:
+    """Reutiliza la codificación diccionario de HeroTable (sin volver a factorizar)."""
+    labels = [_label(c) for c in categories]
+    if len(set(labels)) != len(labels):
+        # Varios centinelas ("", "null", "-") colapsan en la misma etiqueta
+        return pd.Categorical(np.asarray(labels, dtype=object)[codes])
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+class HeroAnalytics:
+    """
+    Agregados vectorizados sobre una versión concreta de un HeroDataset:
+    - frame: DataFrame con las 6 stats (float, NaN = sin dato) y las
+      columnas categóricas de GROUP_FIELDS.
+    - group_stats(): media / mediana / p90 por grupo (memoizado).
+    - histogram() y correlation(): distribución y correlaciones de las stats.
+    - percentile_rank(): percentil de un valor en O(log n) con searchsorted
+      sobre las columnas ya ordenadas.
+
+    Igual que los rankings, una stat a 0 se considera ausente (la API
+    devuelve "null" para los datos desconocidos); en las categorías, los
+    centinelas de la API ("null", "-", vacío) se agrupan como "Desconocido".
+
+    Se construye con get_analytics(dataset); no se modifica.
+    """
+
+    def __init__(self, dataset):
+        table = dataset.table
+        self.version = dataset.version
+        stats = table.stats.astype(np.float64)
+        stats[stats <= 0] = np.nan
+
+        columns: Dict[str, object] = {"id": table.ids, "name": table.names}
+        for stat in STAT_FIELDS:
+            columns[stat] = stats[:, STAT_COLUMN[stat]]
+        for field, (codes, categories) in table.categories.items():
+            columns[field] = _categorical(codes, categories)
+        columns["gender"] = pd.Categorical([_label(h.appearance.gender) for h in table.heroes])
+        self.frame = pd.DataFrame(columns)
+
+        # Una columna ordenada por stat, solo con valores válidos
+        self._sorted: Dict[str, np.ndarray] = {}
+        for stat in STAT_FIELDS:
+            column = stats[:, STAT_COLUMN[stat]]
+            self._sorted[stat] = np.sort(column[~np.isnan(column)])
+
+        self._groups: Dict[Tuple, pd.DataFrame] = {}
+        self._correlation: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # --- GROUP-BY ---
+    def group_stats(self, by: str, stats: Sequence[str] = STAT_FIELDS, min_count: int = 1) -> pd.DataFrame:
+        """
+        Una fila por grupo de `by` (ordenadas por tamaño) con columnas
+        ("count", "") y (stat, agregado) para cada stat y AGGREGATES.
+        Los grupos con menos de `min_count` héroes se descartan.
+        """
+        if by not in GROUP_FIELDS:
+            raise ValueError(f"No se puede agrupar por {by!r} (opciones: {', '.join(GROUP_FIELDS)})")
+        key = (by, tuple(stats), min_count)
+        with self._lock:
+            result = self._groups.get(key)
+        if result is not None:
+            return result
+
+        with metrics.timer("analytics_seconds", op="group_stats"):
+            grouped = self.frame.groupby(by, observed=True)[list(stats)]
+            parts = {"mean": grouped.mean(), "median": grouped.median(), "p90": grouped.quantile(0.9)}
+            result = pd.concat(parts, axis=1).swaplevel(axis=1)
+            result = result.reindex(columns=pd.MultiIndex.from_product([list(stats), AGGREGATES]))
+            sizes = grouped.size()
+            result.insert(0, ("count", ""), sizes)
+            result = result[sizes >= min_count].sort_values(("count", ""), ascending=False)
+
+        with self._lock:
+            self._groups[key] = result
+        return result
+
+    # --- DISTRIBUCIONES ---
+    def histogram(self, stat: str, bins: int = 10, value_range: Tuple[float, float] = (0, 100)):
+        """(conteos, bordes) de la distribución de `stat` (valores válidos)."""
+        return np.histogram(self._sorted[stat], bins=bins, range=value_range)
+
+    def correlation(self) -> pd.DataFrame:
+        """Matriz 6x6 de correlación de Pearson entre las stats (por pares válidos)."""
+        if self._correlation is None:
+            with metrics.timer("analytics_seconds", op="correlation"):
+                self._correlation = self.frame[list(STAT_FIELDS)].corr()
+        return self._correlation
+
+    # --- PERCENTILES ---
+    def percentile_rank(self, value: float, stat: str) -> Optional[float]:
+        """
+        % de héroes con `stat` <= `value` (0-100), con una búsqueda binaria
+        sobre la columna ordenada. None si el valor o la columna no son válidos.
+        """
+        column = self._sorted[stat]
+        if value is None or value <= 0 or len(column) == 0:
+            return None
+        return 100.0 * int(np.searchsorted(column, value, side="right")) / len(column)
+
+    def hero_percentiles(self, hero: Hero) -> Dict[str, Optional[float]]:
+        """Percentil del héroe en cada una de las 6 stats."""
+        ps = hero.powerstats
+        return {stat: self.percentile_rank(getattr(ps, stat, 0) if ps else 0, stat) for stat in STAT_FIELDS}
+
+
+# --- CACHÉ POR VERSIÓN ---
+_cache: "collections.OrderedDict[int, HeroAnalytics]" = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_analytics(dataset) -> HeroAnalytics:
+    """
+    Analíticas de la versión actual del dataset, compartidas por todas las
+    sesiones del proceso; se recalculan solo cuando cambia `dataset.version`.
+    """
+    key = dataset.version
+    with _cache_lock:
+        analytics = _cache.get(key)
+        if analytics is not None:
+            _cache.move_to_end(key)
+            return analytics
+    analytics = HeroAnalytics(dataset)
+    with _cache_lock:
+        analytics = _cache.setdefault(key, analytics)
+        while len(_cache) > MAX_CACHED_VERSIONS:
+            _cache.popitem(last=False)
+    return analytics
@@ -1,65 +1,289 @@
-import os
-import requests
+import time
+import threading
 import concurrent.futures
-import random  # Importamos random para el muestreo
-from dotenv import load_dotenv
-from typing import List, Dict, Any
+import random  # Importamos random para el muestreo y el jitter
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Callable, Iterable
 
-# Cargar variables de entorno
-load_dotenv()
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src import metrics
+    from src.settings import get_settings
+except ImportError:
+    import metrics
+    from settings import get_settings
 
-TOKEN = os.getenv("SUPERHERO_TOKEN")
-BASE_URL = f"https://superheroapi.com/api/{TOKEN}"
+# requests se importa al crear la primera sesión (no al importar el módulo):
+# quien solo usa el loader con datos locales no paga su carga.
+# El token y la URL base salen de get_settings() (SUPERHERO_TOKEN).
 
 # Límites de la API (Existen IDs del 1 al 731 aprox)
 MIN_ID = 1
 MAX_ID = 732
 CANTIDAD_A_CARGAR = 400  # Tu petición
 
-def get_hero_by_id(hero_id: int) -> Dict[str, Any]:
-    """Descarga un solo héroe por ID."""
-    try:
-        url = f"{BASE_URL}/{hero_id}"
-        # Timeout corto para no bloquear si un ID falla
-        response = requests.get(url, timeout=3)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('response') == 'success':
-                return data
-    except Exception:
-        pass
-    return None
-
-def get_heroes_from_api() -> List[Dict[str, Any]]:
+# Códigos HTTP que merecen reintento (saturación o fallo temporal del servidor)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Único error con HTTP 200 que indica un ID inexistente
+INVALID_ID_ERROR = "invalid id"
+
+
+@dataclass
+class FetchConfig:
+    """Parámetros del motor de descarga."""
+    concurrency: int = 20          # Hilos simultáneos (y tamaño del pool HTTP)
+    timeout: float = 3.0           # Segundos por petición
+    max_retries: int = 3           # Reintentos por ID además del primer intento
+    backoff_base: float = 0.5      # Espera base del backoff exponencial
+    backoff_max: float = 8.0       # Tope de espera entre reintentos
+    rate_limit: float = 0.0        # Peticiones por segundo (0 = sin límite)
+    burst: int = 20                # Capacidad del token bucket
+
+
+@dataclass
+class FetchResult:
     """
-    Selecciona 400 IDs al azar y los descarga en paralelo.
+    Resultado estructurado de una descarga por lotes.
+    - heroes: payloads válidos por ID.
+    - failures: motivo del fallo por ID (agotó reintentos o error definitivo).
+    - not_found: IDs que la API declara inexistentes (no se reintentan).
+    - attempts: número de intentos consumidos por cada ID.
     """
-    if not TOKEN:
-        print("❌ Error: Falta SUPERHERO_TOKEN en .env")
-        return []
+    heroes: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    failures: Dict[int, str] = field(default_factory=dict)
+    not_found: List[int] = field(default_factory=list)
+    attempts: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def retries(self) -> int:
+        """Total de reintentos consumidos en el lote."""
+        return sum(n - 1 for n in self.attempts.values())
+
+
+class TokenBucket:
+    """Limitador de tasa thread-safe: `rate` fichas/segundo, hasta `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta disponer de una ficha."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HeroFetcher:
+    """
+    Motor de descarga con una sesión HTTP compartida (pool de conexiones
+    keep-alive), reintentos con backoff exponencial + jitter y limitador
+    de tasa. `base_url` permite apuntar a un servidor de pruebas local
+    (por defecto, la SuperHero API con el token de la configuración).
+    """
+
+    def __init__(self, config: Optional[FetchConfig] = None, base_url: Optional[str] = None,
+                 session=None):
+        self.config = config or FetchConfig()
+        self.base_url = (base_url or get_settings().superhero_base_url).rstrip("/")
+        self.session = session or self._create_session(self.config.concurrency)
+        self.bucket = TokenBucket(self.config.rate_limit, self.config.burst)
+
+    @staticmethod
+    def _create_session(pool_size: int):
+        """Sesión con un pool del tamaño de la concurrencia (sin reintentos de urllib3)."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full jitter: espera aleatoria en [0, min(tope, base * 2^intento)]."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.config.backoff_max)
+            except ValueError:
+                pass
+        cap = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def fetch_one(self, hero_id: int):
+        """
+        Descarga un ID con reintentos.
+        Devuelve (payload | None, motivo | None, intentos, definitivo).
+        """
+        import requests  # ya cargado por _create_session: es una consulta a sys.modules
+        url = f"{self.base_url}/{hero_id}"
+        reason = None
+        attempts = 0
+        for attempt in range(self.config.max_retries + 1):
+            attempts += 1
+            self.bucket.acquire()
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=self.config.timeout)
+            except requests.Timeout:
+                reason = "timeout"
+                metrics.observe("fetch_request_seconds", time.perf_counter() - start, outcome="timeout")
+            except requests.RequestException as e:
+                reason = f"error de conexión: {type(e).__name__}"
+                metrics.observe("fetch_request_seconds", time.perf_counter() - start, outcome="error")
+            else:
+                metrics.observe("fetch_request_seconds", time.perf_counter() - start, outcome=str(response.status_code))
+                if response.status_code == 200:
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        return None, "JSON inválido", attempts, False
+                    if not isinstance(data, dict):
+                        return None, "respuesta inesperada", attempts, False
+                    if data.get('response') == 'success':
+                        return data, None, attempts, False
+                    # La API responde 200 con {"response": "error"}: solo "invalid id"
+                    # es definitivo; el resto (p. ej. "access denied" con un token
+                    # caducado) no se marca como inexistente y se reintenta en la
+                    # siguiente descarga
+                    error = str(data.get('error', 'respuesta no exitosa'))
+                    return None, error, attempts, error.strip().lower() == INVALID_ID_ERROR
+                if response.status_code not in RETRYABLE_STATUS:
+                    return None, f"HTTP {response.status_code}", attempts, response.status_code == 404
+                reason = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt < self.config.max_retries:
+                metrics.inc("fetch_retries_total", reason=reason.split(":")[0])
+                time.sleep(self._backoff(attempt, retry_after))
+
+        return None, reason, attempts, False
+
+    def iter_fetch(self, ids: Iterable[int]):
+        """
+        Descarga los IDs en paralelo y va entregando cada resultado en cuanto
+        llega: tuplas (id, payload | None, motivo | None, intentos, definitivo).
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.config.concurrency) as executor:
+            future_to_id = {executor.submit(self.fetch_one, i): i for i in ids}
+
+            try:
+                for future in concurrent.futures.as_completed(future_to_id):
+                    data, reason, attempts, definitive = future.result()
+                    metrics.inc("fetch_ids_total", result="ok" if data else "not_found" if definitive else "failed")
+                    yield future_to_id[future], data, reason, attempts, definitive
+            finally:
+                # Si el consumidor abandona el generador, no esperamos a los pendientes
+                for future in future_to_id:
+                    future.cancel()
+
+    def fetch(self, ids: Iterable[int],
+              on_result: Optional[Callable[[int, Optional[Dict[str, Any]]], None]] = None) -> FetchResult:
+        """Descarga los IDs en paralelo y acumula un FetchResult."""
+        result = FetchResult()
+        for hero_id, data, reason, attempts, definitive in self.iter_fetch(ids):
+            result.attempts[hero_id] = attempts
+            if data:
+                result.heroes[hero_id] = data
+            else:
+                result.failures[hero_id] = reason
+                if definitive:
+                    result.not_found.append(hero_id)
+            if on_result:
+                on_result(hero_id, data)
+        return result
 
+
+# Motor compartido por todo el proceso (se crea al primer uso)
+_default_fetcher: Optional[HeroFetcher] = None
+
+def get_default_fetcher() -> HeroFetcher:
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = HeroFetcher()
+    return _default_fetcher
+
+def get_hero_by_id(hero_id: int) -> Optional[Dict[str, Any]]:
+    """Descarga un solo héroe por ID."""
+    data, _, _, _ = get_default_fetcher().fetch_one(hero_id)
+    return data
+
+def pick_random_ids() -> List[int]:
+    """Selecciona CANTIDAD_A_CARGAR IDs únicos al azar dentro del rango de la API."""
     print(f"🎲 Seleccionando {CANTIDAD_A_CARGAR} IDs al azar entre {MIN_ID} y {MAX_ID}...")
-    
-    # --- AQUÍ ESTÁ LA MAGIA ---
     # random.sample genera una lista de números únicos, no repetidos.
-    ids_de_la_suerte = random.sample(range(MIN_ID, MAX_ID + 1), CANTIDAD_A_CARGAR)
-    
-    print(f"🌐 Conectando a SuperHero API (Descargando lote aleatorio)...")
-    
-    heroes_data = []
-    
-    # Lanzamos 20 hilos simultáneos para procesar los 400 IDs rápidamente
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        # Mapeamos la función de descarga a nuestra lista de IDs aleatorios
-        future_to_id = {executor.submit(get_hero_by_id, i): i for i in ids_de_la_suerte}
-        
-        for future in concurrent.futures.as_completed(future_to_id):
-            data = future.result()
-            if data:
-                heroes_data.append(data)
-                # Feedback visual en consola cada 50 héroes
-                if len(heroes_data) % 50 == 0:
-                    print(f"   ⚡ {len(heroes_data)} héroes procesados...")
+    return random.sample(range(MIN_ID, MAX_ID + 1), CANTIDAD_A_CARGAR)
+
+def fetch_heroes(ids: Optional[List[int]] = None, fetcher: Optional[HeroFetcher] = None) -> FetchResult:
+    """
+    Descarga en paralelo los héroes indicados en `ids` (o 400 al azar)
+    y devuelve el resultado estructurado con los fallos por ID.
+    """
+    if fetcher is None:
+        if not get_settings().superhero_token:
+            print("❌ Error: Falta SUPERHERO_TOKEN en .env")
+            return FetchResult()
+        fetcher = get_default_fetcher()
+
+    # --- AQUÍ ESTÁ LA MAGIA ---
+    ids_de_la_suerte = ids if ids is not None else pick_random_ids()
+    if not ids_de_la_suerte:
+        return FetchResult()
 
-    print(f"✅ Carga completa: {len(heroes_data)} héroes obtenidos.")
-    return heroes_data
\ No newline at end of file
+    print(f"🌐 Conectando a SuperHero API (Descargando {len(ids_de_la_suerte)} IDs)...")
+
+    progreso = {"ok": 0}
+
+    def _feedback(hero_id, data):
+        # Feedback visual en consola cada 50 héroes
+        if data:
+            progreso["ok"] += 1
+            if progreso["ok"] % 50 == 0:
+                print(f"   ⚡ {progreso['ok']} héroes procesados...")
+
+    result = fetcher.fetch(ids_de_la_suerte, on_result=_feedback)
+
+    print(f"✅ Carga completa: {len(result.heroes)} héroes obtenidos.")
+    errores = len(result.failures) - len(result.not_found)
+    if errores:
+        print(f"⚠️ {errores} IDs fallaron tras reintentos ({result.retries} reintentos en total).")
+    return result
+
+def iter_heroes_from_api(ids: Optional[List[int]] = None, fetcher: Optional[HeroFetcher] = None):
+    """
+    Versión incremental de fetch_heroes: entrega cada resultado en cuanto
+    llega, como tuplas (id, payload | None, motivo | None, intentos, definitivo).
+    """
+    if fetcher is None:
+        if not get_settings().superhero_token:
+            print("❌ Error: Falta SUPERHERO_TOKEN en .env")
+            return
+        fetcher = get_default_fetcher()
+
+    ids_de_la_suerte = ids if ids is not None else pick_random_ids()
+    if not ids_de_la_suerte:
+        return
+
+    print(f"🌐 Conectando a SuperHero API (Descargando {len(ids_de_la_suerte)} IDs en streaming)...")
+    yield from fetcher.iter_fetch(ids_de_la_suerte)
+
+def get_heroes_from_api(ids: Optional[List[int]] = None, fetcher: Optional[HeroFetcher] = None) -> List[Dict[str, Any]]:
+    """
+    Descarga en paralelo los héroes indicados en `ids`.
+    Si no se indican, selecciona 400 IDs al azar.
+    """
+    return list(fetch_heroes(ids, fetcher).heroes.values())
@@ -1,23 +1,63 @@
 import streamlit as st
 import sys
 import os
+import threading
+from functools import partial
 
 # Ajuste de rutas para encontrar los módulos
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # Solo importamos la función remota
 from src.loader import load_heroes_remote
+from src.shared import SharedDataset
+from src.settings import get_settings
+from src import metrics
 import src.ui as ui
 
-@st.cache_data
-def get_marvel_data():
+@st.cache_resource
+def init_metrics():
+    """Métricas del proceso según SUPERHERO_METRICS (desactivadas si no se define)."""
+    return metrics.configure_from_env()
+
+@st.cache_resource
+def get_shared_dataset():
     """
     Carga los datos EXCLUSIVAMENTE desde la API.
     El loader.py se encarga de:
     1. Descargar los datos (aleatorios o completos).
     2. Validar reglas de negocio (Marvel, stats <= 15, etc).
+    Los payloads se guardan en el almacén local (data/heroes_cache.jsonl),
+    así que un reinicio solo descarga los IDs caducados o ausentes.
+    Con SUPERHERO_CACHE_WARM=1 se precarga el rango completo de IDs.
+    cache_resource: una sola instancia por proceso, compartida por todas las
+    sesiones sin serializar ni copiar. Con SUPERHERO_REFRESH_INTERVAL > 0 se
+    recarga en segundo plano y se publica de forma atómica; si la carga
+    inicial queda vacía (sin token, sin red) se reintenta igualmente.
+    Cada dataset publicado dispara el pre-renderizado de los rankings.
+    """
+    settings = get_settings()
+    shared = SharedDataset(partial(load_heroes_remote, warm=settings.cache_warm),
+                           on_publish=start_prerender)
+    shared.start(settings.refresh_interval)
+    return shared
+
+def start_prerender(dataset):
+    """
+    Pre-renderiza en segundo plano (no bloquea la carga) las 6 x 3 gráficas
+    de ranking y los radares de todo el roster (SUPERHERO_RADAR_WORKERS
+    procesos; 0 desactiva los radares).
     """
-    return load_heroes_remote()
+    def run():
+        ui.prerender_rankings(dataset)
+        workers = get_settings().radar_workers
+        if workers > 0:
+            ui.prerender_radars(dataset, workers)
+
+    threading.Thread(target=run, name="prerender", daemon=True).start()
+
+def get_marvel_data():
+    """HeroDataset vigente (rankings precalculados). Solo lectura: es compartido."""
+    return get_shared_dataset().get()
 
 def main():
     # 1. Configuración de página
@@ -27,26 +67,34 @@ def main():
         layout="wide"
     )
     
-    # 2. Inicializar estado visual
+    # 2. Inicializar métricas y estado visual
+    init_metrics()
     ui.init_state()
     ui.render_header()
     
     # 3. Cargar Datos (Solo API)
     with st.spinner("Conectando a la API y descargando Universo Marvel..."):
-        heroes = get_marvel_data()
+        dataset = get_marvel_data()
         
     # 4. Validación de Carga
-    if not heroes:
+    if not dataset:
         st.error("❌ No se encontraron héroes válidos. Verifica la conexión o que la API esté devolviendo datos correctos.")
         return
 
     # 5. Control de Navegación (Router)
     if st.session_state.view == "menu":
-        ui.render_menu(heroes)
+        ui.render_menu(dataset)
     elif st.session_state.view == "hero":
-        ui.render_hero_detail()
+        ui.render_hero_detail(dataset)
+    elif st.session_state.view == "analytics":
+        ui.render_analytics_view(dataset)
+    elif st.session_state.view == "arena":
+        ui.render_arena_view(dataset)
     elif st.session_state.view == "ai_image":
         ui.render_ai_view()
 
+    # 6. Panel de depuración (solo con SUPERHERO_METRICS)
+    ui.render_metrics_panel()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
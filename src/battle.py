@@ -0,0 +1,275 @@
+import collections
+import concurrent.futures
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero, STAT_FIELDS
+    from src.table import HeroTable
+    from src.dataset import HeroDataset
+    from src.filters import HeroData, _as_table
+    from src.settings import get_settings
+    from src import metrics
+except ImportError:
+    from models import Hero, STAT_FIELDS
+    from table import HeroTable
+    from dataset import HeroDataset
+    from filters import HeroData, _as_table
+    from settings import get_settings
+    import metrics
+
+# Probabilidad de que cada stat decida un asalto (orden de STAT_FIELDS)
+DEFAULT_WEIGHTS = (0.10, 0.20, 0.10, 0.15, 0.20, 0.25)
+
+# Resolución del sorteo de la stat de cada asalto (tabla de búsqueda de 16 bits)
+STAT_DRAW_LEVELS = 1 << 16
+
+# Elementos (combates x pruebas x asaltos) simulados por bloque: acota la
+# memoria (~30 MB por bloque) y es la unidad de reparto entre procesos
+CHUNK_ELEMENTS = 1 << 20
+
+# Escala Elo de las puntuaciones (1500 = héroe medio del torneo)
+ELO_BASE = 1500.0
+ELO_SCALE = 400.0
+
+# Torneos conservados (distintas versiones del dataset o configuraciones)
+MAX_CACHED_TOURNAMENTS = 4
+
+
+@dataclass(frozen=True)
+class BattleConfig:
+    """
+    Reglas de un combate:
+    - rounds: asaltos por combate. En cada uno se sortea una stat (según
+      `weights`) y cada héroe tira stat x U(1 - volatility, 1 + volatility).
+    - Gana el combate quien acumula más puntos en los `rounds` asaltos.
+    - trials: combates simulados por emparejamiento.
+    - seed: semilla; mismo seed y configuración -> mismos resultados, con
+      cualquier número de procesos.
+    """
+    trials: int = 1000
+    rounds: int = 5
+    volatility: float = 0.5
+    weights: Tuple[float, ...] = DEFAULT_WEIGHTS
+    seed: int = 0
+
+    def stat_table(self) -> np.ndarray:
+        """
+        Tabla entero de 16 bits -> índice de stat con las proporciones de
+        `weights`: sortear una stat es un entero aleatorio y un take(), sin
+        búsqueda binaria por asalto.
+        """
+        weights = np.asarray(self.weights, dtype=np.float64)
+        if len(weights) != len(STAT_FIELDS) or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError(f"Se necesita un peso no negativo por stat ({len(STAT_FIELDS)}).")
+        cumulative = np.cumsum(weights / weights.sum())
+        levels = (np.arange(STAT_DRAW_LEVELS) + 0.5) / STAT_DRAW_LEVELS
+        return np.minimum(np.searchsorted(cumulative, levels, side="right"), len(STAT_FIELDS) - 1)
+
+
+# --- SIMULACIÓN ---
+def _simulate_chunk(stats_a: np.ndarray, stats_b: np.ndarray, config: BattleConfig, chunk: int) -> np.ndarray:
+    """
+    Victorias de A sobre B en config.trials combates para cada fila
+    (emparejamiento). Unidad de trabajo del pool: su aleatoriedad depende
+    solo de (seed, chunk), no del proceso que la ejecute.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(config.seed, spawn_key=(chunk,)))
+    shape = (len(stats_a), config.trials, config.rounds)
+    # Stat sorteada por asalto (compartida por los dos héroes), como posición
+    # en la matriz aplanada de stats de cada emparejamiento
+    stat = config.stat_table().take(rng.integers(0, STAT_DRAW_LEVELS, shape, dtype=np.uint16))
+    stat += (np.arange(len(stats_a)) * len(STAT_FIELDS))[:, None, None]
+
+    low, span = 1.0 - config.volatility, 2.0 * config.volatility
+    totals = []
+    for stats in (stats_a, stats_b):
+        values = stats.astype(np.float32).ravel().take(stat)
+        values *= low + span * rng.random(shape, dtype=np.float32)
+        totals.append(values.sum(axis=2))
+    margin = totals[0] - totals[1]
+    # Empate exacto (p. ej. dos héroes con todas las stats a 0): medio punto
+    return (margin > 0).sum(axis=1) + 0.5 * (margin == 0).sum(axis=1)
+
+
+def _chunks(pair_count: int, config: BattleConfig) -> List[Tuple[int, int]]:
+    """Tramos [inicio, fin) de emparejamientos; solo dependen de la configuración."""
+    size = max(1, CHUNK_ELEMENTS // max(1, config.trials * config.rounds))
+    return [(start, min(start + size, pair_count)) for start in range(0, pair_count, size)]
+
+
+def simulate_pairs(stats_a: np.ndarray, stats_b: np.ndarray, config: BattleConfig = BattleConfig(),
+                   workers: int = 0) -> np.ndarray:
+    """
+    Victorias (sobre config.trials) de cada fila de `stats_a` contra la misma
+    fila de `stats_b`. Con `workers` > 1 los bloques se reparten en un pool
+    de procesos ('spawn', seguro desde un hilo de la app).
+    """
+    chunks = _chunks(len(stats_a), config)
+    wins = np.empty(len(stats_a), dtype=np.float64)
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk, (start, end) in enumerate(chunks):
+            wins[start:end] = _simulate_chunk(stats_a[start:end], stats_b[start:end], config, chunk)
+        return wins
+
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(_simulate_chunk, stats_a[start:end], stats_b[start:end], config, chunk): (start, end)
+                   for chunk, (start, end) in enumerate(chunks)}
+        for future in concurrent.futures.as_completed(futures):
+            start, end = futures[future]
+            wins[start:end] = future.result()
+    return wins
+
+
+def duel(a: Hero, b: Hero, config: BattleConfig = BattleConfig()) -> float:
+    """Fracción de combates que `a` gana a `b` (0-1)."""
+    table = HeroTable.from_heroes([a, b])
+    wins = simulate_pairs(table.stats[:1], table.stats[1:], config)
+    return float(wins[0]) / config.trials
+
+
+# --- TORNEO ---
+def elo_ratings(win_rates: np.ndarray, trials: int, iterations: int = 200) -> np.ndarray:
+    """
+    Puntuaciones estilo Elo ajustadas a la matriz de victorias (modelo de
+    Bradley-Terry, iteraciones MM vectorizadas). Las tasas se acotan a
+    [1/2T, 1 - 1/2T] para que un invicto no tenga puntuación infinita.
+    """
+    n = len(win_rates)
+    if n < 2:
+        return np.full(n, ELO_BASE)
+    floor = 1.0 / (2 * trials)
+    rates = np.clip(np.nan_to_num(win_rates, nan=0.0), floor, 1.0 - floor)
+    np.fill_diagonal(rates, 0.0)
+    wins = rates.sum(axis=1)
+    strength = np.ones(n)
+    for _ in range(iterations):
+        pair_sum = strength[:, None] + strength[None, :]
+        denominator = (1.0 / pair_sum).sum(axis=1) - 1.0 / (2 * strength)  # sin la diagonal
+        updated = wins / denominator
+        updated /= np.exp(np.log(updated).mean())
+        if np.allclose(updated, strength, rtol=1e-9, atol=0):
+            strength = updated
+            break
+        strength = updated
+    return ELO_BASE + ELO_SCALE * np.log10(strength)
+
+
+@dataclass
+class TournamentResult:
+    """
+    Liga todos contra todos:
+    - win_rates[i, j]: fracción de combates que heroes[i] gana a heroes[j]
+      (diagonal NaN).
+    - ratings: puntuación Elo de cada héroe.
+    """
+    heroes: List[Hero]
+    win_rates: np.ndarray
+    ratings: np.ndarray
+    config: BattleConfig
+
+    def order(self) -> List[int]:
+        """Índices de `heroes` de mejor a peor puntuación."""
+        return np.argsort(-self.ratings, kind="stable").tolist()
+
+    def standings(self) -> List[Tuple[Hero, float, float]]:
+        """(héroe, Elo, fracción media de victorias) de mejor a peor."""
+        mean_rates = np.nanmean(self.win_rates, axis=1) if len(self.heroes) > 1 else np.zeros(len(self.heroes))
+        return [(self.heroes[i], float(self.ratings[i]), float(mean_rates[i])) for i in self.order()]
+
+
+def round_robin(heroes: HeroData, config: BattleConfig = BattleConfig(), workers: int = 0) -> TournamentResult:
+    """Todos contra todos: N(N-1)/2 emparejamientos x config.trials combates."""
+    table = _as_table(heroes)
+    n = len(table)
+    with metrics.timer("battle_seconds", kind="round_robin"):
+        rows, cols = np.triu_indices(n, k=1)
+        wins = simulate_pairs(table.stats[rows], table.stats[cols], config, workers)
+        win_rates = np.full((n, n), np.nan)
+        win_rates[rows, cols] = wins / config.trials
+        win_rates[cols, rows] = 1.0 - win_rates[rows, cols]
+        ratings = elo_ratings(win_rates, config.trials)
+    metrics.inc("battle_matchups_total", len(rows))
+    return TournamentResult(list(table.heroes), win_rates, ratings, config)
+
+
+# --- CACHÉ POR VERSIÓN ---
+_cache: "collections.OrderedDict[Tuple[int, BattleConfig], TournamentResult]" = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def cached_tournament(dataset: HeroDataset, config: BattleConfig = BattleConfig()) -> Optional[TournamentResult]:
+    """El torneo ya calculado para esta versión del dataset, si lo hay."""
+    with _cache_lock:
+        return _cache.get((dataset.version, config))
+
+
+def get_tournament(dataset: HeroDataset, config: BattleConfig = BattleConfig(),
+                   workers: Optional[int] = None) -> TournamentResult:
+    """
+    Torneo de la versión actual del dataset, compartido por todas las
+    sesiones; solo se recalcula cuando cambian `dataset.version` o la
+    configuración. `workers` por defecto: SUPERHERO_BATTLE_WORKERS.
+    """
+    key = (dataset.version, config)
+    result = cached_tournament(dataset, config)
+    if result is not None:
+        return result
+    workers = get_settings().battle_workers if workers is None else workers
+    result = round_robin(dataset, config, workers)
+    with _cache_lock:
+        result = _cache.setdefault(key, result)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_TOURNAMENTS:
+            _cache.popitem(last=False)
+    return result
+
+
+# --- TORNEO EN SEGUNDO PLANO ---
+_jobs: "Dict[Tuple[int, BattleConfig], concurrent.futures.Future]" = {}
+_jobs_lock = threading.Lock()
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+
+def _succeeded(job: concurrent.futures.Future) -> bool:
+    """Terminado sin error (cancelled() antes que exception(): con un Future cancelado, lanza)."""
+    return job.done() and not job.cancelled() and job.exception() is None
+
+
+def submit_tournament(dataset: HeroDataset, config: BattleConfig = BattleConfig(),
+                      workers: Optional[int] = None) -> concurrent.futures.Future:
+    """
+    Lanza get_tournament() en un hilo en segundo plano (uno por proceso; el
+    cálculo se reparte en `workers` procesos si se indica) y devuelve su
+    Future, con `started_at`. Mientras está en curso, las llamadas con la
+    misma versión y configuración devuelven el mismo Future; si falló o se
+    canceló, se vuelve a lanzar.
+    """
+    global _executor
+    key = (dataset.version, config)
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is not None and (not job.done() or _succeeded(job)):
+            return job
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="battle")
+        # Trabajos terminados con éxito (su resultado ya está en la caché) o cancelados
+        for done in [k for k, j in _jobs.items() if j.cancelled() or _succeeded(j)]:
+            del _jobs[done]
+        job = _executor.submit(get_tournament, dataset, config, workers)
+        job.started_at = time.time()
+        _jobs[key] = job
+        return job
+
+
+def tournament_job(dataset: HeroDataset, config: BattleConfig = BattleConfig()) -> Optional[concurrent.futures.Future]:
+    """El torneo lanzado con submit_tournament() para esta versión, si lo hay."""
+    with _jobs_lock:
+        return _jobs.get((dataset.version, config))
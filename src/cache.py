@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.settings import get_settings
+except ImportError:
+    from settings import get_settings
+
+# Ubicación por defecto del almacén (junto al dataset local)
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "heroes_cache.jsonl"
+
+# Si el archivo tiene más del doble de líneas que registros vivos, se compacta
+COMPACT_RATIO = 2
+
+
+class HeroCache:
+    """
+    Almacén local de héroes en formato JSON-lines, indexado por ID.
+
+    Cada línea es un registro independiente:
+        {"id": 12, "fetched_at": 1700000000.0, "ttl": 604800, "data": {...}}
+
+    El archivo es de solo-añadir: una actualización escribe una línea nueva
+    y al leer gana la última. Cuando el archivo crece demasiado se reescribe
+    (compactación) con un registro por ID.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttl: Optional[float] = None):
+        self.path = Path(path)
+        # Tiempo de vida de cada registro en segundos (por defecto, SUPERHERO_CACHE_TTL: 7 días)
+        self.ttl = ttl if ttl is not None else get_settings().cache_ttl
+        self._records: Dict[int, Dict[str, Any]] = {}
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    # --- PERSISTENCIA ---
+    def _load(self):
+        """Lee el archivo completo; las líneas corruptas se ignoran."""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._lines += 1
+                try:
+                    record = json.loads(line)
+                    self._records[int(record["id"])] = record
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def _compact(self):
+        """Reescribe el archivo con un único registro por ID (escritura atómica)."""
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self._records.values():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._lines = len(self._records)
+
+    # --- CONSULTAS ---
+    def _is_fresh(self, record: Dict[str, Any], now: float) -> bool:
+        return now - record["fetched_at"] < record.get("ttl", self.ttl)
+
+    def get(self, hero_id: int) -> Optional[Dict[str, Any]]:
+        """Devuelve el payload crudo de un héroe vigente, o None."""
+        record = self._records.get(hero_id)
+        if record and self._is_fresh(record, time.time()):
+            return record["data"]
+        return None
+
+    def get_many(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Payloads vigentes para los IDs pedidos (los ausentes se omiten)."""
+        now = time.time()
+        result = []
+        for hero_id in ids:
+            record = self._records.get(hero_id)
+            if record and record["data"] and self._is_fresh(record, now):
+                result.append(record["data"])
+        return result
+
+    def stale_ids(self, ids: Iterable[int]) -> List[int]:
+        """IDs que faltan en el almacén o cuyo TTL ya venció."""
+        now = time.time()
+        return [
+            hero_id for hero_id in ids
+            if hero_id not in self._records or not self._is_fresh(self._records[hero_id], now)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, hero_id: int) -> bool:
+        return hero_id in self._records
+
+    # --- ESCRITURA ---
+    def put_many(self, payloads: Iterable[Dict[str, Any]]):
+        """Guarda (o actualiza) los payloads crudos devueltos por la API."""
+        now = time.time()
+        new_records = []
+        for data in payloads:
+            try:
+                hero_id = int(data["id"])
+            except (KeyError, ValueError, TypeError):
+                continue
+            new_records.append({"id": hero_id, "fetched_at": now, "ttl": self.ttl, "data": data})
+        self._append(new_records)
+
+    def put(self, data: Dict[str, Any]):
+        self.put_many([data])
+
+    def put_not_found(self, ids: Iterable[int]):
+        """
+        Registra IDs que la API declara inexistentes (registro con data=None),
+        para no volver a pedirlos hasta que venza su TTL.
+        """
+        now = time.time()
+        self._append([{"id": int(i), "fetched_at": now, "ttl": self.ttl, "data": None} for i in ids])
+
+    def _append(self, new_records: List[Dict[str, Any]]):
+        if not new_records:
+            return
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for record in new_records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    self._records[record["id"]] = record
+            self._lines += len(new_records)
+
+            if self._lines > COMPACT_RATIO * max(len(self._records), 1):
+                self._compact()
+
+    # --- REFRESCO EN SEGUNDO PLANO ---
+    def start_refresher(
+        self,
+        refresh: Callable[[List[int]], None],
+        ids: Iterable[int],
+        interval: float = 60.0,
+        batch_size: int = 50,
+    ) -> threading.Event:
+        """
+        Lanza un hilo daemon que, cada `interval` segundos, pasa a `refresh`
+        hasta `batch_size` IDs caducados o ausentes (`refresh` los descarga
+        y los guarda en este almacén). Devuelve un Event que
+        detiene el hilo al activarse (`event.set()`).
+        """
+        ids = list(ids)
+        stop = threading.Event()
+
+        def _loop():
+            while not stop.wait(interval):
+                pending = self.stale_ids(ids)[:batch_size]
+                if not pending:
+                    continue
+                try:
+                    refresh(pending)
+                except Exception as e:
+                    print(f"⚠️ Error refrescando caché: {e}")
+
+        thread = threading.Thread(target=_loop, name="hero-cache-refresher", daemon=True)
+        thread.start()
+        return stop
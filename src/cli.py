@@ -0,0 +1,456 @@
+"""
+Línea de comandos: los mismos pasos que la app, sin navegador (p. ej. en cron).
+
+    python -m src.cli validate                                # volcado local
+    python -m src.cli --source api fetch                      # refrescar el almacén
+    python -m src.cli --source mock rank --output rankings.csv
+    python -m src.cli render --out-dir charts --jobs 4
+    python -m src.cli export --output heroes.parquet
+    python -m src.cli --input heroes.parquet rank             # solo lee las stats
+
+Fuentes (--source):
+- local: volcado JSON / JSON-lines (.gz) de --input, leído en streaming, o
+         un Parquet / Arrow IPC exportado con `export` (ya validado, sin
+         parsear JSON y leyendo solo las columnas que necesita el comando).
+- cache: el almacén local (data/heroes_cache.jsonl o --cache), sin red.
+- mock:  src/mock_api.py arrancada en el propio proceso (sin red ni token).
+- api:   SuperHero API, pasando por el almacén local.
+
+Los mensajes de progreso van a stderr; los resultados, a stdout o --output.
+Con SUPERHERO_METRICS definido se exportan también las métricas al terminar.
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero, STAT_FIELDS, STAT_LABELS
+    from src.api_marvel import FetchConfig, HeroFetcher, fetch_heroes, MIN_ID, MAX_ID
+    from src.cache import HeroCache
+    from src.dataset import HeroDataset
+    from src.filters import RANKING_CRITERIA, rank_by_criterion, ranking_title
+    from src.loader import RejectReport, get_default_cache, iter_heroes_local, iter_heroes_remote, iter_parsed_records, load_heroes_local
+    from src.columnar import write_columnar, write_parquet_records
+    from src.mock_api import MockSuperHeroAPI
+    from src.rules import RuleSet, get_rules, load_rules
+    from src.settings import get_settings
+    from src import metrics, plots
+except ImportError:
+    from models import Hero, STAT_FIELDS, STAT_LABELS
+    from api_marvel import FetchConfig, HeroFetcher, fetch_heroes, MIN_ID, MAX_ID
+    from cache import HeroCache
+    from dataset import HeroDataset
+    from filters import RANKING_CRITERIA, rank_by_criterion, ranking_title
+    from loader import RejectReport, get_default_cache, iter_heroes_local, iter_heroes_remote, iter_parsed_records, load_heroes_local
+    from columnar import write_columnar, write_parquet_records
+    from mock_api import MockSuperHeroAPI
+    from rules import RuleSet, get_rules, load_rules
+    from settings import get_settings
+    import metrics
+    import plots
+
+SOURCES = ("local", "cache", "mock", "api")
+DEFAULT_INPUT = os.path.join("data", "superheros.json")
+EXPORT_FORMATS = ("csv", "json", "jsonl", "parquet", "arrow")
+RANK_FORMATS = ("text", "csv", "json", "jsonl", "parquet")
+# Formatos columnares de export -> formato de src/columnar.py
+COLUMNAR_EXPORTS = {"parquet": "parquet", "arrow": "ipc"}
+
+# Radares por tarea del pool de render (menos mensajes entre procesos)
+RENDER_BATCH_SIZE = 16
+
+
+# --- FUENTES ---
+def parse_ids(text: str) -> List[int]:
+    """"1-100,250,300-310" -> lista de IDs (en orden, sin repetidos)."""
+    ids: Dict[int, None] = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        low, sep, high = part.partition("-")
+        if sep:
+            ids.update(dict.fromkeys(range(int(low), int(high) + 1)))
+        else:
+            ids[int(part)] = None
+    return list(ids)
+
+
+def _rules(spec: str) -> RuleSet:
+    """Perfil con nombre (src/rules.py) o ruta a un JSON de reglas."""
+    return load_rules(spec) if spec.endswith(".json") or os.path.sep in spec else get_rules(spec)
+
+
+class Source:
+    """
+    Origen de los héroes según --source. Como context manager arranca (y
+    para) la API simulada cuando hace falta.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        self.kind = args.source
+        self.args = args
+        self.rules = _rules(args.rules)
+        self.mock: Optional[MockSuperHeroAPI] = None
+
+    def __enter__(self) -> "Source":
+        if self.kind == "mock":
+            self.mock = MockSuperHeroAPI(self.args.mock_count, self.args.mock_seed, self.args.mock_latency).start()
+            print(f"🧪 SuperHero API simulada en {self.mock.base_url}")
+        return self
+
+    def __exit__(self, *exc):
+        if self.mock is not None:
+            self.mock.stop()
+        return False
+
+    @property
+    def ids(self) -> List[int]:
+        if self.args.ids:
+            return parse_ids(self.args.ids)
+        high = self.args.mock_count if self.kind == "mock" else MAX_ID
+        return list(range(MIN_ID, high + 1))
+
+    def cache(self) -> Optional[HeroCache]:
+        """
+        Almacén de la fuente. Con mock solo si se indica --cache, para no
+        mezclar registros sintéticos con el almacén real.
+        """
+        if self.args.cache:
+            return HeroCache(self.args.cache)
+        if self.kind in ("api", "cache"):
+            return get_default_cache()
+        return None
+
+    def fetcher(self) -> Optional[HeroFetcher]:
+        """Motor de descarga (None con api sin token: el loader avisa y no descarga)."""
+        config = FetchConfig(concurrency=self.args.concurrency)
+        if self.kind == "mock":
+            return HeroFetcher(config, base_url=self.mock.base_url)
+        if self.kind == "api" and get_settings().superhero_token:
+            return HeroFetcher(config)
+        return None
+
+    def heroes(self, report: Optional[RejectReport] = None) -> Iterator[Hero]:
+        """Héroes válidos en streaming (memoria acotada por registro)."""
+        if self.kind == "local":
+            return iter_heroes_local(self.args.input, report, self.rules)
+        cache = self.cache()
+        if self.kind == "cache":
+            return iter_parsed_records(cache.get_many(self.ids), report, self.rules)
+        return iter_heroes_remote(self.ids, cache, use_cache=cache is not None, fetcher=self.fetcher(),
+                                  report=report, rules=self.rules)
+
+    def load(self, columns: Optional[str] = None) -> HeroDataset:
+        """
+        Dataset completo (con --snapshot, el volcado local usa y guarda
+        `<input>.snap`). `columns`: proyección de src/columnar.py si --input
+        es Parquet / Arrow; con JSON se carga todo.
+        """
+        if self.kind == "local":
+            return HeroDataset(load_heroes_local(self.args.input, rules=self.rules,
+                                                 snapshot=self.args.snapshot, columns=columns))
+        return HeroDataset(self.heroes())
+
+
+# --- SALIDAS ---
+def _output_format(path: Optional[str], fmt: Optional[str], default: str) -> str:
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path or "")[1].lstrip(".").lower()
+    return extension if extension in EXPORT_FORMATS else default
+
+
+@contextlib.contextmanager
+def _open_output(path: Optional[str], out: TextIO):
+    """--output (o stdout si es None / "-"), sin dejar ficheros a medias."""
+    if path in (None, "-"):
+        yield out
+        return
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            yield f
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def write_records(records: Iterable[Dict], fields: List[str], fmt: str, stream: TextIO) -> int:
+    """Escribe registros planos como csv, json o jsonl (en streaming). Devuelve cuántos."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+        for record in records:
+            writer.writerow({k: "; ".join(v) if isinstance(v, list) else v for k, v in record.items()})
+            count += 1
+    elif fmt == "jsonl":
+        for record in records:
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    elif fmt == "json":
+        stream.write("[")
+        for record in records:
+            stream.write(("," if count else "") + "\n  " + json.dumps(record, ensure_ascii=False))
+            count += 1
+        stream.write("\n]\n")
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    return count
+
+
+HERO_FIELDS = ["id", "name", "slug", *STAT_FIELDS, "full_name", "aliases", "publisher", "alignment",
+               "gender", "race", "height", "weight", "eye_color", "hair_color", "place_of_birth",
+               "first_appearance", "image"]
+
+
+def hero_record(hero: Hero) -> Dict:
+    """Héroe -> registro plano (las listas se conservan: aliases, height, weight)."""
+    ps, bio, app = hero.powerstats, hero.biography, hero.appearance
+    record = {"id": hero.id, "name": hero.name, "slug": hero.slug}
+    record.update({stat: getattr(ps, stat, 0) if ps else 0 for stat in STAT_FIELDS})
+    record.update({
+        "full_name": bio.fullName, "aliases": list(bio.aliases or []), "publisher": bio.publisher,
+        "alignment": bio.alignment, "gender": app.gender, "race": app.race,
+        "height": list(app.height or []), "weight": list(app.weight or []),
+        "eye_color": app.eyeColor, "hair_color": app.hairColor, "place_of_birth": bio.placeOfBirth,
+        "first_appearance": bio.firstAppearance, "image": (hero.images or {}).get("lg", ""),
+    })
+    return record
+
+
+# --- COMANDOS ---
+def cmd_fetch(args, source: Source, out: TextIO) -> int:
+    """Descarga al almacén local los IDs que faltan o han caducado (todos con --force)."""
+    if source.kind not in ("api", "mock"):
+        print("❌ fetch necesita --source api o mock.")
+        return 2
+    cache = source.cache()
+    if cache is None:
+        print("❌ Con --source mock indica --cache (el almacén real no se mezcla con datos sintéticos).")
+        return 2
+    ids = source.ids
+    missing = ids if args.force else cache.stale_ids(ids)
+    if not missing:
+        print(f"🗄️ Almacén al día: {len(ids)} IDs vigentes en {cache.path}.")
+        return 0
+
+    result = fetch_heroes(missing, source.fetcher())
+    cache.put_many(result.heroes.values())
+    cache.put_not_found(result.not_found)
+    failed = len(result.failures) - len(result.not_found)
+    out.write(json.dumps({"requested": len(missing), "fetched": len(result.heroes),
+                          "not_found": len(result.not_found), "failed": failed,
+                          "retries": result.retries, "cache": str(cache.path)}) + "\n")
+    return 1 if failed else 0
+
+
+def cmd_validate(args, source: Source, out: TextIO) -> int:
+    """Valida la fuente registro a registro y muestra el informe de descartes."""
+    report = RejectReport()
+    for _ in source.heroes(report):
+        pass
+    if args.json:
+        out.write(json.dumps(report.to_dict(), ensure_ascii=False) + "\n")
+    else:
+        out.write(report.summary() + "\n")
+    return 0 if report.accepted else 1
+
+
+def _rankings(dataset: HeroDataset, stats: Iterable[str], criteria: Iterable[str], k: int):
+    """(stat, criterio, prefijo, héroes) para cada combinación pedida."""
+    for stat in stats:
+        for criterion in criteria:
+            yield stat, criterion, ranking_title(criterion, k), rank_by_criterion(dataset, stat, criterion, k)
+
+
+def cmd_rank(args, source: Source, out: TextIO) -> int:
+    """Rankings de todas las stats y criterios (o los indicados)."""
+    fmt = _output_format(args.output, args.format, "text")
+    if fmt not in RANK_FORMATS:
+        print(f"❌ rank no admite el formato {fmt} (opciones: {', '.join(RANK_FORMATS)}).")
+        return 2
+    if fmt == "parquet" and args.output in (None, "-"):
+        print("❌ parquet necesita --output.")
+        return 2
+    dataset = source.load(columns="stats")
+    rankings = list(_rankings(dataset, args.stats, args.criteria, args.k))
+
+    if fmt == "text":
+        with _open_output(args.output, out) as stream:
+            for stat, criterion, prefix, heroes in rankings:
+                stream.write(f"\n🏆 {prefix} - {STAT_LABELS[stat]}\n")
+                for position, hero in enumerate(heroes, 1):
+                    stream.write(f"   #{position:<3}{hero.name:<30}{getattr(hero.powerstats, stat, 0):>4}\n")
+        return 0
+
+    records = ({"stat": stat, "criterion": criterion, "position": position, "id": hero.id,
+                "name": hero.name, "value": getattr(hero.powerstats, stat, 0)}
+               for stat, criterion, _, heroes in rankings for position, hero in enumerate(heroes, 1))
+    fields = ["stat", "criterion", "position", "id", "name", "value"]
+    if fmt == "parquet":
+        try:
+            count = write_parquet_records(args.output, records, fields)
+        except ImportError as e:
+            print(f"❌ {e}")
+            return 2
+    else:
+        with _open_output(args.output, out) as stream:
+            count = write_records(records, fields, fmt, stream)
+    print(f"✅ {count} filas de ranking ({len(rankings)} rankings).")
+    return 0
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", text).strip("-") or "hero"
+
+
+def _render_batch(jobs: List[Tuple], theme: str, fmt: str) -> int:
+    """Unidad de trabajo del pool: renderiza y escribe un lote de gráficas."""
+    for kind, payload, path in jobs:
+        if kind == "top":
+            fig = plots.plot_top_heroes(*payload, theme=theme)
+        else:
+            fig = plots.plot_hero_radar(payload, theme)
+        if fig is None:
+            continue
+        data = plots.figure_to_bytes(fig, fmt)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return len(jobs)
+
+
+def cmd_render(args, source: Source, out: TextIO) -> int:
+    """Renderiza los rankings y/o los radares a ficheros, en un pool de --jobs procesos."""
+    dataset = source.load()
+    batches: List[List[Tuple]] = []
+
+    if "rankings" in args.what:
+        directory = os.path.join(args.out_dir, "rankings")
+        os.makedirs(directory, exist_ok=True)
+        jobs = [("top", (heroes, stat, prefix, STAT_LABELS[stat]),
+                 os.path.join(directory, f"{stat}-{criterion}.{args.format}"))
+                for stat, criterion, prefix, heroes in _rankings(dataset, STAT_FIELDS, RANKING_CRITERIA, 10)
+                if heroes]
+        batches.extend([job] for job in jobs)
+    if "radars" in args.what:
+        directory = os.path.join(args.out_dir, "radars")
+        os.makedirs(directory, exist_ok=True)
+        jobs = [("radar", hero, os.path.join(directory, f"{hero.id}-{_safe_name(hero.slug or hero.name)}.{args.format}"))
+                for hero in dataset]
+        batches.extend(jobs[i:i + RENDER_BATCH_SIZE] for i in range(0, len(jobs), RENDER_BATCH_SIZE))
+
+    total = sum(len(batch) for batch in batches)
+    print(f"🎨 Renderizando {total} gráficas con {args.jobs} proceso(s)...")
+    failures = 0
+    if args.jobs <= 1:
+        plots._init_render_worker()
+        for batch in batches:
+            _render_batch(batch, args.theme, args.format)
+    else:
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs, mp_context=context,
+                                                    initializer=plots._init_render_worker) as executor:
+            futures = [executor.submit(_render_batch, batch, args.theme, args.format) for batch in batches]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"⚠️ Error renderizando un lote: {e}")
+    out.write(json.dumps({"charts": total, "failed_batches": failures, "out_dir": args.out_dir}) + "\n")
+    return 1 if failures else 0
+
+
+def cmd_export(args, source: Source, out: TextIO) -> int:
+    """Exporta los héroes válidos en streaming (Parquet / Arrow por lotes de filas)."""
+    fmt = _output_format(args.output, args.format, "jsonl")
+
+    if fmt in COLUMNAR_EXPORTS:
+        if args.output in (None, "-"):
+            print(f"❌ {fmt} necesita --output.")
+            return 2
+        try:
+            count = write_columnar(args.output, source.heroes(), source.rules, COLUMNAR_EXPORTS[fmt])
+        except ImportError as e:
+            print(f"❌ {e}")
+            return 2
+        print(f"✅ {count} héroes exportados a {args.output} ({fmt}).")
+        return 0
+
+    records = (hero_record(hero) for hero in source.heroes())
+    with _open_output(args.output, out) as stream:
+        count = write_records(records, HERO_FIELDS, fmt, stream)
+    print(f"✅ {count} héroes exportados ({fmt}).")
+    return 0
+
+
+# --- ENTRADA ---
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=SOURCES, default="local")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="volcado local (--source local)")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="guardar / reutilizar el snapshot validado junto a --input (<input>.snap)")
+    parser.add_argument("--cache", help="almacén JSON-lines (por defecto data/heroes_cache.jsonl)")
+    parser.add_argument("--ids", help='IDs a cargar, p. ej. "1-100,250" (fuentes remotas y cache)')
+    parser.add_argument("--rules", default="default", help="perfil de reglas o ruta a un JSON de reglas")
+    parser.add_argument("--concurrency", type=int, default=FetchConfig.concurrency, help="descargas simultáneas")
+    parser.add_argument("--mock-count", type=int, default=731)
+    parser.add_argument("--mock-seed", type=int, default=0)
+    parser.add_argument("--mock-latency", type=float, default=0.0)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("fetch", help="descargar / refrescar el almacén local")
+    fetch.add_argument("--force", action="store_true", help="descargar también los IDs vigentes")
+    fetch.set_defaults(func=cmd_fetch)
+
+    validate = commands.add_parser("validate", help="validar y mostrar el informe de descartes")
+    validate.add_argument("--json", action="store_true")
+    validate.set_defaults(func=cmd_validate)
+
+    rank = commands.add_parser("rank", help="rankings de todas las stats y criterios")
+    rank.add_argument("--stats", nargs="+", choices=STAT_FIELDS, default=list(STAT_FIELDS))
+    rank.add_argument("--criteria", nargs="+", choices=list(RANKING_CRITERIA), default=list(RANKING_CRITERIA))
+    rank.add_argument("-k", type=int, default=10)
+    rank.add_argument("--output")
+    rank.add_argument("--format", choices=RANK_FORMATS)
+    rank.set_defaults(func=cmd_rank)
+
+    render = commands.add_parser("render", help="renderizar gráficas a ficheros")
+    render.add_argument("--out-dir", default="charts")
+    render.add_argument("--what", nargs="+", choices=("rankings", "radars"), default=["rankings", "radars"])
+    render.add_argument("--format", choices=("png", "svg"), default="png")
+    render.add_argument("--theme", choices=list(plots.THEMES), default=plots.DEFAULT_THEME)
+    render.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="procesos del pool de render")
+    render.set_defaults(func=cmd_render)
+
+    export = commands.add_parser("export", help="exportar los héroes válidos")
+    export.add_argument("--output")
+    export.add_argument("--format", choices=EXPORT_FORMATS)
+    export.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics.configure_from_env()
+    out = sys.stdout
+    # Todo lo que imprimen los módulos (progreso, avisos) va a stderr
+    with contextlib.redirect_stdout(sys.stderr), Source(args) as source:
+        return args.func(args, source, out)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero, PowerStats, Appearance, Biography, STAT_FIELDS
+    from src.rules import DEFAULT_RULES, RuleBatch, RuleSet
+except ImportError:
+    from models import Hero, PowerStats, Appearance, Biography, STAT_FIELDS
+    from rules import DEFAULT_RULES, RuleBatch, RuleSet
+
+# pyarrow es opcional: solo se importa al leer o escribir estos formatos
+# (ver _pyarrow), así que importar este módulo no lo requiere.
+
+# Extensión -> formato (Parquet o Arrow IPC en fichero)
+SUFFIXES = {".parquet": "parquet", ".arrow": "ipc", ".ipc": "ipc", ".feather": "ipc"}
+FORMAT_VERSION = 1
+METADATA_KEY = b"superhero"
+
+# Columnas del fichero, por tipo
+TEXT_COLUMNS = ("name", "slug", "full_name", "alter_egos", "place_of_birth", "first_appearance")
+CATEGORY_COLUMNS = ("publisher", "alignment", "gender", "race", "eye_color", "hair_color")
+LIST_COLUMNS = ("aliases", "height", "weight")
+COLUMNS = ("id", *STAT_FIELDS, *TEXT_COLUMNS, *CATEGORY_COLUMNS, *LIST_COLUMNS, "images")
+
+# Proyecciones habituales: solo se leen (y se decodifican) estas columnas
+PROJECTIONS = {
+    "stats": ("id", "name", *STAT_FIELDS),
+    "analytics": ("id", "name", *STAT_FIELDS, "publisher", "alignment", "race", "gender"),
+}
+
+# Filas por lote al escribir y al leer en streaming
+BATCH_SIZE = 50_000
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet / Arrow necesitan pyarrow (pip install pyarrow).") from e
+    return pyarrow
+
+
+def columnar_format(path: str) -> Optional[str]:
+    """"parquet" / "ipc" según la extensión de `path`; None si no es columnar."""
+    return SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+def is_columnar(path: str) -> bool:
+    return columnar_format(path) is not None
+
+
+def schema(rules: Optional[str] = None):
+    """
+    Esquema del dataset: stats como int16, categorías con codificación
+    diccionario y aliases / height / weight como listas anidadas.
+    """
+    pa = _pyarrow()
+    category = pa.dictionary(pa.int32(), pa.string())
+    fields = [pa.field("id", pa.int64(), nullable=False)]
+    fields += [pa.field(stat, pa.int16(), nullable=False) for stat in STAT_FIELDS]
+    fields += [pa.field(name, pa.string()) for name in TEXT_COLUMNS]
+    fields += [pa.field(name, category) for name in CATEGORY_COLUMNS]
+    fields += [pa.field(name, pa.list_(pa.string())) for name in LIST_COLUMNS]
+    fields.append(pa.field("images", pa.map_(pa.string(), pa.string())))
+    metadata = {"format_version": FORMAT_VERSION, "rules": rules}
+    return pa.schema(fields, metadata={METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+
+
+# --- ESCRITURA ---
+def _record_batch(heroes: Sequence[Hero], target, dictionaries: Dict[str, Dict[str, int]]):
+    """
+    Lote de héroes -> RecordBatch. `dictionaries` (columna -> valor -> código)
+    se comparte entre lotes: cada lote solo añade valores al final del
+    diccionario, que es lo que admite Arrow IPC en fichero (deltas).
+    """
+    pa = _pyarrow()
+    columns: Dict[str, object] = {"id": [h.id for h in heroes]}
+    stats = np.array([(h.powerstats.intelligence, h.powerstats.strength, h.powerstats.speed,
+                       h.powerstats.durability, h.powerstats.power, h.powerstats.combat)
+                      if h.powerstats else (0,) * len(STAT_FIELDS) for h in heroes],
+                     dtype=np.int16).reshape(-1, len(STAT_FIELDS))
+    for col, stat in enumerate(STAT_FIELDS):
+        columns[stat] = stats[:, col]
+    bios = [h.biography for h in heroes]
+    apps = [h.appearance for h in heroes]
+    columns.update({
+        "name": [h.name for h in heroes], "slug": [h.slug for h in heroes],
+        "full_name": [b.fullName for b in bios], "alter_egos": [b.alterEgos for b in bios],
+        "place_of_birth": [b.placeOfBirth for b in bios], "first_appearance": [b.firstAppearance for b in bios],
+        "publisher": [b.publisher for b in bios], "alignment": [b.alignment for b in bios],
+        "gender": [a.gender for a in apps], "race": [a.race for a in apps],
+        "eye_color": [a.eyeColor for a in apps], "hair_color": [a.hairColor for a in apps],
+        "aliases": [b.aliases for b in bios], "height": [a.height for a in apps], "weight": [a.weight for a in apps],
+        "images": [list((h.images or {}).items()) for h in heroes],
+    })
+    arrays = []
+    for field in target:
+        if pa.types.is_dictionary(field.type):
+            codes = dictionaries.setdefault(field.name, {})
+            indices = [None if value is None else codes.setdefault(value, len(codes))
+                       for value in columns[field.name]]
+            arrays.append(pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()),
+                                                         pa.array(list(codes), type=pa.string())))
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=target)
+
+
+def write_columnar(path: str, heroes: Iterable[Hero], rules: Optional[RuleSet] = DEFAULT_RULES,
+                   fmt: Optional[str] = None, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Escribe el dataset validado en Parquet o Arrow IPC (`fmt`, o según la
+    extensión) por lotes de `batch_size` filas, así que `heroes` puede ser
+    un iterador. `rules` (las reglas con las que se validó) queda en los
+    metadatos; el lector solo las vuelve a aplicar si le piden otras.
+    Escritura atómica. Devuelve cuántos héroes se escribieron.
+    """
+    fmt = fmt or columnar_format(path)
+    if fmt not in ("parquet", "ipc"):
+        raise ValueError(f"Extensión no columnar: {path} (usa {', '.join(SUFFIXES)})")
+    pa = _pyarrow()
+    target = schema(rules.fingerprint() if rules is not None else None)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    dictionaries: Dict[str, Dict[str, int]] = {}
+    try:
+        # El constructor ya crea el .tmp: si falla, también hay que borrarlo
+        if fmt == "parquet":
+            writer = pa.parquet.ParquetWriter(tmp_path, target, compression="zstd")
+        else:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            writer = pa.ipc.new_file(tmp_path, target, options=options)
+        try:
+            batch: List[Hero] = []
+            for hero in heroes:
+                batch.append(hero)
+                if len(batch) >= batch_size:
+                    writer.write_batch(_record_batch(batch, target, dictionaries))
+                    count += len(batch)
+                    batch = []
+            if batch or not count:
+                writer.write_batch(_record_batch(batch, target, dictionaries))
+                count += len(batch)
+        finally:
+            writer.close()
+    except BaseException:
+        _remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
+
+
+def write_parquet_records(path: str, records: Iterable[Dict], fields: Sequence[str]) -> int:
+    """
+    Registros planos (p. ej. filas de ranking) -> Parquet con las columnas
+    `fields`, tipos inferidos por pyarrow. Escritura atómica. Devuelve cuántos.
+    """
+    pa = _pyarrow()
+    rows = list(records)
+    table = pa.table({name: [row.get(name) for row in rows] for name in fields})
+    tmp_path = f"{path}.tmp"
+    try:
+        pa.parquet.write_table(table, tmp_path, compression="zstd")
+    except BaseException:
+        _remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# --- LECTURA ---
+def read_metadata(path: str) -> Dict:
+    """Metadatos del fichero (versión de formato y huella de las reglas)."""
+    pa = _pyarrow()
+    if columnar_format(path) == "parquet":
+        file_schema = pa.parquet.read_schema(path)
+    else:
+        with pa.memory_map(path) as source:
+            file_schema = pa.ipc.open_file(source).schema
+    raw = (file_schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def _projection(columns: Optional[Sequence[str]]) -> List[str]:
+    if columns is None:
+        return list(COLUMNS)
+    if isinstance(columns, str):
+        columns = PROJECTIONS[columns]
+    unknown = set(columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Columnas desconocidas: {', '.join(sorted(unknown))}")
+    # id y stats siempre: sin ellos no hay héroe
+    return list(dict.fromkeys(["id", *STAT_FIELDS, *columns]))
+
+
+def iter_batches(path: str, columns: Optional[Sequence[str]] = None, batch_size: int = BATCH_SIZE):
+    """
+    Lotes (pyarrow.RecordBatch) con solo las columnas pedidas: en Parquet
+    el resto ni se lee del disco; en Arrow IPC el fichero se abre con mmap.
+    """
+    pa = _pyarrow()
+    names = _projection(columns)
+    if columnar_format(path) == "parquet":
+        yield from pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size, columns=names)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).select(names)
+
+
+def read_stats(path: str):
+    """(ids, nombres, matriz de stats int16 (N, 6)) leyendo solo esas columnas."""
+    pa = _pyarrow()
+    names = _projection(PROJECTIONS["stats"])
+    if columnar_format(path) == "parquet":
+        table = pa.parquet.read_table(path, columns=names)
+    else:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all().select(names)
+    stats = np.column_stack([table.column(stat).to_numpy() for stat in STAT_FIELDS]).astype(np.int16)
+    return table.column("id").to_numpy(), table.column("name").to_pylist(), stats
+
+
+def _column(batch, name: str, default=None) -> list:
+    index = batch.schema.get_field_index(name)
+    if index < 0:
+        return [default] * batch.num_rows
+    return batch.column(index).to_pylist()
+
+
+def heroes_from_batch(batch) -> List[Hero]:
+    """
+    Lote -> objetos Hero. Las columnas no proyectadas quedan vacías ("",
+    None o listas vacías): suficiente para rankings y analítica.
+    """
+    n = batch.num_rows
+    stats = np.column_stack([batch.column(batch.schema.get_field_index(stat)).to_numpy(zero_copy_only=False)
+                             for stat in STAT_FIELDS]).tolist() if n else []
+    text = {name: _column(batch, name, "") for name in TEXT_COLUMNS}
+    categories = {name: _column(batch, name, "") for name in CATEGORY_COLUMNS}
+    categories["publisher"] = _column(batch, "publisher")
+    categories["race"] = _column(batch, "race")
+    lists = {name: _column(batch, name) for name in LIST_COLUMNS}
+    images = _column(batch, "images")
+
+    heroes = []
+    for i, hero_id in enumerate(_column(batch, "id")):
+        heroes.append(Hero(
+            id=hero_id, name=text["name"][i], slug=text["slug"][i],
+            powerstats=PowerStats(*stats[i]),
+            appearance=Appearance(categories["gender"][i], categories["race"][i],
+                                  lists["height"][i] or [], lists["weight"][i] or [],
+                                  categories["eye_color"][i], categories["hair_color"][i]),
+            biography=Biography(text["full_name"][i], text["alter_egos"][i], lists["aliases"][i] or [],
+                                text["place_of_birth"][i], text["first_appearance"][i],
+                                categories["publisher"][i], categories["alignment"][i]),
+            images=dict(images[i]) if images[i] else {},
+        ))
+    return heroes
+
+
+def _batch_mask(batch, rules: RuleSet, report) -> np.ndarray:
+    """Filas del lote que cumplen `rules` (evaluación vectorizada sobre las columnas)."""
+    stats = np.column_stack([batch.column(batch.schema.get_field_index(stat)).to_numpy(zero_copy_only=False)
+                             for stat in STAT_FIELDS])
+    result = rules.evaluate(RuleBatch.from_columns(stats, _column(batch, "publisher")))
+    if report is not None:
+        report.total += batch.num_rows
+        report.accepted += int(result.mask.sum())
+        report.by_rule.update(result.counts())
+    return result.mask
+
+
+def iter_heroes_columnar(path: str, columns: Optional[Sequence[str]] = None, report=None,
+                         rules: Optional[RuleSet] = DEFAULT_RULES) -> Iterator[Hero]:
+    """
+    Héroes de un fichero Parquet / Arrow IPC, lote a lote y sin parsear
+    JSON. Si el fichero se validó con otras reglas que `rules`, se vuelven
+    a aplicar (vectorizadas; la proyección incluye entonces el publisher).
+    """
+    stored = read_metadata(path).get("rules")
+    recheck = rules is not None and stored != rules.fingerprint()
+    names = _projection(columns)
+    if recheck and "publisher" not in names:
+        names.append("publisher")
+    for batch in iter_batches(path, names):
+        if recheck:
+            batch = batch.filter(_batch_mask(batch, rules, report))
+        elif report is not None:
+            report.total += batch.num_rows
+            report.accepted += batch.num_rows
+        yield from heroes_from_batch(batch)
+
+
+def load_heroes_columnar(path: str, columns: Optional[Sequence[str]] = None, report=None,
+                         rules: Optional[RuleSet] = DEFAULT_RULES) -> List[Hero]:
+    return list(iter_heroes_columnar(path, columns, report, rules))
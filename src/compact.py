@@ -0,0 +1,210 @@
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero, PowerStats, Appearance, Biography, STAT_FIELDS
+except ImportError:
+    from models import Hero, PowerStats, Appearance, Biography, STAT_FIELDS
+
+# Campos de texto con pocos valores distintos: se guardan como códigos (diccionario)
+CATEGORY_FIELDS = ("publisher", "alignment", "gender", "race", "eyeColor", "hairColor")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class CompactHeroStore:
+    """
+    Almacén compacto de héroes (modo de bajo consumo de memoria).
+
+    - Las 6 stats de todos los héroes viven en un único `array('B')`
+      (6 bytes por héroe); `stats_matrix()` las expone como matriz NumPy
+      sin copiar.
+    - publisher / alignment / gender / race / colores se codifican como
+      índices `array('H')` sobre una tabla de categorías.
+    - El resto de textos se guardan en una tupla por héroe, con cadenas
+      internadas para compartir las repetidas ("-", "No alter egos found.").
+
+    Indexar el almacén devuelve un HeroView: un objeto ligero con la misma
+    interfaz de lectura que Hero (powerstats, biography, appearance...).
+    """
+
+    def __init__(self, heroes: Iterable[Hero] = ()):
+        self.stats = array('B')
+        self.ids = array('q')
+        self.names: List[str] = []
+        self.codes: Dict[str, array] = {field: array('H') for field in CATEGORY_FIELDS}
+        self.categories: Dict[str, List] = {field: [] for field in CATEGORY_FIELDS}
+        self._lookup: Dict[str, Dict] = {field: {} for field in CATEGORY_FIELDS}
+        # (slug, fullName, alterEgos, aliases, placeOfBirth, firstAppearance, height, weight, images)
+        self._details: List[tuple] = []
+        for hero in heroes:
+            self.append(hero)
+
+    @classmethod
+    def from_heroes(cls, heroes: Iterable[Hero]) -> "CompactHeroStore":
+        return cls(heroes)
+
+    def _encode(self, field: str, value) -> int:
+        lookup = self._lookup[field]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.categories[field])
+            self.categories[field].append(value)
+        return code
+
+    def append(self, hero: Hero):
+        ps, bio, app = hero.powerstats, hero.biography, hero.appearance
+        self.stats.extend(min(max(getattr(ps, f, 0) or 0, 0), 255) for f in STAT_FIELDS)
+        self.ids.append(hero.id)
+        self.names.append(hero.name)
+
+        values = {
+            "publisher": bio.publisher, "alignment": bio.alignment,
+            "gender": app.gender, "race": app.race,
+            "eyeColor": app.eyeColor, "hairColor": app.hairColor,
+        }
+        for field, value in values.items():
+            self.codes[field].append(self._encode(field, value))
+
+        self._details.append((
+            _intern(hero.slug), _intern(bio.fullName), _intern(bio.alterEgos),
+            tuple(_intern(a) for a in bio.aliases or ()),
+            _intern(bio.placeOfBirth), _intern(bio.firstAppearance),
+            tuple(_intern(v) for v in app.height or ()), tuple(_intern(v) for v in app.weight or ()),
+            tuple((_intern(k), v) for k, v in (hero.images or {}).items()),
+        ))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, row: int) -> "HeroView":
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return HeroView(self, row)
+
+    def __iter__(self) -> Iterator["HeroView"]:
+        return (HeroView(self, row) for row in range(len(self)))
+
+    def category(self, field: str, row: int):
+        return self.categories[field][self.codes[field][row]]
+
+    def stats_matrix(self):
+        """Matriz (N, 6) uint8 que comparte memoria con el array de stats."""
+        import numpy as np
+        return np.frombuffer(self.stats, dtype=np.uint8).reshape(-1, len(STAT_FIELDS))
+
+    def to_hero(self, row: int) -> Hero:
+        """Materializa un Hero completo (p. ej. para serializarlo)."""
+        view = self[row]
+        ps, bio, app = view.powerstats, view.biography, view.appearance
+        return Hero(
+            id=view.id, name=view.name, slug=view.slug,
+            powerstats=PowerStats(*(getattr(ps, f) for f in STAT_FIELDS)),
+            appearance=Appearance(app.gender, app.race, list(app.height), list(app.weight),
+                                  app.eyeColor, app.hairColor),
+            biography=Biography(bio.fullName, bio.alterEgos, list(bio.aliases), bio.placeOfBirth,
+                                bio.firstAppearance, bio.publisher, bio.alignment),
+            images=dict(view.images),
+        )
+
+
+# --- VISTAS LIGERAS ---
+class PowerStatsView:
+    __slots__ = ("_stats", "_base")
+
+    def __init__(self, stats: array, row: int):
+        self._stats = stats
+        self._base = row * len(STAT_FIELDS)
+
+    def __repr__(self):
+        values = ", ".join(f"{f}={getattr(self, f)}" for f in STAT_FIELDS)
+        return f"PowerStatsView({values})"
+
+
+def _stat_property(offset: int):
+    return property(lambda self: self._stats[self._base + offset])
+
+
+for _offset, _field in enumerate(STAT_FIELDS):
+    setattr(PowerStatsView, _field, _stat_property(_offset))
+
+
+class BiographyView:
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: CompactHeroStore, row: int):
+        self._store = store
+        self._row = row
+
+    fullName = property(lambda self: self._store._details[self._row][1])
+    alterEgos = property(lambda self: self._store._details[self._row][2])
+    aliases = property(lambda self: self._store._details[self._row][3])
+    placeOfBirth = property(lambda self: self._store._details[self._row][4])
+    firstAppearance = property(lambda self: self._store._details[self._row][5])
+    publisher = property(lambda self: self._store.category("publisher", self._row))
+    alignment = property(lambda self: self._store.category("alignment", self._row))
+
+
+class AppearanceView:
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: CompactHeroStore, row: int):
+        self._store = store
+        self._row = row
+
+    gender = property(lambda self: self._store.category("gender", self._row))
+    race = property(lambda self: self._store.category("race", self._row))
+    height = property(lambda self: self._store._details[self._row][6])
+    weight = property(lambda self: self._store._details[self._row][7])
+    eyeColor = property(lambda self: self._store.category("eyeColor", self._row))
+    hairColor = property(lambda self: self._store.category("hairColor", self._row))
+
+
+class HeroView:
+    """Vista de solo lectura sobre una fila de CompactHeroStore (interfaz de Hero)."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: CompactHeroStore, row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def id(self) -> int:
+        return self._store.ids[self._row]
+
+    @property
+    def name(self) -> str:
+        return self._store.names[self._row]
+
+    @property
+    def slug(self) -> str:
+        return self._store._details[self._row][0]
+
+    @property
+    def images(self) -> Dict[str, str]:
+        return dict(self._store._details[self._row][8])
+
+    @property
+    def powerstats(self) -> PowerStatsView:
+        return PowerStatsView(self._store.stats, self._row)
+
+    @property
+    def biography(self) -> BiographyView:
+        return BiographyView(self._store, self._row)
+
+    @property
+    def appearance(self) -> AppearanceView:
+        return AppearanceView(self._store, self._row)
+
+    def validate_hero(self) -> bool:
+        # Mismas reglas que Hero.validate_hero (solo lee atributos)
+        return Hero.validate_hero(self)
+
+    def __repr__(self):
+        return f"HeroView(id={self.id}, name={self.name!r})"
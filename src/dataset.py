@@ -0,0 +1,102 @@
+import itertools
+from typing import Dict, Iterable, List, Optional
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero
+    from src.table import HeroTable
+    from src.indexes import SortedStatIndex
+    from src.search import HeroNameIndex
+except ImportError:
+    from models import Hero
+    from table import HeroTable
+    from indexes import SortedStatIndex
+    from search import HeroNameIndex
+
+# Versiones únicas en todo el proceso: un dataset nuevo nunca repite la
+# versión de otro (las cachés por versión distinguen también los reemplazos)
+_versions = itertools.count()
+
+
+class HeroDataset:
+    """
+    Dataset cargado en memoria junto con sus estructuras derivadas:
+    - heroes: lista en orden de llegada.
+    - index: órdenes precalculados por estadística (se mantienen al añadir/refrescar).
+    - table: vista columnar NumPy (se reconstruye bajo demanda tras un cambio).
+    - name_index: índice de búsqueda por nombre/alias (bajo demanda).
+
+    `version` cambia con cada modificación, para invalidar cachés (y es
+    distinta entre datasets, ver _versions).
+
+    Si `heroes` viene de un snapshot (SnapshotHeroes), se reutilizan sus
+    órdenes precalculados y su columna de stats (mmap, sin copia).
+    """
+
+    def __init__(self, heroes: Iterable[Hero] = ()):
+        self._heroes: Dict[int, Hero] = {}
+        for hero in heroes:
+            self._heroes[hero.id] = hero
+        snapshot = getattr(heroes, "snapshot", None)
+        # Con IDs repetidos las filas del snapshot ya no coinciden con el dataset
+        if snapshot is not None and len(snapshot) != len(self._heroes):
+            snapshot = None
+
+        self.index = SortedStatIndex(self._heroes.values(), snapshot.index_orders() if snapshot else None)
+        self._table: Optional[HeroTable] = None
+        if snapshot is not None:
+            self._table = HeroTable(self._heroes.values(), stats=snapshot.stats)
+        self._name_index: Optional[HeroNameIndex] = None
+        self.version = next(_versions)
+
+    @property
+    def heroes(self) -> List[Hero]:
+        return list(self._heroes.values())
+
+    @property
+    def table(self) -> HeroTable:
+        if self._table is None:
+            self._table = HeroTable.from_heroes(self._heroes.values())
+        return self._table
+
+    @property
+    def name_index(self) -> HeroNameIndex:
+        if self._name_index is None:
+            self._name_index = HeroNameIndex(self._heroes.values())
+        return self._name_index
+
+    def _invalidate(self):
+        """Descarta las estructuras derivadas que se reconstruyen bajo demanda."""
+        self._table = None
+        self._name_index = None
+        self.version = next(_versions)
+
+    def get(self, hero_id: int) -> Optional[Hero]:
+        return self._heroes.get(hero_id)
+
+    def __len__(self) -> int:
+        return len(self._heroes)
+
+    def __iter__(self):
+        return iter(self._heroes.values())
+
+    # --- ACTUALIZACIONES INCREMENTALES ---
+    def upsert(self, heroes: Iterable[Hero]):
+        """Añade héroes nuevos o refresca los existentes (mismo ID)."""
+        changed = False
+        for hero in heroes:
+            # Un dict conserva la posición original al reasignar una clave existente
+            self._heroes[hero.id] = hero
+            self.index.upsert(hero)
+            changed = True
+        if changed:
+            self._invalidate()
+
+    def remove(self, hero_ids: Iterable[int]):
+        changed = False
+        for hero_id in hero_ids:
+            if self._heroes.pop(hero_id, None) is not None:
+                self.index.remove(hero_id)
+                changed = True
+        if changed:
+            self._invalidate()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+def _png(width: int = 64, height: int = 64, rgb=(200, 30, 30)) -> bytes:
+    """PNG liso de un color, sin dependencias externas."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\0" + bytes(rgb) * width
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * height))
+            + chunk(b"IEND", b""))
+
+
+class FakeImageAPI:
+    """
+    Endpoint local que imita al de generación de imágenes de Azure OpenAI,
+    para desarrollar y probar sin credenciales ni red:
+
+    - POST (cualquier ruta) -> {"data": [{"url": ".../images/<n>.png"}]}
+    - GET /images/<n>.png   -> un PNG (la "URL temporal" de Azure)
+
+    `delay` simula lo que tarda la generación; con `reject=True` responde 400
+    como el filtro de contenidos. `requests` cuenta las generaciones pedidas.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 delay: float = 0.0, reject: bool = False):
+        self.delay = delay
+        self.reject = reject
+        self.requests = 0
+        self.image = _png()
+        self._lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                number = api._count()
+                time.sleep(api.delay)
+                if api.reject:
+                    error = {"error": {"code": "content_policy_violation"}}
+                    self._send(400, json.dumps(error).encode("utf-8"), "application/json")
+                    return
+                url = f"{api.url}/images/{number}.png"
+                body = json.dumps({"created": int(time.time()), "data": [{"url": url}]})
+                self._send(200, body.encode("utf-8"), "application/json")
+
+            def do_GET(self):
+                if self.path.startswith("/images/"):
+                    self._send(200, api.image, "image/png")
+                else:
+                    self._send(404, b"", "text/plain")
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    def _count(self) -> int:
+        """Cuenta una generación (los handlers corren en hilos distintos)."""
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeImageAPI":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-image-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Endpoint falso de generación de imágenes.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=2.0)
+    parser.add_argument("--reject", action="store_true")
+    args = parser.parse_args()
+
+    api = FakeImageAPI(port=args.port, delay=args.delay, reject=args.reject)
+    print(f"🧪 Endpoint falso en {api.url} (OPENAI_IMAGE_ENDPOINT={api.url}/generate)")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        api.stop()
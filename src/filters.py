@@ -1,80 +1,170 @@
-from typing import List
+from typing import Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
 # Bloque de importación seguro para evitar errores de ruta
 try:
     from src.models import Hero
+    from src.table import HeroTable, top_k_rows
+    from src.dataset import HeroDataset
+    from src import metrics
 except ImportError:
     from models import Hero
+    from table import HeroTable, top_k_rows
+    from dataset import HeroDataset
+    import metrics
+
+# Los rankings aceptan la lista de héroes, la tabla columnar o el dataset indexado
+HeroData = Union[Sequence[Hero], HeroTable, HeroDataset]
+# Una stat ("strength") o una combinación ponderada ({"strength": 2, "speed": 1})
+ScoreSpec = Union[str, Mapping[str, float]]
+# Pre-filtro categórico: un valor o varios
+CategoryFilter = Optional[Union[str, Iterable[str]]]
+
+TIE_BREAKS = ("order", "id", "name")
+
+def _as_table(heroes: HeroData) -> HeroTable:
+    """Reutiliza la tabla si ya existe; si recibimos una lista, la construimos."""
+    if isinstance(heroes, HeroTable):
+        return heroes
+    if isinstance(heroes, HeroDataset):
+        return heroes.table
+    return HeroTable.from_heroes(heroes)
+
+def _score(table: HeroTable, by: ScoreSpec):
+    """
+    Devuelve (puntuación, filas válidas, suma de pesos) para una stat o
+    una combinación ponderada. Una fila es válida si todas las stats
+    implicadas son mayores que 0 (misma regla que los top 10 clásicos).
+    """
+    if isinstance(by, str):
+        # Stat individual: mantenemos enteros para que las comparaciones sean exactas
+        values = table.column(by)
+        return values.astype(np.int32), values > 0, 1.0
+
+    weights = dict(by)
+    if not weights:
+        raise ValueError("Se necesita al menos una estadística para puntuar.")
+    if any(weight < 0 for weight in weights.values()) or sum(weights.values()) <= 0:
+        # Con pesos negativos o de suma 0, score / total_weight (balanced) no tiene sentido
+        raise ValueError("Los pesos deben ser no negativos y sumar más de 0.")
 
-def _get_stat_value(hero: Hero, stat: str) -> int:
-    """Función auxiliar para obtener el valor de una estadística de forma segura."""
-    # Como powerstats es un Objeto, usamos getattr en lugar de diccionario['clave']
-    if not hero.powerstats:
-        return 0
-    return getattr(hero.powerstats, stat, 0)
-
-def _calculate_average(hero: Hero) -> float:
-    """Calcula el promedio de poder del héroe."""
-    if not hero.powerstats:
-        return 0.0
-    
-    stats = [
-        hero.powerstats.intelligence,
-        hero.powerstats.strength,
-        hero.powerstats.speed,
-        hero.powerstats.durability,
-        hero.powerstats.power,
-        hero.powerstats.combat
-    ]
-    return sum(stats) / len(stats)
-
-def top_10_highest(heroes: List[Hero], stat: str) -> List[Hero]:
+    valid = np.ones(len(table), dtype=bool)
+    score = np.zeros(len(table), dtype=np.float64)
+    for stat, weight in weights.items():
+        values = table.column(stat)
+        valid &= values > 0
+        score += weight * values
+    return score, valid, float(sum(weights.values()))
+
+@metrics.timed("ranking_seconds")
+def top_k(
+    heroes: HeroData,
+    by: ScoreSpec,
+    k: int = 10,
+    descending: bool = True,
+    balanced: bool = False,
+    tie_break: str = "order",
+    publisher: CategoryFilter = None,
+    alignment: CategoryFilter = None,
+    race: CategoryFilter = None,
+) -> List[Hero]:
+    """
+    Punto de entrada único para rankings.
+
+    - by: stat ("strength") o pesos ({"strength": 2, "combat": 1}).
+    - k / descending: tamaño y sentido del ranking.
+    - balanced: ordena por la desviación entre la puntuación (normalizada
+      por los pesos) y el promedio propio del héroe, en lugar de por la
+      puntuación. Con descending=False salen primero los más balanceados.
+    - tie_break: "order" (orden de carga), "id" o "name".
+    - publisher / alignment / race: pre-filtros categóricos.
+
+    Con un HeroDataset, las consultas simples (una stat, sin pre-filtros,
+    desempate por orden de carga) se sirven de sus órdenes precalculados
+    en O(k). El resto usa selección parcial (argpartition) y solo ordena
+    los k candidatos.
+    """
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"tie_break debe ser uno de {TIE_BREAKS}")
+
+    simple = isinstance(by, str) and tie_break == "order" and publisher is None \
+        and alignment is None and race is None
+    if simple and isinstance(heroes, HeroDataset):
+        if balanced:
+            kind = "balanced" if not descending else None
+        else:
+            kind = "desc" if descending else "asc"
+        if kind:
+            return heroes.index.top(by, k, kind)
+
+    table = _as_table(heroes)
+    score, valid, total_weight = _score(table, by)
+
+    for field, values in (("publisher", publisher), ("alignment", alignment), ("race", race)):
+        if values is not None:
+            valid &= table.category_mask(field, values)
+
+    keys = np.abs(score / total_weight - table.averages) if balanced else score
+    if descending:
+        keys = -keys
+
+    tie = None
+    if tie_break == "id":
+        tie = table.ids
+    elif tie_break == "name":
+        tie = table.name_rank
+
+    rows = np.flatnonzero(valid)
+    order = top_k_rows(keys[rows], k, None if tie is None else tie[rows])
+    return table.take(rows[order])
+
+def top_10_highest(heroes: HeroData, stat: str) -> List[Hero]:
     """
     Obtiene los 10 héroes con el valor MÁS ALTO en una estadística específica.
     """
-    # 1. Filtrado: Validamos que tengan la estadística mayor a 0
-    valid_heroes = [
-        h for h in heroes
-        if _get_stat_value(h, stat) > 0
-    ]
-
-    # 2. Ordenamiento Descendente
-    return sorted(
-        valid_heroes,
-        key=lambda h: _get_stat_value(h, stat),
-        reverse=True
-    )[:10]
-
-def top_10_lowest(heroes: List[Hero], stat: str) -> List[Hero]:
+    return top_k(heroes, stat, k=10, descending=True)
+
+def top_10_lowest(heroes: HeroData, stat: str) -> List[Hero]:
     """
     Obtiene los 10 héroes con el valor MÁS BAJO en una estadística específica.
     """
-    valid_heroes = [
-        h for h in heroes
-        if _get_stat_value(h, stat) > 0
-    ]
-
-    # 2. Ordenamiento Ascendente (sin reverse)
-    return sorted(
-        valid_heroes,
-        key=lambda h: _get_stat_value(h, stat)
-    )[:10]
-
-def top_10_balanced(heroes: List[Hero], stat: str) -> List[Hero]:
+    return top_k(heroes, stat, k=10, descending=False)
+
+def top_10_balanced(heroes: HeroData, stat: str) -> List[Hero]:
     """
     Encuentra los héroes cuyo valor en 'stat' está más cerca de su propio promedio.
     """
-    valid_heroes = [
-        h for h in heroes
-        if _get_stat_value(h, stat) > 0
-    ]
+    return top_k(heroes, stat, k=10, descending=False, balanced=True)
+
+# Criterios de ranking clásicos: nombre -> etiqueta del título de la gráfica
+RANKING_CRITERIA = {
+    "highest": "Superior",
+    "lowest": "Inferior",
+    "balanced": "Balanceado",
+}
+
+def ranking_title(criterion: str, k: int = 10) -> str:
+    """Prefijo del título de un ranking: "Top 10 Superior", "Top 3 Inferior"..."""
+    return f"Top {k} {RANKING_CRITERIA[criterion]}"
+
+def rank_by_criterion(heroes: HeroData, stat: str, criterion: str, k: int = 10) -> List[Hero]:
+    """Los `k` héroes de un criterio de RANKING_CRITERIA (top_10_* con k = 10)."""
+    if criterion not in RANKING_CRITERIA:
+        raise KeyError(criterion)
+    return top_k(heroes, stat, k=k, descending=criterion == "highest", balanced=criterion == "balanced")
+
+def stat_range(heroes: HeroData, stat: str, low: int, high: int) -> List[Hero]:
+    """Héroes con low <= stat <= high (y stat > 0), en orden ascendente."""
+    if isinstance(heroes, HeroDataset):
+        return heroes.index.range(stat, low, high)
 
-    # 2. Ordenamiento por menor desviación (abs) respecto a su promedio
-    return sorted(
-        valid_heroes,
-        key=lambda h: abs(_get_stat_value(h, stat) - _calculate_average(h))
-    )[:10]
+    table = _as_table(heroes)
+    values = table.column(stat)
+    rows = np.flatnonzero((values >= max(low, 1)) & (values <= high))
+    return table.take(rows[np.argsort(values[rows], kind="stable")])
 
 # Esta función es necesaria porque app.py la llama genéricamente
-def get_top_heroes(heroes: List[Hero], stat: str) -> List[Hero]:
+def get_top_heroes(heroes: HeroData, stat: str) -> List[Hero]:
     """Envoltura para mantener compatibilidad con app.py"""
     return top_10_highest(heroes, stat)
\ No newline at end of file
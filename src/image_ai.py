@@ -1,63 +1,244 @@
+import hashlib
+import json
 import os
-import requests
+import threading
+import time
+import concurrent.futures
+from dataclasses import dataclass, field
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Callable, Dict, Optional
 
-# --- CONFIGURACIÓN DE RUTA ---
-# Aseguramos que encuentre el .env sin importar desde dónde se llame
-base_dir = Path(__file__).resolve().parent.parent
-env_path = base_dir / '.env'
-load_dotenv(dotenv_path=env_path, override=True)
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.settings import get_settings
+except ImportError:
+    from settings import get_settings
 
-# Configuración Azure
-API_KEY = os.getenv("OPENAI_API_KEY")
-ENDPOINT_URL = "https://iebs-resource.cognitiveservices.azure.com/openai/deployments/dall-e-3/images/generations?api-version=2024-02-01"
+# Configuración Azure: API key, endpoint (se puede apuntar a un servidor falso
+# local), timeout y directorio de imágenes salen de get_settings().
+# requests se importa en la primera petición, no al importar el módulo.
+DEFAULT_STYLE = "comic-noir"
 
-def generate_hero_image(hero_name: str):
-    """
-    Intenta generar la imagen del héroe. 
-    Si Azure la bloquea por Copyright (Error 400), retornará None.
-    """
-    
-    if not API_KEY:
-        print("❌ Error: No se encontró la API KEY.")
-        return None
+# Estados de un trabajo de generación
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+# Trabajos terminados que se conservan en memoria (las imágenes siguen en
+# ImageCache): se descartan pasado FINISHED_JOB_TTL o por encima de MAX_FINISHED_JOBS
+FINISHED_JOB_TTL = 15 * 60
+MAX_FINISHED_JOBS = 64
+
+
+@dataclass
+class ImageConfig:
+    endpoint: str = field(default_factory=lambda: get_settings().image_endpoint)
+    api_key: Optional[str] = field(default_factory=lambda: get_settings().openai_api_key)
+    # Segundos máximos de espera a la generación (DALL·E tarda bastante)
+    timeout: float = field(default_factory=lambda: get_settings().image_timeout)
+    download_timeout: float = 30.0
+    workers: int = 2
 
-    headers = {
-        "Content-Type": "application/json",
-        "api-key": API_KEY 
-    }
 
+def build_prompt(hero_name: str, style: str = DEFAULT_STYLE) -> str:
     # Prompt original solicitado + Inyección del estilo visual
     # Azure requiere que 'style' en el payload sea 'vivid' o 'natural',
-    # así que metemos 'comic-noir' dentro del texto del prompt.
-    prompt_text = (
+    # así que metemos el estilo (p. ej. 'comic-noir') dentro del texto del prompt.
+    return (
         f"Creame un personaje similar en cuanto a aspecto a {hero_name} "
         f"pero que no tenga problemas de filtro de contenidos. "
-        f"Estilo visual: comic-noir."
+        f"Estilo visual: {style}."
     )
 
+def request_image(prompt: str, config: Optional[ImageConfig] = None, session=None) -> str:
+    """
+    Pide la imagen al endpoint y devuelve su URL (temporal).
+    Lanza RuntimeError si no hay API key o el endpoint la rechaza
+    (p. ej. filtro de copyright, error 400) y requests.RequestException
+    si falla la conexión o vence el timeout.
+    """
+    import requests
+    config = config or ImageConfig()
+    if not config.api_key:
+        raise RuntimeError("No se encontró la API KEY.")
+
+    headers = {
+        "Content-Type": "application/json",
+        "api-key": config.api_key
+    }
     payload = {
         "model": "dall-e-3",
-        "prompt": prompt_text,
-        "size": "1024x1024", 
+        "prompt": prompt,
+        "size": "1024x1024",
         "quality": "standard",
         "style": "vivid", # Parámetro técnico obligatorio de Azure (vivid/natural)
         "n": 1
     }
+    response = (session or requests).post(config.endpoint, headers=headers, json=payload, timeout=config.timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f"API Azure rechazada ({response.status_code}): {response.text[:500]}")
+    return response.json()['data'][0]['url']
 
-    try:
-        response = requests.post(ENDPOINT_URL, headers=headers, json=payload)
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result['data'][0]['url']
-        else:
-            # Si falla (ej: filtro de contenido), imprimimos el error en consola para ti
-            # y retornamos None para que la UI sepa que debe mostrar el mensaje de disculpa.
-            print(f"⚠️ API Azure rechazada ({response.status_code}): {response.text}")
-            return None
+def download_image(url: str, config: Optional[ImageConfig] = None, session=None) -> bytes:
+    import requests
+    config = config or ImageConfig()
+    response = (session or requests).get(url, timeout=config.download_timeout)
+    response.raise_for_status()
+    return response.content
 
+def generate_hero_image(hero_name: str):
+    """
+    Intenta generar la imagen del héroe (llamada bloqueante, con timeout).
+    Si Azure la bloquea por Copyright (Error 400), retornará None.
+    La UI usa ImageJobQueue, que no bloquea y guarda el resultado.
+    """
+    try:
+        return request_image(build_prompt(hero_name))
+    except RuntimeError as e:
+        # Si falla (ej: filtro de contenido), imprimimos el error en consola
+        # y retornamos None para que la UI sepa que debe mostrar el mensaje de disculpa.
+        print(f"⚠️ {e}")
+        return None
     except Exception as e:
         print(f"❌ Error de conexión: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+# --- CACHÉ PERSISTENTE ---
+def image_key(hero_name: str, prompt: str, style: str) -> str:
+    return hashlib.sha256(json.dumps([hero_name, prompt, style]).encode("utf-8")).hexdigest()[:32]
+
+
+class ImageCache:
+    """
+    Imágenes ya generadas, en disco: <clave>.png (bytes descargados) y
+    <clave>.json (héroe, prompt, estilo, fecha). La clave es el hash de
+    (héroe, prompt, estilo). Se descargan al terminar (la URL de Azure caduca).
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or get_settings().image_dir)
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{key}{suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key, ".png").read_bytes()
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes, meta: Dict):
+        """Escritura atómica: primero los metadatos, la imagen al final."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for suffix, content in ((".json", json.dumps(meta, ensure_ascii=False).encode("utf-8")), (".png", data)):
+            path = self._path(key, suffix)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+
+
+# --- COLA DE TRABAJOS ---
+@dataclass
+class ImageJob:
+    key: str
+    hero_name: str
+    style: str
+    prompt: str
+    status: str = PENDING
+    image: Optional[bytes] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+class ImageJobQueue:
+    """
+    Generación de imágenes en segundo plano, compartida por todo el proceso.
+
+    - submit() no bloquea: devuelve el trabajo (nuevo, en curso o terminado).
+    - Un mismo (héroe, prompt, estilo) nunca se pide dos veces a la vez; un
+      trabajo fallido no se repite solo (hay que pedir `retry`).
+    - El resultado se descarga enseguida (la URL caduca) y se guarda en
+      ImageCache, así que sobrevive a reinicios.
+    - Los trabajos terminados se olvidan pasado un tiempo (ver _prune): un
+      fallo olvidado se vuelve a intentar en el siguiente submit().
+    """
+
+    def __init__(self, config: Optional[ImageConfig] = None, cache: Optional[ImageCache] = None,
+                 request: Callable[[str, ImageConfig], str] = request_image,
+                 download: Callable[[str, ImageConfig], bytes] = download_image):
+        self.config = config or ImageConfig()
+        self.cache = cache if cache is not None else ImageCache()
+        self._request = request
+        self._download = download
+        self._jobs: Dict[str, ImageJob] = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, self.config.workers), thread_name_prefix="image-ai")
+
+    def submit(self, hero_name: str, style: str = DEFAULT_STYLE, retry: bool = False) -> ImageJob:
+        prompt = build_prompt(hero_name, style)
+        key = image_key(hero_name, prompt, style)
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and not (retry and job.status == FAILED):
+                return job
+
+            job = ImageJob(key, hero_name, style, prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                job.image, job.finished_at, job.status = cached, time.time(), DONE
+            else:
+                self._executor.submit(self._run, job)
+            self._jobs[key] = job
+            return job
+
+    def get(self, hero_name: str, style: str = DEFAULT_STYLE) -> Optional[ImageJob]:
+        return self._jobs.get(image_key(hero_name, build_prompt(hero_name, style), style))
+
+    def _prune(self):
+        """Descarta los trabajos terminados antiguos (llamar con el lock tomado)."""
+        finished = sorted((job.finished_at, key) for key, job in self._jobs.items() if job.finished)
+        expired = time.time() - FINISHED_JOB_TTL
+        excess = len(finished) - MAX_FINISHED_JOBS
+        for i, (finished_at, key) in enumerate(finished):
+            if finished_at >= expired and i >= excess:
+                break
+            del self._jobs[key]
+
+    def _run(self, job: ImageJob):
+        job.status = RUNNING
+        try:
+            url = self._request(job.prompt, self.config)
+            data = self._download(url, self.config)
+            self.cache.put(job.key, data, {
+                "hero": job.hero_name, "style": job.style, "prompt": job.prompt,
+                "source_url": url, "created_at": time.time(),
+            })
+            job.image = data
+            job.finished_at = time.time()
+            job.status = DONE
+        except Exception as e:
+            print(f"⚠️ Generación fallida para {job.hero_name}: {e}")
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = FAILED
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_job_queue: Optional[ImageJobQueue] = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> ImageJobQueue:
+    """Cola única por proceso (la comparten todas las sesiones de la app)."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = ImageJobQueue()
+        return _job_queue
@@ -0,0 +1,132 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero
+    from src.table import STAT_FIELDS
+except ImportError:
+    from models import Hero
+    from table import STAT_FIELDS
+
+# Tipos de orden mantenidos por cada estadística
+ORDER_KINDS = ("asc", "desc", "balanced")
+
+
+def _stat_values(hero: Hero) -> Tuple[int, ...]:
+    ps = hero.powerstats
+    if not ps:
+        return (0,) * len(STAT_FIELDS)
+    return (ps.intelligence, ps.strength, ps.speed, ps.durability, ps.power, ps.combat)
+
+
+class SortedStatIndex:
+    """
+    Órdenes precalculados del dataset, uno por estadística y tipo:
+    - asc:      (valor, seq)                -> Top inferior y consultas por rango
+    - desc:     (-valor, seq)               -> Top superior
+    - balanced: (|valor - promedio|, seq)   -> Top balanceado
+
+    `seq` es el orden de llegada del héroe, así los empates se resuelven
+    igual que un sorted() estable sobre la lista cargada. Solo se indexan
+    héroes con la estadística > 0 (misma regla que los rankings).
+
+    Las altas, bajas y refrescos se aplican con bisect (O(log n) para
+    localizar + desplazamiento de la lista), sin reordenar todo.
+    """
+
+    def __init__(self, heroes: Iterable[Hero] = (), orders: Optional[Dict[str, Sequence[int]]] = None):
+        self._lists: Dict[Tuple[str, str], List[tuple]] = {
+            (stat, kind): [] for stat in STAT_FIELDS for kind in ORDER_KINDS
+        }
+        self._heroes: Dict[int, Hero] = {}   # seq -> Hero
+        self._seq: Dict[int, int] = {}       # hero.id -> seq
+        self._next_seq = 0
+
+        # Carga inicial: añadimos sin ordenar y ordenamos cada lista una vez
+        for hero in heroes:
+            seq = self._assign_seq(hero)
+            for key, entry in self._entries(hero, seq):
+                self._lists[key].append(entry)
+        for (stat, kind), entries in self._lists.items():
+            # Con `orders` (p. ej. desde un snapshot) no hace falta ordenar
+            order = orders.get(f"{stat}:{kind}") if orders else None
+            if order is not None and len(order) == len(entries):
+                entries[:] = [entries[i] for i in np.asarray(order).tolist()]
+            else:
+                entries.sort()
+
+    # --- MANTENIMIENTO ---
+    def _assign_seq(self, hero: Hero) -> int:
+        seq = self._seq.get(hero.id)
+        if seq is None:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._seq[hero.id] = seq
+        self._heroes[seq] = hero
+        return seq
+
+    @staticmethod
+    def _entries(hero: Hero, seq: int):
+        values = _stat_values(hero)
+        average = sum(values) / len(values)
+        for stat, value in zip(STAT_FIELDS, values):
+            if value > 0:
+                yield (stat, "asc"), (value, seq)
+                yield (stat, "desc"), (-value, seq)
+                yield (stat, "balanced"), (abs(value - average), seq)
+
+    def _discard(self, seq: int):
+        for key, entry in self._entries(self._heroes[seq], seq):
+            entries = self._lists[key]
+            pos = bisect_left(entries, entry)
+            if pos < len(entries) and entries[pos] == entry:
+                del entries[pos]
+
+    def upsert(self, hero: Hero):
+        """Añade un héroe nuevo o refresca uno existente (conserva su posición de llegada)."""
+        seq = self._seq.get(hero.id)
+        if seq is not None:
+            self._discard(seq)
+        seq = self._assign_seq(hero)
+        for key, entry in self._entries(hero, seq):
+            insort(self._lists[key], entry)
+
+    def remove(self, hero_id: int):
+        """Elimina un héroe de todos los órdenes."""
+        seq = self._seq.pop(hero_id, None)
+        if seq is None:
+            return
+        self._discard(seq)
+        del self._heroes[seq]
+
+    def __len__(self) -> int:
+        return len(self._seq)
+
+    def orders(self) -> Dict[str, np.ndarray]:
+        """
+        Permutación de cada lista respecto al orden de llegada (clave
+        'stat:kind'), para reconstruir el índice sin ordenar: ver `orders`
+        en el constructor.
+        """
+        result = {}
+        for (stat, kind), entries in self._lists.items():
+            seqs = np.fromiter((seq for _, seq in entries), dtype=np.int64, count=len(entries))
+            # Posición de cada entrada en la lista sin ordenar (= rango de su seq)
+            result[f"{stat}:{kind}"] = np.searchsorted(np.sort(seqs), seqs).astype(np.int32)
+        return result
+
+    # --- CONSULTAS ---
+    def top(self, stat: str, k: int = 10, kind: str = "desc") -> List[Hero]:
+        """Los k primeros según `kind` ('asc', 'desc' o 'balanced'): O(k)."""
+        entries = self._lists.get((stat, kind), [])
+        return [self._heroes[seq] for _, seq in entries[:max(k, 0)]]
+
+    def range(self, stat: str, low: int, high: int) -> List[Hero]:
+        """Héroes con low <= stat <= high, en orden ascendente: O(log n + resultado)."""
+        entries = self._lists.get((stat, "asc"), [])
+        start = bisect_left(entries, (low, -1))
+        end = bisect_right(entries, (high, float("inf")))
+        return [self._heroes[seq] for _, seq in entries[start:end]]
@@ -0,0 +1,195 @@
+import gzip
+import io
+import json
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+# Caracteres que se leen del fichero en cada llenado del buffer
+CHUNK_SIZE = 1 << 16
+# Tamaño máximo (en caracteres) de un único registro: acota la memoria del
+# lector aunque el volcado ocupe varios GB
+MAX_RECORD_SIZE = 16 << 20
+
+_JSONL_SUFFIXES = (".jsonl", ".ndjson")
+_WHITESPACE = " \t\n\r"
+# Caracteres que pueden continuar un número JSON ("1" -> "1.5e-3")
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+class RecordTooLargeError(ValueError):
+    """Un registro supera `max_record_size` (volcado corrupto o límite demasiado bajo)."""
+
+
+def open_text(path: str) -> TextIO:
+    """Abre el fichero como texto UTF-8, descomprimiendo gzip de forma transparente."""
+    with open(path, "rb") as f:
+        is_gzip = f.read(2) == b"\x1f\x8b"
+    if is_gzip:
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _is_jsonl(path: str) -> bool:
+    name = path[:-3] if path.endswith(".gz") else path
+    return name.endswith(_JSONL_SUFFIXES)
+
+
+class _Reader:
+    """Buffer deslizante sobre un flujo de texto, con decodificación valor a valor."""
+
+    def __init__(self, stream: TextIO, chunk_size: int, max_record_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.max_record_size = max_record_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        """Añade hasta `size` caracteres al buffer (descartando lo ya consumido)."""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.stream.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> Optional[str]:
+        """Siguiente carácter no blanco (sin consumirlo), o None al final."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return None
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char is None or char not in chars:
+            raise json.JSONDecodeError(f"Se esperaba uno de {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return char
+
+    def _may_continue(self, value: Any, end: int) -> bool:
+        """¿Puede `value`, que acaba en `end`, seguir en el siguiente bloque?"""
+        if end == len(self.buf):
+            return True
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return all(char in _NUMBER_CHARS for char in self.buf[end:])
+
+    def value(self) -> Any:
+        """Decodifica el siguiente valor JSON completo, leyendo más si hace falta."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # Un número al final del buffer podría estar cortado ("1" de "12",
+                # o "1" de "1.5" si el corte cae tras el punto): releemos
+                if self.eof or not self._may_continue(value, end):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            pending = len(self.buf) - self.pos
+            if pending > self.max_record_size:
+                raise RecordTooLargeError(
+                    f"Registro de más de {self.max_record_size} caracteres (posición {self.pos})")
+            # Leemos al menos lo pendiente: cada reintento reparsea el registro entero
+            self._fill(max(self.chunk_size, pending))
+
+
+def _iter_array(reader: _Reader) -> Iterator[Any]:
+    """Elementos de un array JSON cuyo '[' ya se ha consumido."""
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+def _iter_object(reader: _Reader) -> Iterator[Dict[str, Any]]:
+    """
+    Un objeto de nivel superior: si tiene "results" (formato SuperHero API),
+    emite sus elementos uno a uno; si no, el objeto entero es un registro.
+    """
+    reader.expect("{")
+    other: Dict[str, Any] = {}
+    found_results = False
+    if reader.peek() != "}":
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key == "results" and reader.peek() == "[":
+                reader.pos += 1
+                found_results = True
+                yield from _iter_array(reader)
+            elif found_results:
+                reader.value()
+            else:
+                other[key] = reader.value()
+            if reader.expect(",}") == "}":
+                break
+    if not found_results:
+        yield other
+
+
+def iter_json_records(stream: TextIO, chunk_size: int = CHUNK_SIZE,
+                      max_record_size: int = MAX_RECORD_SIZE) -> Iterator[Any]:
+    """
+    Registros de un flujo JSON sin cargarlo entero en memoria. Acepta:
+    - {"results": [...]} (respuesta de SuperHero API / data/superheros.json).
+    - Un array de registros [..] o un único objeto.
+    - Varios objetos seguidos (JSON-lines sin extensión .jsonl).
+    """
+    reader = _Reader(stream, chunk_size, max_record_size)
+    while True:
+        char = reader.peek()
+        if char is None:
+            return
+        if char == "[":
+            reader.pos += 1
+            yield from _iter_array(reader)
+        elif char == "{":
+            yield from _iter_object(reader)
+        else:
+            # Escalar suelto: no es un registro, pero hay que consumirlo
+            reader.value()
+
+
+def iter_jsonl_records(stream: TextIO, max_record_size: int = MAX_RECORD_SIZE) -> Iterator[Any]:
+    """Un registro por línea (las líneas vacías se ignoran)."""
+    number = 0
+    while True:
+        # readline con límite: una línea gigante no llega a cargarse entera
+        line = stream.readline(max_record_size + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > max_record_size:
+            raise RecordTooLargeError(f"Línea {number}: más de {max_record_size} caracteres")
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_records(path: str, chunk_size: int = CHUNK_SIZE,
+                 max_record_size: int = MAX_RECORD_SIZE) -> Iterator[Any]:
+    """
+    Itera los registros de un volcado local (.json, .jsonl / .ndjson, con o
+    sin .gz) con memoria acotada: nunca hay más de un registro decodificado
+    ni más de ~max_record_size caracteres en el buffer.
+    """
+    with open_text(path) as stream:
+        if _is_jsonl(path):
+            yield from iter_jsonl_records(stream, max_record_size)
+        else:
+            yield from iter_json_records(stream, chunk_size, max_record_size)
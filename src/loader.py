@@ -1,36 +1,260 @@
-import json
-from typing import List
+import concurrent.futures
+import gc
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 # Importación robusta para evitar errores de ruta
 try:
-    from src.models import Hero, PowerStats, Appearance, Biography
-    from src.api_marvel import get_heroes_from_api
+    from src.models import Hero, PowerStats, Appearance, Biography, STAT_FIELDS
+    from src.api_marvel import HeroFetcher, fetch_heroes, get_heroes_from_api, iter_heroes_from_api, pick_random_ids, MIN_ID, MAX_ID
+    from src.cache import HeroCache
+    from src.rules import DEFAULT_RULES, RuleSet
+    from src.jsonstream import iter_records
+    from src.snapshot import SNAPSHOT_SUFFIX, file_fingerprint, fingerprint, load_snapshot_heroes, save_snapshot
+    from src.columnar import is_columnar, iter_heroes_columnar
+    from src import metrics
 except ImportError:
-    from models import Hero, PowerStats, Appearance, Biography
-    from api_marvel import get_heroes_from_api
+    from models import Hero, PowerStats, Appearance, Biography, STAT_FIELDS
+    from api_marvel import HeroFetcher, fetch_heroes, get_heroes_from_api, iter_heroes_from_api, pick_random_ids, MIN_ID, MAX_ID
+    from cache import HeroCache
+    from rules import DEFAULT_RULES, RuleSet
+    from jsonstream import iter_records
+    from snapshot import SNAPSHOT_SUFFIX, file_fingerprint, fingerprint, load_snapshot_heroes, save_snapshot
+    from columnar import is_columnar, iter_heroes_columnar
+    import metrics
+
+# Tamaño de lote para el parseo en paralelo (pool de procesos)
+PARSE_CHUNK_SIZE = 5000
+# Registros por lote al validar con las reglas vectorizadas (ver _parse_batch)
+PARSE_BATCH_SIZE = 1024
+
+
+@dataclass
+class RejectReport:
+    """
+    Resumen de calidad de datos de un parseo:
+    - by_rule: descartes por regla de negocio (nombres de src/rules.py:
+      publisher, min_stat, zeros, hundreds en el perfil por defecto).
+    - parse_errors: registros ilegibles, por tipo de error.
+    """
+    total: int = 0
+    accepted: int = 0
+    by_rule: Counter = field(default_factory=Counter)
+    parse_errors: Counter = field(default_factory=Counter)
+
+    @property
+    def rejected(self) -> int:
+        return self.total - self.accepted
+
+    def merge(self, other: "RejectReport"):
+        self.total += other.total
+        self.accepted += other.accepted
+        self.by_rule.update(other.by_rule)
+        self.parse_errors.update(other.parse_errors)
+
+    def to_dict(self) -> dict:
+        return {"total": self.total, "accepted": self.accepted,
+                "by_rule": dict(self.by_rule), "parse_errors": dict(self.parse_errors)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RejectReport":
+        return cls(data.get("total", 0), data.get("accepted", 0),
+                   Counter(data.get("by_rule", {})), Counter(data.get("parse_errors", {})))
+
+    def summary(self) -> str:
+        lines = [f"📋 {self.accepted}/{self.total} héroes válidos ({self.rejected} descartados)"]
+        for rule, count in self.by_rule.most_common():
+            lines.append(f"   - regla '{rule}': {count}")
+        for error, count in self.parse_errors.most_common():
+            lines.append(f"   - error de parseo '{error}': {count}")
+        return "\n".join(lines)
+
+# Almacén compartido por todas las cargas remotas del proceso
+_default_cache: Optional[HeroCache] = None
+# Hilo de refresco incremental (solo uno por proceso)
+_refresher_stop = None
+
+def load_heroes_local(path: str, report: Optional[RejectReport] = None,
+                      rules: RuleSet = DEFAULT_RULES, snapshot: bool = False,
+                      columns: Optional[Iterable[str]] = None) -> List[Hero]:
+    """
+    Carga desde archivo local manejando la estructura de diccionario o lista
+    (también JSON-lines y .gz). La lectura es en streaming: ver iter_heroes_local.
+
+    Con `snapshot` (opcional: escribe junto al fichero, que puede estar en
+    un directorio ajeno o de solo lectura), el resultado validado se guarda
+    en `<path>.snap` y las siguientes cargas lo leen con mmap sin parsear,
+    mientras ni el fichero ni las reglas cambien.
+
+    Los ficheros Parquet / Arrow IPC (src/columnar.py) ya están validados y
+    se leen sin parsear JSON ni snapshot; `columns` limita las columnas
+    leídas (p. ej. "stats" o "analytics") y se ignora en los formatos JSON.
+    """
+    def parse(parse_report: Optional[RejectReport]) -> List[Hero]:
+        return list(iter_heroes_local(path, parse_report, rules, columns))
 
-def load_heroes_local(path: str) -> List[Hero]:
-    """Carga desde archivo local manejando la estructura de diccionario o lista."""
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Si es un diccionario con "results", extraemos la lista
-        if isinstance(data, dict) and "results" in data:
-            data = data["results"]
-        # Si es un diccionario sin "results", lo convertimos en lista de 1 elemento
-        elif isinstance(data, dict):
-            data = [data]
-
-        return _parse_and_filter_data(data)
+        if is_columnar(path):
+            return _measured_parse(parse, report, "columnar")
+        if not snapshot:
+            return _measured_parse(parse, report, "local")
+        source = file_fingerprint(path)
+        return _load_with_snapshot(path + SNAPSHOT_SUFFIX, source, rules, report, parse, "local")
     except FileNotFoundError:
         print(f"❌ Error: No se encontró el archivo {path}")
         return []
 
-def load_heroes_remote() -> List[Hero]:
-    """Carga desde la API manejando la estructura de respuesta."""
-    raw_data = get_heroes_from_api()
-    
+def _load_with_snapshot(snap_path: str, source: str, rules: RuleSet, report: Optional[RejectReport],
+                        parse: Callable[[RejectReport], List[Hero]], origin: str) -> List[Hero]:
+    """Sirve el snapshot si está vigente; si no, parsea con `parse` y lo regenera."""
+    cached = load_snapshot_heroes(snap_path, source, rules.fingerprint())
+    metrics.inc("snapshot_loads_total", origin=origin, result="hit" if cached is not None else "miss")
+    if cached is not None:
+        print(f"⚡ Snapshot: {len(cached)} héroes cargados sin parsear.")
+        if report is not None:
+            report.merge(RejectReport.from_dict(cached.snapshot.report))
+        return cached
+
+    parse_report = RejectReport()
+    heroes = _measured_parse(parse, parse_report, origin)
+    save_snapshot(snap_path, heroes, source, rules.fingerprint(), parse_report.to_dict())
+    if report is not None:
+        report.merge(parse_report)
+    return heroes
+
+def iter_heroes_local(path: str, report: Optional[RejectReport] = None,
+                      rules: RuleSet = DEFAULT_RULES,
+                      columns: Optional[Iterable[str]] = None) -> Iterator[Hero]:
+    """
+    Héroes válidos de un volcado local, registro a registro: el fichero se
+    decodifica de forma incremental (src/jsonstream.py), así que la memoria
+    no depende del tamaño del volcado y los primeros héroes llegan enseguida.
+    Parquet / Arrow IPC se leen por lotes de columnas (ver load_heroes_local).
+    """
+    if is_columnar(path):
+        return iter_heroes_columnar(path, columns, report, rules)
+    return iter_parsed_records(iter_records(path), report, rules)
+
+def get_default_cache() -> HeroCache:
+    """Devuelve (creándolo la primera vez) el almacén local por defecto."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HeroCache()
+    return _default_cache
+
+def load_heroes_remote(
+    cache: Optional[HeroCache] = None,
+    use_cache: bool = True,
+    warm: bool = False,
+    refresh_interval: float = 60.0,
+    fetcher: Optional[HeroFetcher] = None,
+    snapshot: bool = True,
+) -> List[Hero]:
+    """
+    Carga desde la API manejando la estructura de respuesta.
+
+    Con `use_cache` se sirve desde el almacén local y solo se descargan los
+    IDs caducados o ausentes. Con `warm` se precarga el rango completo
+    (MIN_ID..MAX_ID) la primera vez y después se refresca de forma
+    incremental en un hilo en segundo plano.
+    `fetcher` permite inyectar un motor de descarga propio (p. ej. otro servidor).
+    Con `warm` (conjunto de IDs fijo) y `snapshot`, el resultado validado se
+    guarda junto al almacén y se reutiliza mientras el almacén no cambie.
+    """
+    if not use_cache:
+        return _parse_and_filter_data(_unwrap_results(get_heroes_from_api(fetcher=fetcher)))
+
+    if cache is None:
+        cache = get_default_cache()
+    ids = list(range(MIN_ID, MAX_ID + 1)) if warm else pick_random_ids()
+
+    missing = cache.stale_ids(ids)
+    if missing:
+        print(f"🗄️ Caché: {len(ids) - len(missing)} héroes vigentes, descargando {len(missing)}...")
+        _fetch_into_cache(cache, fetcher, missing)
+    else:
+        print(f"🗄️ Caché: {len(ids)} héroes servidos desde disco.")
+
+    if warm:
+        _start_refresher(cache, ids, refresh_interval, fetcher)
+
+    if warm and snapshot and cache.path.exists():
+        # La huella se toma antes de leer: si el refresco escribe entretanto,
+        # el snapshot queda obsoleto y se regenera en la siguiente carga
+        source = fingerprint(file_fingerprint(str(cache.path)), MIN_ID, MAX_ID)
+        return _load_with_snapshot(str(cache.path) + SNAPSHOT_SUFFIX, source, DEFAULT_RULES, None,
+                                   lambda parse_report: list(iter_parsed_records(cache.get_many(ids), parse_report)),
+                                   "cache")
+
+    return _parse_and_filter_data(cache.get_many(ids))
+
+def iter_heroes_remote(
+    ids: Optional[List[int]] = None,
+    cache: Optional[HeroCache] = None,
+    use_cache: bool = True,
+    fetcher: Optional[HeroFetcher] = None,
+    batch_size: int = 50,
+    report: Optional[RejectReport] = None,
+    rules: RuleSet = DEFAULT_RULES,
+) -> Iterator[Hero]:
+    """
+    Modo streaming: entrega cada héroe válido en cuanto está disponible.
+    Primero los vigentes del almacén local y después los que se van
+    descargando, parseados y validados uno a uno según llegan. No se
+    acumula la respuesta completa en memoria; el almacén se actualiza
+    en lotes de `batch_size`.
+    """
+    if ids is None:
+        ids = pick_random_ids()
+
+    if use_cache and cache is None:
+        cache = get_default_cache()
+
+    missing = ids
+    if use_cache:
+        missing = cache.stale_ids(ids)
+        fresh = set(ids).difference(missing)
+        yield from iter_parsed_records(cache.get_many(i for i in ids if i in fresh), report, rules)
+
+    found, not_found = [], []
+    try:
+        for hero_id, data, _, _, definitive in iter_heroes_from_api(missing, fetcher):
+            if data:
+                found.append(data)
+                yield from iter_parsed_records([data], report, rules)
+            elif definitive:
+                not_found.append(hero_id)
+
+            if use_cache and len(found) >= batch_size:
+                cache.put_many(found)
+                found = []
+    finally:
+        # Guardamos lo descargado aunque el consumidor corte antes de tiempo
+        if use_cache:
+            cache.put_many(found)
+            cache.put_not_found(not_found)
+
+def _fetch_into_cache(cache: HeroCache, fetcher: Optional[HeroFetcher], ids: List[int]):
+    """Descarga `ids` y guarda tanto los héroes como los IDs inexistentes."""
+    result = fetch_heroes(ids, fetcher)
+    cache.put_many(result.heroes.values())
+    cache.put_not_found(result.not_found)
+
+def _start_refresher(cache: HeroCache, ids: List[int], interval: float, fetcher: Optional[HeroFetcher]):
+    """Arranca el refresco incremental una sola vez por proceso."""
+    global _refresher_stop
+    if _refresher_stop is None:
+        _refresher_stop = cache.start_refresher(partial(_fetch_into_cache, cache, fetcher), ids, interval=interval)
+
+def _unwrap_results(raw_data) -> List[dict]:
+    """Normaliza la respuesta de la API (diccionario o lista) a una lista."""
     # Verificación de estructura API (Diccionario vs Lista)
     if isinstance(raw_data, dict) and "results" in raw_data:
         raw_data = raw_data["results"]
@@ -38,7 +262,7 @@ def load_heroes_remote() -> List[Hero]:
         # Caso raro: API devuelve un solo objeto
         raw_data = [raw_data]
         
-    return _parse_and_filter_data(raw_data)
+    return raw_data
 
 def _safe_int(value) -> int:
     """Convierte string a int, devolviendo 0 si es 'null' o inválido."""
@@ -49,82 +273,231 @@ def _safe_int(value) -> int:
     except (ValueError, TypeError):
         return 0
 
-def _parse_and_filter_data(data_list: List[dict]) -> List[Hero]:
+def _raw_stats(item: dict) -> Tuple[int, ...]:
+    """Las 6 stats como enteros, leídas directamente del diccionario crudo."""
+    raw_stats = item.get('powerstats') or {}
+    return tuple(_safe_int(raw_stats.get(stat)) for stat in STAT_FIELDS)
+
+def hero_from_dict(item: dict, stat_values: Optional[Tuple[int, ...]] = None) -> Hero:
+    """Convierte un registro crudo (formato SuperHero API) en Hero, sin validar."""
+    # 1. Parsing de Stats (Conversión segura de texto a número)
+    stats = PowerStats(*(stat_values if stat_values is not None else _raw_stats(item)))
+
+    # 2. Parsing de Biografía (Mapeo de claves API con guiones)
+    raw_bio = item.get('biography', {})
+    bio = Biography(
+        fullName=raw_bio.get('full-name', raw_bio.get('fullName', '')),
+        alterEgos=raw_bio.get('alter-egos', raw_bio.get('alterEgos', '')),
+        aliases=raw_bio.get('aliases', []),
+        placeOfBirth=raw_bio.get('place-of-birth', raw_bio.get('placeOfBirth', '')),
+        firstAppearance=raw_bio.get('first-appearance', raw_bio.get('firstAppearance', '')),
+        publisher=raw_bio.get('publisher', 'Unknown'),
+        alignment=raw_bio.get('alignment', 'neutral')
+    )
+
+    # 3. Parsing de Apariencia
+    raw_app = item.get('appearance', {})
+    app = Appearance(
+        gender=raw_app.get('gender', 'Unknown'),
+        race=raw_app.get('race', 'Unknown'),
+        height=raw_app.get('height', []),
+        weight=raw_app.get('weight', []),
+        eyeColor=raw_app.get('eye-color', '-'),
+        hairColor=raw_app.get('hair-color', '-')
+    )
+
+    # 4. Parsing de Imágenes (Soporte dual: 'image.url' o 'images.lg')
+    raw_img = item.get('image', {})
+    images = {}
+    if 'url' in raw_img:
+        images = {'lg': raw_img['url'], 'sm': raw_img['url']}
+    else:
+        images = item.get('images', {})
+
+    # 5. Creación del Objeto Hero
+    return Hero(
+        id=int(item.get('id', 0)),
+        name=item.get('name', 'Unknown'),
+        slug=item.get('slug', ''),
+        powerstats=stats,
+        appearance=app,
+        biography=bio,
+        images=images
+    )
+
+def _record_stats(records: List[dict], rows: np.ndarray, broken: Dict[int, str]) -> np.ndarray:
+    """
+    Stats de las filas `rows` como matriz (len(rows), 6): se recogen los
+    valores crudos de todo el bloque y se convierten de una pasada. Un
+    registro con `powerstats` ilegible no tumba el lote: se anota en
+    `broken` y queda a 0.
+    """
+    raw = []
+    for row in rows.tolist():
+        try:
+            raw_stats = records[row].get('powerstats') or {}
+            raw += [raw_stats.get(stat) for stat in STAT_FIELDS]
+        except Exception as e:
+            broken[row] = type(e).__name__
+            raw += [None] * len(STAT_FIELDS)
+    try:
+        # Hay pocos valores distintos ("0".."100", "null"): se convierte cada uno una vez
+        convert = {value: _safe_int(value) for value in dict.fromkeys(raw)}.__getitem__
+    except TypeError:
+        convert = _safe_int  # algún valor no hashable (lista, diccionario...)
+    values = np.fromiter(map(convert, raw), dtype=np.int64, count=len(raw))
+    return values.reshape(-1, len(STAT_FIELDS))
+
+def _publishers(items: List) -> Optional[List[Optional[str]]]:
+    """
+    Publisher crudo de cada registro del lote, o None si alguno no es un
+    diccionario o trae un publisher que no es texto (ruta lenta en _parse_batch).
+    """
+    try:
+        publishers = [(item.get('biography') or {}).get('publisher', 'Unknown') for item in items]
+        if all(p is None or isinstance(p, str) for p in set(publishers)):
+            return publishers
+    except Exception:
+        pass
+    return None
+
+def _parse_batch(items: List, report: Optional[RejectReport], rules: RuleSet) -> List[Hero]:
+    """
+    Valida un lote de registros crudos con RuleSet.evaluate_records (reglas
+    vectorizadas sobre la matriz de stats del lote; las stats solo se
+    parsean para los registros que superan el filtro de publisher) y
+    construye los objetos de los que pasan, en el orden de entrada.
+    """
+    parse_errors: Counter = Counter()
+    records, publishers = items, _publishers(items)
+    if publishers is None:
+        # Hay registros rotos en el lote: se separan uno a uno
+        records, publishers = [], []
+        for item in items:
+            try:
+                # Si el item no es diccionario, saltar
+                if not isinstance(item, dict):
+                    raise TypeError("registro no es un diccionario")
+                publisher = (item.get('biography') or {}).get('publisher', 'Unknown')
+                publishers.append(publisher.strip() if publisher is not None else None)
+            except Exception as e:
+                # Si un registro está muy roto, lo saltamos (pero queda contabilizado)
+                parse_errors[type(e).__name__] += 1
+                continue
+            records.append(item)
+
+    broken: Dict[int, str] = {}
+    result, stats = rules.evaluate_records(publishers, lambda rows: _record_stats(records, rows, broken))
+    heroes = []
+    by_rule: Counter = Counter()
+    accepted = np.flatnonzero(result.mask).tolist()
+    for row, values in zip(accepted, stats[accepted].tolist()):
+        if row in broken:
+            continue
+        try:
+            heroes.append(hero_from_dict(records[row], values))
+        except Exception as e:
+            parse_errors[type(e).__name__] += 1
+    parse_errors.update(broken.values())
+    if report is not None:
+        for row in np.flatnonzero(~result.mask).tolist():
+            if row not in broken:
+                by_rule[result.rule_names[result.rejected_by[row]]] += 1
+        report.total += len(items)
+        report.accepted += len(heroes)
+        report.by_rule.update(by_rule)
+        report.parse_errors.update(parse_errors)
+    return heroes
+
+@contextmanager
+def _gc_paused():
+    """
+    Pausa el recolector de ciclos mientras se lee y valida un lote: los
+    registros del lote siguen vivos durante varias pasadas de la generación 0,
+    que los recorrerían y promoverían para nada (al acabar el lote se liberan
+    por conteo de referencias). Sin esto, leer un volcado en streaming por
+    lotes es ~30% más lento que registro a registro.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def iter_parsed_records(data_iter: Iterable[dict], report: Optional[RejectReport] = None,
+                        rules: RuleSet = DEFAULT_RULES) -> Iterator[Hero]:
+    """
+    Héroes válidos de registros crudos ya decodificados (p. ej. del almacén
+    local). Ruta rápida: valida los registros por lotes de PARSE_BATCH_SIZE
+    (ver _parse_batch) y solo construye los objetos de los héroes que pasan.
+    Sigue siendo streaming: cada lote se entrega en cuanto está validado.
+    Si se indica `report`, acumula los descartes por regla y los errores de parseo.
+    """
+    data_iter = iter(data_iter)
+    while True:
+        with _gc_paused():
+            batch = list(islice(data_iter, PARSE_BATCH_SIZE))
+            heroes = _parse_batch(batch, report, rules) if batch else None
+            del batch
+        if heroes is None:
+            return
+        yield from heroes
+
+def _parse_chunk(chunk: List[dict], rules: RuleSet = DEFAULT_RULES) -> Tuple[List[Hero], RejectReport]:
+    """Unidad de trabajo del pool de procesos."""
+    report = RejectReport()
+    return list(iter_parsed_records(chunk, report, rules)), report
+
+def parse_heroes(data_list: List[dict], workers: int = 0, chunk_size: int = PARSE_CHUNK_SIZE,
+                 rules: RuleSet = DEFAULT_RULES) -> Tuple[List[Hero], RejectReport]:
+    """
+    Parsea y valida una lista de registros crudos devolviendo también el
+    resumen de descartes. Con `workers` > 1 y listas grandes, reparte lotes
+    de `chunk_size` registros en un pool de procesos (conserva el orden).
+    """
+    if workers <= 1 or len(data_list) <= chunk_size:
+        return _parse_chunk(data_list, rules)
+
+    heroes: List[Hero] = []
+    report = RejectReport()
+    chunks = [data_list[i:i + chunk_size] for i in range(0, len(data_list), chunk_size)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_heroes, chunk_report in executor.map(partial(_parse_chunk, rules=rules), chunks):
+            heroes.extend(chunk_heroes)
+            report.merge(chunk_report)
+    return heroes, report
+
+def _parse_and_filter_data(data_list: List[dict], report: Optional[RejectReport] = None,
+                           rules: RuleSet = DEFAULT_RULES) -> List[Hero]:
     """
     Convierte la data cruda en objetos Hero y aplica el filtro estricto.
     """
-    heroes_list = []
-    
     # Validación de seguridad por si data_list no es una lista
     if not isinstance(data_list, list):
         return []
 
-    for item in data_list:
-        try:
-            # Si el item no es diccionario, saltar
-            if not isinstance(item, dict): continue
-
-            # 1. Parsing de Stats (Conversión segura de texto a número)
-            raw_stats = item.get('powerstats', {})
-            stats = PowerStats(
-                intelligence=_safe_int(raw_stats.get('intelligence')),
-                strength=_safe_int(raw_stats.get('strength')),
-                speed=_safe_int(raw_stats.get('speed')),
-                durability=_safe_int(raw_stats.get('durability')),
-                power=_safe_int(raw_stats.get('power')),
-                combat=_safe_int(raw_stats.get('combat'))
-            )
-
-            # 2. Parsing de Biografía (Mapeo de claves API con guiones)
-            raw_bio = item.get('biography', {})
-            bio = Biography(
-                fullName=raw_bio.get('full-name', raw_bio.get('fullName', '')),
-                alterEgos=raw_bio.get('alter-egos', raw_bio.get('alterEgos', '')),
-                aliases=raw_bio.get('aliases', []),
-                placeOfBirth=raw_bio.get('place-of-birth', raw_bio.get('placeOfBirth', '')),
-                firstAppearance=raw_bio.get('first-appearance', raw_bio.get('firstAppearance', '')),
-                publisher=raw_bio.get('publisher', 'Unknown'),
-                alignment=raw_bio.get('alignment', 'neutral')
-            )
-
-            # 3. Parsing de Apariencia
-            raw_app = item.get('appearance', {})
-            app = Appearance(
-                gender=raw_app.get('gender', 'Unknown'),
-                race=raw_app.get('race', 'Unknown'),
-                height=raw_app.get('height', []),
-                weight=raw_app.get('weight', []),
-                eyeColor=raw_app.get('eye-color', '-'),
-                hairColor=raw_app.get('hair-color', '-')
-            )
-
-            # 4. Parsing de Imágenes (Soporte dual: 'image.url' o 'images.lg')
-            raw_img = item.get('image', {})
-            images = {}
-            if 'url' in raw_img:
-                images = {'lg': raw_img['url'], 'sm': raw_img['url']}
-            else:
-                images = item.get('images', {})
-
-            # 5. Creación del Objeto Hero
-            hero = Hero(
-                id=int(item.get('id', 0)),
-                name=item.get('name', 'Unknown'),
-                slug=item.get('slug', ''),
-                powerstats=stats,
-                appearance=app,
-                biography=bio,
-                images=images
-            )
-
-            # 6. VALIDACIÓN ESTRICTA
-            # Aquí se aplican las reglas definidas en models.py 
-            # (Marvel, <=15, >=3 ceros, etc.)
-            if hero.validate_hero():
-                heroes_list.append(hero)
-
-        except Exception:
-            # Si un registro está muy roto, lo saltamos silenciosamente
-            continue
-            
-    return heroes_list
\ No newline at end of file
+    return _measured_parse(lambda parse_report: list(iter_parsed_records(data_list, parse_report, rules)), report, "records")
+
+def _measured_parse(parse: Callable[[Optional[RejectReport]], List[Hero]], report: Optional[RejectReport],
+                    origin: str) -> List[Hero]:
+    """
+    Ejecuta `parse` y, si las métricas están activas, registra su duración,
+    los registros procesados/aceptados y los descartes por regla.
+    """
+    if not metrics.enabled():
+        return parse(report)
+    parse_report = RejectReport()
+    start = time.perf_counter()
+    heroes = parse(parse_report)
+    metrics.observe("parse_seconds", time.perf_counter() - start, origin=origin)
+    metrics.inc("parse_records_total", parse_report.total, origin=origin)
+    metrics.inc("parse_accepted_total", parse_report.accepted, origin=origin)
+    for rule, count in parse_report.by_rule.items():
+        metrics.inc("rejects_total", count, rule=rule)
+    for error, count in parse_report.parse_errors.items():
+        metrics.inc("parse_errors_total", count, error=error)
+    if report is not None:
+        report.merge(parse_report)
+    return heroes
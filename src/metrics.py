@@ -0,0 +1,364 @@
+import atexit
+import bisect
+import collections
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.settings import BASE_DIR, get_settings
+except ImportError:
+    from settings import BASE_DIR, get_settings
+
+# Límites superiores (segundos) de los cubos de los histogramas de latencia;
+# hay un cubo más, implícito, para lo que supera el último (+Inf)
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Clave interna de una serie: (nombre, etiquetas ordenadas)
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> SeriesKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Registry:
+    """
+    Contadores e histogramas agregados en memoria (thread-safe). Los sinks
+    reciben una instantánea (`snapshot()`) en cada flush().
+    """
+
+    def __init__(self, sinks: Sequence["Sink"] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.sinks = list(sinks)
+        self.buckets = tuple(buckets)
+        self._counters: Dict[SeriesKey, float] = {}
+        self._histograms: Dict[SeriesKey, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram(len(self.buckets) + 1)
+            hist.counts[slot] += 1
+            hist.count += 1
+            hist.sum += value
+
+    def snapshot(self) -> Dict:
+        """Estado actual como estructura JSON (todos los valores son acumulativos)."""
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = [{"name": name, "labels": dict(labels), "count": h.count, "sum": h.sum,
+                           "buckets": list(h.counts)}
+                          for (name, labels), h in sorted(self._histograms.items())]
+        return {"time": time.time(), "bounds": list(self.buckets), "counters": counters, "histograms": histograms}
+
+    def flush(self):
+        if not self.sinks:
+            return
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            try:
+                sink.export(snapshot)
+            except OSError as e:
+                print(f"⚠️ No se pudieron exportar las métricas ({type(sink).__name__}): {e}")
+
+
+# --- SINKS ---
+class Sink:
+    """Destino de las métricas: recibe la instantánea completa en cada flush."""
+
+    def export(self, snapshot: Dict):
+        raise NotImplementedError
+
+
+class MemorySink(Sink):
+    """Guarda las últimas `maxlen` instantáneas (p. ej. para el panel de la UI)."""
+
+    def __init__(self, maxlen: int = 100):
+        self.history: Deque[Dict] = collections.deque(maxlen=maxlen)
+
+    def export(self, snapshot: Dict):
+        self.history.append(snapshot)
+
+
+class JsonLogSink(Sink):
+    """Añade una línea JSON por flush a `path` (JSON-lines)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, snapshot: Dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot) + "\n")
+
+
+class PrometheusFileSink(Sink):
+    """
+    Reescribe `path` con el formato de texto de Prometheus en cada flush
+    (p. ej. para el textfile collector de node_exporter).
+    """
+
+    def __init__(self, path: str, prefix: str = "superhero_"):
+        self.path = path
+        self.prefix = prefix
+
+    def export(self, snapshot: Dict):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(to_prometheus(snapshot, self.prefix))
+        os.replace(tmp_path, self.path)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels_text(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def to_prometheus(snapshot: Dict, prefix: str = "superhero_") -> str:
+    """Instantánea -> formato de exposición de texto de Prometheus."""
+    lines: List[str] = []
+    typed = set()
+    for c in snapshot["counters"]:
+        name = prefix + c["name"]
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_labels_text(c['labels'])} {c['value']:g}")
+    for h in snapshot["histograms"]:
+        name = prefix + h["name"]
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(snapshot["bounds"] + [None], h["buckets"]):
+            cumulative += count
+            le = "+Inf" if bound is None else f"{bound:g}"
+            lines.append(f"{name}_bucket{_labels_text(h['labels'], ('le', le))} {cumulative}")
+        lines.append(f"{name}_sum{_labels_text(h['labels'])} {h['sum']:.6f}")
+        lines.append(f"{name}_count{_labels_text(h['labels'])} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+# --- CONSULTA ---
+def diff(current: Dict, base: Dict) -> Dict:
+    """current - base, serie a serie (p. ej. lo ocurrido desde que empezó una sesión)."""
+    def index(entries):
+        return {(e["name"], tuple(sorted(e["labels"].items()))): e for e in entries}
+
+    old_counters, old_histograms = index(base["counters"]), index(base["histograms"])
+    counters = []
+    for c in current["counters"]:
+        old = old_counters.get((c["name"], tuple(sorted(c["labels"].items()))))
+        value = c["value"] - (old["value"] if old else 0)
+        if value:
+            counters.append({**c, "value": value})
+    histograms = []
+    for h in current["histograms"]:
+        old = old_histograms.get((h["name"], tuple(sorted(h["labels"].items()))))
+        if old:
+            h = {**h, "count": h["count"] - old["count"], "sum": h["sum"] - old["sum"],
+                 "buckets": [a - b for a, b in zip(h["buckets"], old["buckets"])]}
+        if h["count"]:
+            histograms.append(h)
+    return {**current, "counters": counters, "histograms": histograms}
+
+
+def quantile(histogram: Dict, bounds: Sequence[float], q: float) -> float:
+    """Cuantil aproximado por interpolación lineal dentro del cubo (como histogram_quantile)."""
+    rank = q * histogram["count"]
+    cumulative, lower = 0, 0.0
+    for bound, count in zip(list(bounds) + [None], histogram["buckets"]):
+        if count and cumulative + count >= rank:
+            if bound is None:
+                # Cubo +Inf: no hay límite superior, devolvemos el último conocido
+                return lower
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        if bound is not None:
+            lower = bound
+    return lower
+
+
+# --- API GLOBAL ---
+# None = desactivado: cada llamada de instrumentación es una comprobación y un return
+_registry: Optional[Registry] = None
+_flusher_stop: Optional[threading.Event] = None
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: Registry, name: str, labels: Dict):
+        self.registry, self.name, self.labels = registry, name, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def enabled() -> bool:
+    return _registry is not None
+
+
+def get_registry() -> Optional[Registry]:
+    return _registry
+
+
+def inc(name: str, value: float = 1, **labels):
+    if _registry is not None:
+        _registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    if _registry is not None:
+        _registry.observe(name, value, **labels)
+
+
+def timer(name: str, **labels):
+    """`with metrics.timer("x_seconds"):` mide el bloque (no-op si están desactivadas)."""
+    if _registry is None:
+        return _NULL_TIMER
+    return _Timer(_registry, name, labels)
+
+
+def timed(name: str, **labels) -> Callable:
+    """Decorador equivalente a timer() para una función entera."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            registry = _registry
+            if registry is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> Optional[Dict]:
+    return _registry.snapshot() if _registry is not None else None
+
+
+def flush():
+    if _registry is not None:
+        _registry.flush()
+
+
+def configure(sinks: Sequence[Sink] = (), flush_interval: float = 0.0) -> Registry:
+    """
+    Activa las métricas (un registro por proceso). Con `flush_interval` > 0
+    exporta a los sinks periódicamente; siempre exporta una vez al salir.
+    """
+    global _registry, _flusher_stop
+    disable()
+    registry = Registry(sinks)
+    _registry = registry
+    atexit.register(registry.flush)
+    if flush_interval > 0 and sinks:
+        stop = _flusher_stop = threading.Event()
+
+        def loop():
+            while not stop.wait(flush_interval):
+                registry.flush()
+
+        threading.Thread(target=loop, name="metrics-flusher", daemon=True).start()
+    return registry
+
+
+def disable():
+    global _registry, _flusher_stop
+    if _flusher_stop is not None:
+        _flusher_stop.set()
+        _flusher_stop = None
+    if _registry is not None:
+        atexit.unregister(_registry.flush)
+        _registry.flush()
+    _registry = None
+
+
+def _sink_path(path: str, default: str) -> str:
+    """Rutas relativas respecto a la raíz del proyecto (como Settings), no al directorio actual."""
+    return str(BASE_DIR / os.path.expanduser(path or default))
+
+
+def parse_sinks(spec: str) -> List[Sink]:
+    """
+    "memory,prometheus:data/metrics.prom,json:data/metrics.jsonl" -> sinks.
+    Cadena vacía o "0" -> ninguno (métricas desactivadas). Sin ruta, los
+    ficheros van a data/ de la raíz del proyecto.
+    """
+    sinks: List[Sink] = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, _, path = part.partition(":")
+        if kind == "memory":
+            sinks.append(MemorySink())
+        elif kind == "prometheus":
+            sinks.append(PrometheusFileSink(_sink_path(path, os.path.join("data", "metrics.prom"))))
+        elif kind == "json":
+            sinks.append(JsonLogSink(_sink_path(path, os.path.join("data", "metrics.jsonl"))))
+        elif kind not in ("0", "off"):
+            raise ValueError(f"Sink de métricas desconocido: {kind!r}")
+    return sinks
+
+
+def configure_from_env() -> Optional[Registry]:
+    """
+    SUPERHERO_METRICS: lista de sinks (ver parse_sinks); vacío = desactivado.
+    SUPERHERO_METRICS_INTERVAL: segundos entre exportaciones (por defecto 15).
+    """
+    settings = get_settings()
+    sinks = parse_sinks(settings.metrics)
+    if not sinks:
+        return None
+    if _registry is not None:
+        return _registry
+    return configure(sinks, settings.metrics_interval)
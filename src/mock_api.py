@@ -0,0 +1,151 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.synthetic import generate_hero
+except ImportError:
+    from synthetic import generate_hero
+
+
+class MockSuperHeroAPI:
+    """
+    Servidor local con la misma interfaz que superheroapi.com, para probar
+    y medir HeroFetcher sin red ni token:
+
+    - GET /api/<token>/<id> -> registro sintético (determinista por ID y semilla).
+    - IDs fuera de [1, count] -> 200 con {"response": "error"}, como la API real.
+
+    Simula además el comportamiento del servidor real bajo carga:
+    - `latency`: segundos de espera por petición.
+    - `error_rate`: fracción de peticiones que fallan con 503.
+    - `max_inflight`: peticiones simultáneas admitidas; el resto recibe 429
+      con Retry-After (0 = sin límite).
+
+    Uso: HeroFetcher(config, base_url=MockSuperHeroAPI(...).start().base_url)
+    """
+
+    def __init__(self, count: int = 731, seed: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, max_inflight: int = 0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.count = count
+        self.seed = seed
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_inflight = max_inflight
+        self.requests = 0
+        self.rejected = 0
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._payloads = {}
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, como el pool de HeroFetcher
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, headers: Optional[dict] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if not api._enter():
+                    self._send(429, b'{"response": "error", "error": "rate limited"}', {"Retry-After": "0.1"})
+                    return
+                try:
+                    if api.latency:
+                        time.sleep(api.latency)
+                    status, body = api.respond(self.path)
+                    self._send(status, body)
+                finally:
+                    api._leave()
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def _enter(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.max_inflight and self._inflight >= self.max_inflight:
+                self.rejected += 1
+                return False
+            self._inflight += 1
+            return True
+
+    def _leave(self):
+        with self._lock:
+            self._inflight -= 1
+
+    def respond(self, path: str):
+        """(estado HTTP, cuerpo) para una ruta /api/<token>/<id>."""
+        try:
+            hero_id = int(path.rstrip("/").rsplit("/", 1)[-1])
+        except ValueError:
+            return 404, b'{"response": "error", "error": "invalid path"}'
+        if self.error_rate:
+            with self._lock:
+                failed = self._rng.random() < self.error_rate
+            if failed:
+                return 503, b'{"response": "error", "error": "unavailable"}'
+        if not 1 <= hero_id <= self.count:
+            return 200, b'{"response": "error", "error": "invalid id"}'
+        return 200, self._payload(hero_id)
+
+    def _payload(self, hero_id: int) -> bytes:
+        body = self._payloads.get(hero_id)
+        if body is None:
+            # Una semilla por ID: el registro no depende del orden de las peticiones
+            rng = random.Random(self.seed * 1_000_003 + hero_id)
+            body = self._payloads[hero_id] = json.dumps(generate_hero(hero_id, rng)).encode("utf-8")
+        return body
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """Equivalente local de api_marvel.BASE_URL."""
+        return f"{self.url}/api/mock"
+
+    def start(self) -> "MockSuperHeroAPI":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-superhero-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SuperHero API simulada con datos sintéticos.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--count", type=int, default=731)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-inflight", type=int, default=0)
+    args = parser.parse_args()
+
+    api = MockSuperHeroAPI(args.count, args.seed, args.latency, args.error_rate, args.max_inflight, port=args.port)
+    print(f"🧪 SuperHero API simulada en {api.base_url}/<id>")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        api.stop()
@@ -1,7 +1,34 @@
 from dataclasses import dataclass
 from typing import List, Dict, Optional
 
-@dataclass
+# Orden canónico de las estadísticas (columnas en las estructuras columnares)
+STAT_FIELDS = ("intelligence", "strength", "speed", "durability", "power", "combat")
+
+# Nombre de cada estadística en la interfaz (app, CLI y gráficas)
+STAT_LABELS = {
+    "intelligence": "Inteligencia", "strength": "Fuerza",
+    "speed": "Velocidad", "durability": "Durabilidad",
+    "power": "Poder", "combat": "Combate"
+}
+
+_DEFAULT_RULES = None
+
+
+def _default_rules():
+    """Perfil por defecto de src/rules.py (import diferido: rules importa este módulo)."""
+    global _DEFAULT_RULES
+    if _DEFAULT_RULES is None:
+        try:
+            from src.rules import DEFAULT_RULES
+        except ImportError:
+            from rules import DEFAULT_RULES
+        _DEFAULT_RULES = DEFAULT_RULES
+    return _DEFAULT_RULES
+
+# slots=True: sin __dict__ por instancia (cada héroe son 4 objetos),
+# lo que reduce bastante la memoria por héroe en datasets grandes.
+
+@dataclass(slots=True)
 class PowerStats:
     intelligence: int
     strength: int
@@ -10,7 +37,7 @@ class PowerStats:
     power: int
     combat: int
 
-@dataclass
+@dataclass(slots=True)
 class Appearance:
     gender: str
     race: Optional[str]
@@ -19,7 +46,7 @@ class Appearance:
     eyeColor: str
     hairColor: str
 
-@dataclass
+@dataclass(slots=True)
 class Biography:
     fullName: str
     alterEgos: str
@@ -29,7 +56,7 @@ class Biography:
     publisher: Optional[str]
     alignment: str
 
-@dataclass
+@dataclass(slots=True)
 class Hero:
     id: int
     name: str
@@ -39,42 +66,15 @@ class Hero:
     biography: Biography
     images: Dict[str, str]
 
-    def validate_hero(self) -> bool:
+    def validate_hero(self, rules=None) -> bool:
         """
-        Aplica las reglas de negocio estrictas:
+        Aplica las reglas de negocio estrictas (perfil por defecto de src/rules.py):
         1. Debe ser de 'Marvel Comics'.
         2. CUALQUIER stat individual <= 15 descarta al héroe.
         3. No puede tener 3 o más stats en 0.
         4. No puede tener 3 o más stats en 100.
+        Para validar lotes grandes, usar RuleSet.evaluate (vectorizado).
         """
-        # 1. Filtro de Publisher (Estricto con strip)
-        pub = self.biography.publisher
-        if not pub or pub.strip() != "Marvel Comics":
-            return False
-
-        # Extraemos los valores numéricos para validación
-        stats = [
-            self.powerstats.intelligence,
-            self.powerstats.strength,
-            self.powerstats.speed,
-            self.powerstats.durability,
-            self.powerstats.power,
-            self.powerstats.combat
-        ]
-
-        # 2. Filtro de Valor Mínimo Individual (Estricto)
-        # Si ALGUNA estadística es menor o igual a 15, fuera.
-        if min(stats) <= 15:
-            return False
-
-        # 3. Filtro de Ceros
-        # Si tiene 3 o más stats en 0, fuera.
-        if stats.count(0) >= 3:
-            return False
-            
-        # 4. Filtro de "Dioses Falsos"
-        # Si tiene 3 o más stats en 100, fuera.
-        if stats.count(100) >= 3:
-            return False
-
-        return True
\ No newline at end of file
+        if rules is None:
+            rules = _DEFAULT_RULES or _default_rules()
+        return rules.check_hero(self) is None
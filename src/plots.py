@@ -1,150 +1,494 @@
-import matplotlib.pyplot as plt
-from matplotlib import font_manager
+import concurrent.futures
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Hashable, Iterable, Optional, Sequence, Tuple
+
 import numpy as np
 
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src import metrics
+    from src.settings import get_settings
+except ImportError:
+    import metrics
+    from settings import get_settings
+
+# matplotlib se importa al dibujar la primera figura: importar este módulo
+# (p. ej. desde ui.py) no carga matplotlib si todo sale de las cachés
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Paletas disponibles (forman parte de la clave de la caché de renders)
+THEMES = {
+    "dark": {
+        "background": "#001435", "text": "#FFFFFF", "grid": "#E0E0E0",
+        "first": "#FFD54F", "podium": "#FF8A65", "rest": "#90CAF9", "radar": "#FFF176",
+        "compare": ("#4FC3F7", "#81C784", "#F06292", "#BA68C8", "#FFB74D"),
+    },
+    "light": {
+        "background": "#FFFFFF", "text": "#1A1A1A", "grid": "#5F6368",
+        "first": "#F9A825", "podium": "#E64A19", "rest": "#1E88E5", "radar": "#F57F17",
+        "compare": ("#0288D1", "#388E3C", "#C2185B", "#7B1FA2", "#EF6C00"),
+    },
+}
+DEFAULT_THEME = "dark"
+
+# Límites de la caché de imágenes renderizadas
+RENDER_CACHE_ENTRIES = 256
+RENDER_CACHE_BYTES = 64 << 20
+
+# Radares pre-renderizados en disco (direccionados por contenido, en
+# Settings.radar_dir). Cambiar RADAR_RENDER_VERSION al modificar el dibujo
+# invalida todos los ficheros.
+RADAR_RENDER_VERSION = 1
+
+@lru_cache(maxsize=1)
 def _load_comic_font():
-    """Carga Comic Sans MS configurada para contraste alto en fondo oscuro."""
+    """
+    Carga Comic Sans MS configurada para contraste alto en fondo oscuro.
+    Se crea una sola vez y se comparte (solo se lee, nunca se modifica).
+    """
     try:
+        from matplotlib import font_manager
         # Intentamos cargar Comic Sans, si no está, matplotlib usará la default
         return font_manager.FontProperties(family="Comic Sans MS")
     except:
         return None
 
-def setup_comic_style(ax, comic_font):
+def setup_comic_style(ax, comic_font, theme: dict = THEMES[DEFAULT_THEME]):
     """Estética de bordes y textos para modo oscuro."""
     # Ocultamos los bordes del cuadro (spines)
     for spine in ax.spines.values():
-        spine.set_visible(False) 
-    
+        spine.set_visible(False)
+
     # Solo dejamos visible la línea izquierda como referencia
     ax.spines['left'].set_visible(True)
-    ax.spines['left'].set_color('#FFFFFF')
+    ax.spines['left'].set_color(theme["text"])
     ax.spines['left'].set_linewidth(1)
-    
-    # Aplicar fuente y color blanco a los ejes
+
+    # Aplicar fuente y color del tema a los ejes
     if comic_font:
         for label in ax.get_xticklabels() + ax.get_yticklabels():
             label.set_fontproperties(comic_font)
-            label.set_color('#FFFFFF')
-    
-    # Asegurar que los ticks (las rayitas) sean blancos
-    ax.tick_params(axis='both', colors='white')
+            label.set_color(theme["text"])
+
+    # Asegurar que los ticks (las rayitas) sean del color del texto
+    ax.tick_params(axis='both', colors=theme["text"])
 
-def plot_top_heroes(heroes, stat: str, title_prefix: str = "Top 10", stat_label: str = None):
+def plot_top_heroes(heroes, stat: str, title_prefix: str = "Top 10", stat_label: str = None,
+                    theme: str = DEFAULT_THEME):
     """
     Genera gráfico de barras horizontales.
     Adaptado para recibir objetos Hero (no diccionarios).
+    Usa la API orientada a objetos (Figure): no pasa por el estado global de
+    pyplot, así que la figura se libera al dejar de usarse.
     """
-    if not heroes: 
+    if not heroes:
         return None
 
     # 1. Extracción de datos (Usando objetos)
     names = [hero.name.upper() for hero in heroes]
-    
+
     # CORRECCIÓN: Usamos getattr porque powerstats es un Objeto, no un dict
     values = [getattr(hero.powerstats, stat, 0) for hero in heroes]
-    
+
     comic_font = _load_comic_font()
-    
+    palette = THEMES[theme]
+
     # Determinar qué etiqueta usar en el título
     final_stat_name = stat_label if stat_label else stat.upper()
 
     # --- PALETA ARMÓNICA ---
-    colors = ["#FFD54F" if i == 0 else "#FF8A65" if i < 3 else "#90CAF9" for i in range(len(values))]
+    colors = [palette["first"] if i == 0 else palette["podium"] if i < 3 else palette["rest"]
+              for i in range(len(values))]
 
-    fig, ax = plt.subplots(figsize=(10, 5), dpi=100)
-    
-    # Configuración de fondo oscuro
-    fig.patch.set_facecolor('#001435') 
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(10, 5), dpi=100)
+    ax = fig.subplots()
+
+    # Configuración de fondo del tema
+    fig.patch.set_facecolor(palette["background"])
     fig.patch.set_alpha(1.0) # Opacidad al 100 para que se vea bien
-    ax.set_facecolor("#001435")
+    ax.set_facecolor(palette["background"])
 
     # Crear barras
     bars = ax.barh(names, values, color=colors, edgecolor=None)
     ax.invert_yaxis() # El mejor arriba
 
     # TÍTULO
-    ax.set_title(f"{title_prefix} {final_stat_name}", fontsize=16, 
-                 fontproperties=comic_font, weight='bold', color='#FFFFFF', pad=15)
-    
-    setup_comic_style(ax, comic_font)
+    ax.set_title(f"{title_prefix} {final_stat_name}", fontsize=16,
+                 fontproperties=comic_font, weight='bold', color=palette["text"], pad=15)
+
+    setup_comic_style(ax, comic_font, palette)
 
     # Etiquetas de valor en las barras
     for bar in bars:
         width = bar.get_width()
-        ax.text(width + 1, bar.get_y() + bar.get_height()/2, f'{int(width)}', 
-                va='center', fontproperties=comic_font, weight='bold', 
-                fontsize=10, color='#FFFFFF')
+        ax.text(width + 1, bar.get_y() + bar.get_height()/2, f'{int(width)}',
+                va='center', fontproperties=comic_font, weight='bold',
+                fontsize=10, color=palette["text"])
 
-    plt.tight_layout()
-    plt.show() # Importante para que se abra la ventana
+    fig.tight_layout()
     return fig
 
-def plot_hero_radar(hero):
+RADAR_LABELS = ['INT', 'STR', 'SPD', 'DUR', 'POW', 'COM']
+
+def _radar_axes(theme: str):
     """
-    Genera gráfico de radar para un solo héroe.
-    Adaptado para objetos Hero.
+    Figura polar con el estilo común de los radares: fondo del tema, eje
+    desde arriba en sentido horario, etiquetas de las 6 stats, escala 0-100
+    sin números y rejilla discontinua.
+    Devuelve (fig, ax, ángulos con el primero repetido al final, fuente, paleta).
     """
-    # 1. Definimos las etiquetas fijas para asegurar el orden
-    labels = ['INT', 'STR', 'SPD', 'DUR', 'POW', 'COM']
-    
-    # 2. Extraemos valores del objeto (CORRECCIÓN PRINCIPAL)
-    if not hero.powerstats:
-        return None
-        
-    values = [
-        hero.powerstats.intelligence,
-        hero.powerstats.strength,
-        hero.powerstats.speed,
-        hero.powerstats.durability,
-        hero.powerstats.power,
-        hero.powerstats.combat
-    ]
-    
-    # Si todos son 0, no graficamos
-    if not any(values): return None
-
     comic_font = _load_comic_font()
-    
-    # Cerrar el círculo (repetir el primer valor al final)
-    values += values[:1]
-    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+    palette = THEMES[theme]
+    angles = np.linspace(0, 2 * np.pi, len(RADAR_LABELS), endpoint=False).tolist()
     angles += angles[:1]
 
-    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True), dpi=100)
-
-    # Fondo Tarjeta Azul Profundo (#001435)
-    fig.patch.set_facecolor("#001435")
-    ax.set_facecolor("#001435")
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(6, 6), dpi=100)
+    ax = fig.add_subplot(polar=True)
 
-    # --- ESTILO RADAR ---
-    ax.plot(angles, values, color="#FFF176", linewidth=2, linestyle='solid')
-    ax.fill(angles, values, color="#FFF176", alpha=0.25)
+    # Fondo Tarjeta del tema
+    fig.patch.set_facecolor(palette["background"])
+    ax.set_facecolor(palette["background"])
 
     ax.set_theta_offset(np.pi / 2)
     ax.set_theta_direction(-1)
-    
-    # Etiquetas de los ejes (TEXTO BLANCO)
-    ax.set_thetagrids(np.degrees(angles[:-1]), labels)
-    
-    # Aplicar estilo a las etiquetas radiales
+
+    # Etiquetas de los ejes (color del texto)
+    ax.set_thetagrids(np.degrees(angles[:-1]), RADAR_LABELS)
     for label in ax.get_xticklabels():
         if comic_font:
             label.set_fontproperties(comic_font)
-        label.set_color('#FFFFFF')
+        label.set_color(palette["text"])
         label.set_fontsize(10)
 
     ax.set_ylim(0, 100)
     ax.set_yticklabels([]) # Ocultar números concéntricos para limpieza visual
-    
+
     # --- GRID (Rejilla) ---
-    ax.grid(True, color="#E0E0E0", linestyle='--', alpha=0.3)
-    ax.spines['polar'].set_color('#E0E0E0')
+    ax.grid(True, color=palette["grid"], linestyle='--', alpha=0.3)
+    ax.spines['polar'].set_color(palette["grid"])
     ax.spines['polar'].set_alpha(0.4)
+    return fig, ax, angles, comic_font, palette
+
+def plot_hero_radar(hero, theme: str = DEFAULT_THEME):
+    """
+    Genera gráfico de radar para un solo héroe.
+    Adaptado para objetos Hero.
+    """
+    if not hero.powerstats:
+        return None
+
+    values = _radar_values(hero)
+
+    # Si todos son 0, no graficamos
+    if not any(values): return None
+
+    fig, ax, angles, comic_font, palette = _radar_axes(theme)
+
+    # Cerrar el círculo (repetir el primer valor al final)
+    values += values[:1]
+
+    # --- ESTILO RADAR ---
+    ax.plot(angles, values, color=palette["radar"], linewidth=2, linestyle='solid')
+    ax.fill(angles, values, color=palette["radar"], alpha=0.25)
+
+    ax.set_title(hero.name.upper(), size=14, fontproperties=comic_font,
+                 weight='bold', pad=30, color=palette["text"])
+
+    fig.tight_layout()
+    return fig
+
+def plot_radar_comparison(hero, others, theme: str = DEFAULT_THEME):
+    """
+    Radar del héroe (relleno, color del tema) con los radares de `others`
+    superpuestos (solo contorno), p. ej. sus héroes más parecidos.
+    """
+    if not hero.powerstats or not any(_radar_values(hero)):
+        return None
+
+    fig, ax, angles, comic_font, palette = _radar_axes(theme)
+
+    values = _radar_values(hero)
+    values += values[:1]
+    ax.plot(angles, values, color=palette["radar"], linewidth=2.5, label=hero.name)
+    ax.fill(angles, values, color=palette["radar"], alpha=0.25)
+
+    others = [o for o in others if o.powerstats][:len(palette["compare"])]
+    for other, color in zip(others, palette["compare"]):
+        other_values = _radar_values(other)
+        other_values += other_values[:1]
+        ax.plot(angles, other_values, color=color, linewidth=1.5, linestyle='--', label=other.name)
+
+    legend = ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.06), ncol=3, frameon=False, prop=comic_font)
+    for text in legend.get_texts():
+        text.set_color(palette["text"])
+        text.set_fontsize(9)
+
+    fig.tight_layout()
+    return fig
+
+def _radar_values(hero) -> list:
+    ps = hero.powerstats
+    return [ps.intelligence, ps.strength, ps.speed, ps.durability, ps.power, ps.combat]
+
+
+# --- CACHÉ DE RENDERS ---
+class RenderCache:
+    """
+    LRU de imágenes ya renderizadas (bytes PNG/SVG), acotado por número de
+    entradas y por tamaño total. Compartido entre hilos (y sesiones).
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_ENTRIES, max_bytes: int = RENDER_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: Hashable, data: bytes):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = data
+            self._size += len(data)
+            while self._items and (len(self._items) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+_render_cache = RenderCache()
+
+def get_render_cache() -> RenderCache:
+    return _render_cache
+
+def figure_to_bytes(fig: "Figure", fmt: str = "png") -> bytes:
+    """Renderiza la figura y la libera (sin esperar al recolector de basura)."""
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, facecolor=fig.get_facecolor())
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+def _top_heroes_key(heroes, stat: str, title_prefix: str, stat_label: Optional[str],
+                    theme: str, fmt: str) -> Tuple:
+    # Nombre y valor forman parte de la clave: un refresco de datos con los
+    # mismos IDs no sirve una imagen desactualizada
+    rows = tuple((h.id, h.name, getattr(h.powerstats, stat, 0)) for h in heroes)
+    return ("top", rows, stat, title_prefix, stat_label, theme, fmt)
+
+@metrics.timed("render_seconds", chart="top")
+def _render_top_heroes(heroes, stat, title_prefix, stat_label, theme, fmt) -> Optional[bytes]:
+    fig = plot_top_heroes(heroes, stat, title_prefix, stat_label, theme)
+    return figure_to_bytes(fig, fmt) if fig is not None else None
+
+def top_heroes_image(heroes, stat: str, title_prefix: str = "Top 10", stat_label: str = None,
+                     theme: str = DEFAULT_THEME, fmt: str = "png",
+                     cache: Optional[RenderCache] = None) -> Optional[bytes]:
+    """plot_top_heroes ya renderizado (bytes), servido desde la caché si está."""
+    if not heroes:
+        return None
+    cache = cache if cache is not None else _render_cache
+    key = _top_heroes_key(heroes, stat, title_prefix, stat_label, theme, fmt)
+    data = cache.get(key)
+    if data is None:
+        data = _render_top_heroes(heroes, stat, title_prefix, stat_label, theme, fmt)
+        cache.put(key, data)
+    return data
+
+def _radar_key(hero, theme: str, fmt: str) -> Tuple:
+    return ("radar", hero.id, hero.name, tuple(_radar_values(hero)), theme, fmt)
+
+def hero_radar_image(hero, theme: str = DEFAULT_THEME, fmt: str = "png",
+                     cache: Optional[RenderCache] = None,
+                     store: Optional["RadarStore"] = None) -> Optional[bytes]:
+    """
+    plot_hero_radar ya renderizado (bytes). Orden de búsqueda: caché en
+    memoria, radares pre-renderizados en disco y, solo si falta, render en vivo
+    (que se guarda en ambos para la próxima vez).
+    """
+    if not hero.powerstats or not any(_radar_values(hero)):
+        return None
+    cache = cache if cache is not None else _render_cache
+    store = store if store is not None else get_radar_store()
+    key = _radar_key(hero, theme, fmt)
+    data = cache.get(key)
+    if data is None:
+        data = store.get(hero, theme, fmt)
+        if data is None:
+            with metrics.timer("render_seconds", chart="radar"):
+                data = figure_to_bytes(plot_hero_radar(hero, theme), fmt)
+            store.put(hero, data, theme, fmt)
+        cache.put(key, data)
+    return data
+
+def radar_comparison_image(hero, others, theme: str = DEFAULT_THEME, fmt: str = "png",
+                           cache: Optional[RenderCache] = None) -> Optional[bytes]:
+    """plot_radar_comparison ya renderizado (bytes), servido desde la caché si está."""
+    if not hero.powerstats or not any(_radar_values(hero)):
+        return None
+    cache = cache if cache is not None else _render_cache
+    key = ("radar_cmp", _radar_key(hero, theme, fmt),
+           tuple((o.id, o.name, tuple(_radar_values(o))) for o in others if o.powerstats))
+    data = cache.get(key)
+    if data is None:
+        with metrics.timer("render_seconds", chart="radar_compare"):
+            data = figure_to_bytes(plot_radar_comparison(hero, others, theme), fmt)
+        cache.put(key, data)
+    return data
+
+def prerender_top_heroes(jobs: Iterable[Sequence], theme: str = DEFAULT_THEME, fmt: str = "png",
+                         workers: int = 4, use_processes: bool = False,
+                         cache: Optional[RenderCache] = None) -> int:
+    """
+    Renderiza por adelantado varios rankings, cada job es
+    (heroes, stat, title_prefix, stat_label), en un pool de hilos (o de
+    procesos con `use_processes`) y los guarda en la caché.
+    Devuelve cuántas imágenes nuevas se renderizaron.
+    """
+    cache = cache if cache is not None else _render_cache
+    pending = {}
+    for heroes, stat, title_prefix, stat_label in jobs:
+        key = _top_heroes_key(heroes, stat, title_prefix, stat_label, theme, fmt)
+        if heroes and key not in cache and key not in pending:
+            pending[key] = (list(heroes), stat, title_prefix, stat_label, theme, fmt)
+    if not pending:
+        return 0
+
+    pool_class = concurrent.futures.ProcessPoolExecutor if use_processes else concurrent.futures.ThreadPoolExecutor
+    with pool_class(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(_render_top_heroes, *args): key for key, args in pending.items()}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                cache.put(futures[future], future.result())
+            except Exception as e:
+                print(f"⚠️ Error pre-renderizando un ranking: {e}")
+    return len(pending)
+
+
+# --- RADARES PRE-RENDERIZADOS EN DISCO ---
+class RadarStore:
+    """
+    Directorio de radares direccionado por contenido: el nombre de cada
+    fichero es el hash de lo que determina la imagen (nombre, stats, tema,
+    formato y versión del dibujo), así que buscar es O(1) (un open) y un
+    cambio en los datos nunca sirve una imagen antigua.
+    Estructura: <directorio>/<2 primeros caracteres del hash>/<hash>.<fmt>
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or get_settings().radar_dir
+
+    def path_for(self, hero, theme: str = DEFAULT_THEME, fmt: str = "png") -> str:
+        content = repr((RADAR_RENDER_VERSION, hero.name, tuple(_radar_values(hero)), theme, fmt))
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.{fmt}")
+
+    def get(self, hero, theme: str = DEFAULT_THEME, fmt: str = "png") -> Optional[bytes]:
+        try:
+            with open(self.path_for(hero, theme, fmt), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, hero, data: bytes, theme: str = DEFAULT_THEME, fmt: str = "png"):
+        """Escritura atómica (temporal + os.replace): nunca se lee un fichero a medias."""
+        path = self.path_for(hero, theme, fmt)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el radar de {hero.name}: {e}")
+
+    def has(self, hero, theme: str = DEFAULT_THEME, fmt: str = "png") -> bool:
+        return os.path.exists(self.path_for(hero, theme, fmt))
+
+
+_radar_store: Optional[RadarStore] = None
+
+def get_radar_store() -> RadarStore:
+    global _radar_store
+    if _radar_store is None:
+        _radar_store = RadarStore()
+    return _radar_store
+
+def _init_render_worker():
+    """Los procesos del pool renderizan sin interfaz gráfica."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+def _render_radar_batch(heroes, directory: str, theme: str, fmt: str) -> int:
+    """Unidad de trabajo de un proceso: renderiza y guarda un lote de radares."""
+    store = RadarStore(directory)
+    for hero in heroes:
+        fig = plot_hero_radar(hero, theme)
+        if fig is not None:
+            store.put(hero, figure_to_bytes(fig, fmt), theme, fmt)
+    return len(heroes)
+
+def prerender_radars(heroes: Iterable, workers: int = 4, theme: str = DEFAULT_THEME, fmt: str = "png",
+                     store: Optional[RadarStore] = None, batch_size: int = 16) -> int:
+    """
+    Renderiza en procesos (backend Agg) los radares de todo el roster que
+    aún no estén en disco. Usa 'spawn' para poder lanzarse con seguridad
+    desde un hilo de la app. Devuelve cuántos radares se renderizaron.
+    """
+    store = store if store is not None else get_radar_store()
+    pending = [h for h in heroes
+               if h.powerstats and any(_radar_values(h)) and not store.has(h, theme, fmt)]
+    if not pending:
+        return 0
 
-    ax.set_title(hero.name.upper(), size=14, fontproperties=comic_font, 
-                 weight='bold', pad=30, color='#FFFFFF')
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    if workers <= 1:
+        _init_render_worker()
+        return sum(_render_radar_batch(batch, store.directory, theme, fmt) for batch in batches)
 
-    plt.tight_layout()
-    plt.show()
-    return fig
\ No newline at end of file
+    context = multiprocessing.get_context("spawn")
+    done = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                initializer=_init_render_worker) as executor:
+        futures = [executor.submit(_render_radar_batch, batch, store.directory, theme, fmt) for batch in batches]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                done += future.result()
+            except Exception as e:
+                print(f"⚠️ Error pre-renderizando radares: {e}")
+    return done
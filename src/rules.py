@@ -0,0 +1,410 @@
+import hashlib
+import json
+from collections import Counter
+from dataclasses import dataclass, field, fields, replace
+from operator import attrgetter
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import STAT_FIELDS
+except ImportError:
+    from models import STAT_FIELDS
+
+# Código de `rejected_by` para los registros aceptados
+ACCEPTED = -1
+
+
+# --- DATOS DE ENTRADA ---
+@dataclass
+class RuleBatch:
+    """
+    Lote columnar sobre el que se evalúan las reglas:
+    - stats: matriz (N, 6) de enteros, columnas según STAT_FIELDS.
+    - publisher_codes / publishers: publisher (ya con strip) codificado como diccionario.
+    """
+    stats: np.ndarray
+    publisher_codes: np.ndarray
+    publishers: List[str]
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    @classmethod
+    def from_columns(cls, stats, publishers: Iterable[Optional[str]]) -> "RuleBatch":
+        # Se codifica el valor crudo y el strip se aplica solo a los distintos
+        publishers = list(publishers)
+        raw = {p: code for code, p in enumerate(dict.fromkeys(publishers))}
+        codes = np.fromiter(map(raw.__getitem__, publishers), dtype=np.int32, count=len(publishers))
+        lookup: Dict[str, int] = {}
+        remap = np.array([lookup.setdefault((p or "").strip(), len(lookup)) for p in raw], dtype=np.int32)
+        stats = np.asarray(stats, dtype=np.int64).reshape(-1, len(STAT_FIELDS))
+        return cls(stats, remap[codes] if len(codes) else codes, list(lookup))
+
+    @classmethod
+    def from_heroes(cls, heroes: Sequence) -> "RuleBatch":
+        """Construye el lote a partir de objetos Hero (o vistas con su misma interfaz)."""
+        # Columna a columna (map en C) en vez de una tupla por héroe
+        powerstats = [hero.powerstats for hero in heroes]
+        stats = np.empty((len(STAT_FIELDS), len(powerstats)), dtype=np.int64)
+        for col, stat in enumerate(STAT_FIELDS):
+            stats[col] = np.fromiter(map(attrgetter(stat), powerstats), dtype=np.int64, count=len(powerstats))
+        return cls.from_columns(stats.T, map(attrgetter("biography.publisher"), heroes))
+
+    @classmethod
+    def from_table(cls, table) -> "RuleBatch":
+        """Reutiliza las columnas ya construidas de un HeroTable (sin copiar el publisher)."""
+        codes, categories = table.categories["publisher"]
+        return cls(table.stats, codes, categories)
+
+    def publisher_mask(self, allowed: Sequence[str]) -> np.ndarray:
+        wanted = [i for i, p in enumerate(self.publishers) if p in allowed]
+        return np.isin(self.publisher_codes, wanted)
+
+
+def _reduce_columns(stats: np.ndarray, func, combine) -> np.ndarray:
+    """
+    Aplica `func` columna a columna y combina los resultados: con solo 6
+    columnas, es bastante más rápido que reducir con axis=1 fila a fila.
+    """
+    result = func(stats[:, 0])
+    for col in range(1, stats.shape[1]):
+        result = combine(result, func(stats[:, col]))
+    return result
+
+
+# --- REGLAS ---
+# Cada regla implementa la misma condición de tres formas:
+# - check(stats, publisher): un registro, en Python puro.
+# - expression(const): la misma condición como expresión Python sobre `stats`
+#   y `publisher`; RuleSet la compila junto a las demás en una sola función
+#   (ver _compile), así que validar un registro no pasa por una llamada por regla.
+#   `const(valor)` devuelve el nombre con el que la expresión ve ese parámetro.
+# - passes(batch): un lote completo, vectorizado con NumPy.
+# Todas devuelven True / máscara True para los registros que la cumplen.
+
+@dataclass(frozen=True)
+class PublisherRule:
+    """El publisher (sin espacios alrededor) debe estar en `allowed`."""
+    uses_stats: ClassVar[bool] = False
+    allowed: Tuple[str, ...] = ("Marvel Comics",)
+    name: str = "publisher"
+    enabled: bool = True
+
+    def check(self, stats: Sequence[int], publisher: Optional[str]) -> bool:
+        return bool(publisher) and publisher.strip() in self.allowed
+
+    def expression(self, const) -> str:
+        return f"publisher and publisher.strip() in {const(self.allowed)}"
+
+    def passes(self, batch: RuleBatch) -> np.ndarray:
+        return batch.publisher_mask(self.allowed)
+
+
+@dataclass(frozen=True)
+class MinStatRule:
+    """Cualquier stat <= `threshold` descarta al héroe."""
+    uses_stats: ClassVar[bool] = True
+    threshold: int = 15
+    name: str = "min_stat"
+    enabled: bool = True
+
+    def check(self, stats: Sequence[int], publisher: Optional[str]) -> bool:
+        return min(stats) > self.threshold
+
+    def expression(self, const) -> str:
+        return f"min(stats) > {const(self.threshold)}"
+
+    def passes(self, batch: RuleBatch) -> np.ndarray:
+        return _reduce_columns(batch.stats, lambda column: column > self.threshold, np.logical_and)
+
+
+@dataclass(frozen=True)
+class ValueCountRule:
+    """Descarta al héroe si `limit` o más stats valen exactamente `value`."""
+    uses_stats: ClassVar[bool] = True
+    value: int = 0
+    limit: int = 3
+    name: str = "zeros"
+    enabled: bool = True
+
+    def check(self, stats: Sequence[int], publisher: Optional[str]) -> bool:
+        return stats.count(self.value) < self.limit
+
+    def expression(self, const) -> str:
+        return f"stats.count({const(self.value)}) < {const(self.limit)}"
+
+    def passes(self, batch: RuleBatch) -> np.ndarray:
+        matches = _reduce_columns(batch.stats, lambda column: (column == self.value).astype(np.int8), np.add)
+        return matches < self.limit
+
+
+@dataclass(frozen=True)
+class StatRangeRule:
+    """Una stat concreta debe estar en [low, high] (extremos opcionales)."""
+    uses_stats: ClassVar[bool] = True
+    stat: str = "intelligence"
+    low: Optional[int] = None
+    high: Optional[int] = None
+    name: str = "stat_range"
+    enabled: bool = True
+
+    def check(self, stats: Sequence[int], publisher: Optional[str]) -> bool:
+        value = stats[STAT_FIELDS.index(self.stat)]
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+
+    def expression(self, const) -> str:
+        value = f"stats[{STAT_FIELDS.index(self.stat)}]"
+        bounds = [f"{value} >= {const(self.low)}" if self.low is not None else None,
+                  f"{value} <= {const(self.high)}" if self.high is not None else None]
+        return " and ".join(b for b in bounds if b) or "True"
+
+    def passes(self, batch: RuleBatch) -> np.ndarray:
+        column = batch.stats[:, STAT_FIELDS.index(self.stat)]
+        mask = np.ones(len(batch), dtype=bool)
+        if self.low is not None:
+            mask &= column >= self.low
+        if self.high is not None:
+            mask &= column <= self.high
+        return mask
+
+
+# Tipos disponibles en la configuración declarativa ({"rule": "<tipo>", ...})
+RULE_TYPES = {
+    "publisher": PublisherRule,
+    "min_stat": MinStatRule,
+    "value_count": ValueCountRule,
+    "stat_range": StatRangeRule,
+}
+
+def _is_literal(value) -> bool:
+    if isinstance(value, tuple):
+        return all(_is_literal(v) for v in value)
+    return type(value) in (int, str)
+
+
+# Stats de un objeto Hero como tupla, en el orden de STAT_FIELDS
+_HERO_STATS = "(" + ", ".join(f"ps.{stat}" for stat in STAT_FIELDS) + ")"
+
+
+def _compile(leading: Sequence, rest: Sequence) -> Dict[str, Callable]:
+    """
+    Genera check / check_record / check_hero para las reglas activas como
+    funciones planas (un `if not (<expresión>): return <regla>` por regla),
+    igual que el validate_hero original escrito a mano. Las reglas sin
+    expression() se llaman a través de su check().
+    """
+    namespace: Dict[str, Any] = {}
+
+    def const(value) -> str:
+        # Enteros y textos van como literales (constantes del bytecode); el resto, por nombre
+        if _is_literal(value):
+            return repr(value)
+        name = f"_c{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    def condition(rule) -> str:
+        if hasattr(rule, "expression"):
+            return rule.expression(const)
+        return f"{const(rule.check)}(stats, publisher)"
+
+    def body(head: Sequence[str], stats_lines: Sequence[str], rejected: str, accepted: str) -> List[str]:
+        lines = [f"    {line}" for line in head]
+        lines += [f"    if not ({condition(r)}): return {rejected.format(repr(r.name), 'None')}" for r in leading]
+        lines += [f"    {line}" for line in stats_lines]
+        lines += [f"    if not ({condition(r)}): return {rejected.format(repr(r.name), 'stats')}" for r in rest]
+        return lines + [f"    return {accepted}"]
+
+    source = "\n".join([
+        "def check(stats, publisher):",
+        *body((), (), "{0}", "None"),
+        "def check_record(publisher, get_stats):",
+        *body(("stats = ()",), ("stats = get_stats()",), "{0}, {1}", "None, stats"),
+        "def check_hero(hero):",
+        *body(("publisher = hero.biography.publisher", "stats = ()"),
+              ("ps = hero.powerstats", f"stats = {_HERO_STATS}"), "{0}", "None"),
+    ])
+    exec(compile(source, "<rules>", "exec"), namespace)
+    return {name: namespace[name] for name in ("check", "check_record", "check_hero")}
+
+
+# --- CONJUNTO DE REGLAS ---
+@dataclass
+class RuleResult:
+    """
+    Resultado de evaluar un lote:
+    - mask: True para los registros aceptados.
+    - rejected_by: índice (en `rule_names`) de la primera regla que descarta
+      cada registro, o ACCEPTED (-1).
+    """
+    mask: np.ndarray
+    rejected_by: np.ndarray
+    rule_names: List[str]
+
+    def rejected_rule(self, row: int) -> Optional[str]:
+        code = self.rejected_by[row]
+        return None if code == ACCEPTED else self.rule_names[code]
+
+    def counts(self) -> Counter:
+        """Descartes por regla."""
+        codes, counts = np.unique(self.rejected_by[~self.mask], return_counts=True)
+        return Counter({self.rule_names[c]: int(n) for c, n in zip(codes, counts)})
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    Perfil de validación: lista ordenada de reglas. Un registro se descarta
+    por la primera regla activa que no cumple (el orden importa para el
+    informe de descartes, no para el resultado).
+
+    Validación de un registro (funciones compiladas en __post_init__, ver _compile):
+    - check(stats, publisher): nombre de la primera regla que lo descarta, o None.
+    - check_record(publisher, get_stats): como check(), pero solo llama a
+      `get_stats()` si el registro supera las reglas iniciales que no usan
+      stats (p. ej. publisher). Devuelve (regla | None, stats | None).
+    - check_hero(hero): check() sobre un objeto Hero.
+    Lotes completos: evaluate / evaluate_records (vectorizados).
+    """
+    rules: Tuple = field(default_factory=tuple)
+
+    def __post_init__(self):
+        object.__setattr__(self, "rules", tuple(self.rules))
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Nombres de regla repetidos: {names}")
+        # Reglas activas, separando las iniciales que no necesitan stats
+        # (ver check_record / evaluate_records), y su versión compilada
+        codes = [code for code, rule in enumerate(self.rules) if rule.enabled]
+        leading = 0
+        while leading < len(codes) and not self.rules[codes[leading]].uses_stats:
+            leading += 1
+        object.__setattr__(self, "_leading_codes", codes[:leading])
+        object.__setattr__(self, "_rest_codes", codes[leading:])
+        compiled = _compile([self.rules[c] for c in codes[:leading]], [self.rules[c] for c in codes[leading:]])
+        for name, func in compiled.items():
+            object.__setattr__(self, name, func)
+
+    def __reduce__(self):
+        # Las funciones compiladas no se serializan: se regeneran al reconstruir
+        # (p. ej. al pasar el perfil al pool de procesos de parse_heroes)
+        return RuleSet, (self.rules,)
+
+    @property
+    def active(self) -> Tuple:
+        return tuple(rule for rule in self.rules if rule.enabled)
+
+    # --- COMPOSICIÓN ---
+    def toggle(self, name: str, enabled: bool) -> "RuleSet":
+        """Copia del perfil con la regla `name` activada / desactivada."""
+        if name not in self.names():
+            raise KeyError(name)
+        return RuleSet(replace(r, enabled=enabled) if r.name == name else r for r in self.rules)
+
+    def with_rule(self, rule) -> "RuleSet":
+        """Copia con `rule` añadida al final (o sustituyendo la del mismo nombre)."""
+        if rule.name in self.names():
+            return RuleSet(rule if r.name == rule.name else r for r in self.rules)
+        return RuleSet(self.rules + (rule,))
+
+    def without(self, name: str) -> "RuleSet":
+        return RuleSet(r for r in self.rules if r.name != name)
+
+    def names(self) -> List[str]:
+        return [rule.name for rule in self.rules]
+
+    # --- CONFIGURACIÓN ---
+    @classmethod
+    def from_config(cls, config: Iterable[Dict[str, Any]]) -> "RuleSet":
+        """
+        Perfil desde una lista de diccionarios, p. ej.:
+        [{"rule": "publisher", "allowed": ["Marvel Comics", "DC Comics"]},
+         {"rule": "value_count", "name": "zeros", "value": 0, "enabled": false}]
+        """
+        rules = []
+        for entry in config:
+            params = dict(entry)
+            kind = params.pop("rule")
+            if kind not in RULE_TYPES:
+                raise ValueError(f"Tipo de regla desconocido: {kind}")
+            if "allowed" in params:
+                params["allowed"] = tuple(params["allowed"])
+            rules.append(RULE_TYPES[kind](**params))
+        return cls(rules)
+
+    def to_config(self) -> List[Dict[str, Any]]:
+        kinds = {cls: kind for kind, cls in RULE_TYPES.items()}
+        config = []
+        for rule in self.rules:
+            entry = {"rule": kinds[type(rule)]}
+            entry.update({f.name: getattr(rule, f.name) for f in fields(rule)})
+            if "allowed" in entry:
+                entry["allowed"] = list(entry["allowed"])
+            config.append(entry)
+        return config
+
+    def fingerprint(self) -> str:
+        """Huella estable del perfil (sirve para invalidar datos ya validados)."""
+        payload = json.dumps(self.to_config(), sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    # --- EVALUACIÓN ---
+    def _apply(self, batch: RuleBatch, rejected_by: np.ndarray, codes: Sequence[int]):
+        """Marca en `rejected_by` la primera regla de `codes` que descarta cada registro."""
+        for code in codes:
+            failed = ~self.rules[code].passes(batch) & (rejected_by == ACCEPTED)
+            rejected_by[failed] = code
+
+    def evaluate(self, batch: RuleBatch) -> RuleResult:
+        """Evalúa todas las reglas activas sobre el lote completo."""
+        rejected_by = np.full(len(batch), ACCEPTED, dtype=np.int16)
+        self._apply(batch, rejected_by, self._leading_codes + self._rest_codes)
+        return RuleResult(rejected_by == ACCEPTED, rejected_by, self.names())
+
+    def evaluate_records(self, publishers: Sequence[Optional[str]],
+                         get_stats: Callable[[np.ndarray], Any]) -> Tuple[RuleResult, np.ndarray]:
+        """
+        Versión por lotes de check_record: evalúa primero las reglas iniciales
+        que no usan stats y solo pide a `get_stats(filas)` (matriz de
+        len(filas) x 6) las stats de las filas que las superan; las demás
+        quedan a 0. Devuelve (resultado, matriz de stats del lote).
+        """
+        batch = RuleBatch.from_columns(np.zeros((len(publishers), len(STAT_FIELDS)), dtype=np.int64), publishers)
+        rejected_by = np.full(len(batch), ACCEPTED, dtype=np.int16)
+        self._apply(batch, rejected_by, self._leading_codes)
+        rows = np.flatnonzero(rejected_by == ACCEPTED)
+        if len(rows):
+            batch.stats[rows] = get_stats(rows)
+            self._apply(batch, rejected_by, self._rest_codes)
+        return RuleResult(rejected_by == ACCEPTED, rejected_by, self.names()), batch.stats
+
+    def evaluate_heroes(self, heroes: Sequence) -> RuleResult:
+        return self.evaluate(RuleBatch.from_heroes(heroes))
+
+
+# Las cuatro reglas de negocio originales de Hero.validate_hero
+DEFAULT_RULES = RuleSet((
+    PublisherRule(("Marvel Comics",)),
+    MinStatRule(15),
+    ValueCountRule(0, 3, name="zeros"),
+    ValueCountRule(100, 3, name="hundreds"),
+))
+
+# Perfiles con nombre (p. ej. uno por cliente); se pueden registrar más en ejecución
+PROFILES: Dict[str, RuleSet] = {"default": DEFAULT_RULES}
+
+
+def get_rules(profile: str = "default") -> RuleSet:
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise KeyError(f"Perfil de reglas desconocido: {profile}") from None
+
+
+def load_rules(path: str) -> RuleSet:
+    """Lee un perfil desde un JSON con la misma forma que RuleSet.to_config()."""
+    with open(path, "r", encoding="utf-8") as f:
+        return RuleSet.from_config(json.load(f))
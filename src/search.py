@@ -1,46 +1,329 @@
-from difflib import get_close_matches
-from typing import List
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
 
 # Bloque de importación seguro (para evitar errores de ruta)
 try:
     from src.models import Hero
+    from src import metrics
 except ImportError:
     from models import Hero
+    import metrics
 
-def search_hero(heroes: List[Hero], query: str, limit: int = 5) -> List[Hero]:
+# Marca de fin de palabra dentro de los nodos del trie
+_END = "\0"
+# Candidatos (por trigramas compartidos) que se re-ordenan con edit distance
+FUZZY_CANDIDATES = 32
+# Trigramas presentes en más términos que esto apenas discriminan: en la
+# búsqueda difusa se ignoran (salvo que no quede ninguno más raro)
+MAX_FUZZY_POSTING = 2000
+# Búsqueda incremental: tamaño del LRU de consultas y tamaño máximo del
+# conjunto de candidatos que se conserva para reutilizar en la siguiente tecla
+QUERY_CACHE_SIZE = 128
+MAX_REUSED_CANDIDATES = 20000
+
+
+def normalize_name(text: str) -> str:
+    """Minúsculas, sin acentos y con cualquier signo convertido en espacio."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join("".join(c if c.isalnum() else " " for c in text).split())
+
+
+def _trigrams(text: str) -> List[str]:
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def bounded_levenshtein(a: str, b: str, max_dist: int) -> Optional[int]:
+    """Distancia de edición, o None en cuanto se sabe que supera `max_dist`."""
+    if abs(len(a) - len(b)) > max_dist:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            # min() inline: este bucle es el punto caliente de la búsqueda difusa
+            cost = previous[j - 1] + (ca != cb)
+            insert = current[j - 1] + 1
+            if insert < cost:
+                cost = insert
+            delete = previous[j] + 1
+            if delete < cost:
+                cost = delete
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_dist:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_dist else None
+
+
+class HeroNameIndex:
+    """
+    Índice de nombres construido una vez por dataset.
+
+    Cada héroe aporta varios términos normalizados: su nombre, sus alias
+    (`biography.aliases`) y su nombre real (`biography.fullName`).
+    - trie de prefijos: coincidencias exactas y por prefijo.
+    - índice invertido de trigramas: coincidencias parciales (substring) y
+      generación de candidatos para la búsqueda tolerante a erratas, que
+      luego se re-ordenan con una distancia de edición acotada.
+    """
+
+    def __init__(self, heroes: Iterable[Hero]):
+        self.heroes: List[Hero] = []
+        self._terms: List[str] = []        # id de término -> texto normalizado
+        self._owner: List[int] = []        # id de término -> posición del héroe
+        self._is_name: List[bool] = []     # el término es el nombre principal
+        self._trie: Dict = {}
+        self._grams: Dict[str, List[int]] = {}
+
+        for hero in heroes:
+            pos = len(self.heroes)
+            self.heroes.append(hero)
+            terms = [hero.name]
+            if hero.biography:
+                terms += list(hero.biography.aliases or []) + [hero.biography.fullName]
+            seen = set()
+            for i, term in enumerate(terms):
+                norm = normalize_name(term)
+                if norm and norm not in seen and norm != "-":
+                    seen.add(norm)
+                    self._add_term(norm, pos, i == 0)
+
+    def _add_term(self, norm: str, pos: int, is_name: bool):
+        term_id = len(self._terms)
+        self._terms.append(norm)
+        self._owner.append(pos)
+        self._is_name.append(is_name)
+
+        node = self._trie
+        for char in norm:
+            node = node.setdefault(char, {})
+        node.setdefault(_END, []).append(term_id)
+
+        for gram in set(_trigrams(f"${norm}$")):
+            self._grams.setdefault(gram, []).append(term_id)
+
+    def __len__(self) -> int:
+        return len(self.heroes)
+
+    def term(self, term_id: int) -> str:
+        return self._terms[term_id]
+
+    def is_name(self, term_id: int) -> bool:
+        return self._is_name[term_id]
+
+    # --- BLOQUES DE CONSULTA ---
+    def _node(self, prefix: str) -> Optional[Dict]:
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, norm: str) -> List[int]:
+        """Términos idénticos a la consulta, con los nombres principales primero."""
+        node = self._node(norm)
+        if node is None or _END not in node:
+            return []
+        return sorted(node[_END], key=lambda t: not self._is_name[t])
+
+    def prefix(self, norm: str, limit: int) -> List[int]:
+        """Hasta `limit` términos que empiezan por la consulta (recorrido del trie)."""
+        node = self._node(norm)
+        found: List[int] = []
+        stack = [node] if node is not None else []
+        while stack and len(found) < limit:
+            current = stack.pop()
+            found.extend(current.get(_END, ()))
+            stack.extend(child for key, child in current.items() if key != _END)
+        # Nombres principales antes que alias / nombre real
+        return sorted(found, key=lambda t: (not self._is_name[t], t))[:limit]
+
+    def substring(self, norm: str) -> Iterator[int]:
+        """
+        Términos que contienen la consulta, en orden de carga (generador:
+        el consumidor deja de iterar en cuanto tiene suficientes).
+        """
+        grams = _trigrams(norm)
+        if not grams:
+            # Consultas de 1-2 caracteres: no hay trigramas, recorremos los términos
+            candidates: Iterable[int] = range(len(self._terms))
+        else:
+            candidates = self.shortest_posting(norm)
+        return (t for t in candidates if norm in self._terms[t])
+
+    def shortest_posting(self, norm: str) -> Sequence[int]:
+        """
+        La lista de postings más corta entre los trigramas de la consulta:
+        un superconjunto de los términos que la contienen (basta verificar).
+        """
+        return min((self._grams.get(gram, ()) for gram in set(_trigrams(norm))), key=len)
+
+    def fuzzy(self, norm: str, limit: int) -> List[int]:
+        """Términos parecidos: candidatos por trigramas + edit distance acotada."""
+        postings = sorted(
+            (self._grams[gram] for gram in set(_trigrams(f"${norm}$")) if gram in self._grams),
+            key=len,
+        )
+        if not postings:
+            return []
+        selective = [ids for ids in postings if len(ids) <= MAX_FUZZY_POSTING] or postings[:2]
+
+        shared = Counter()
+        for ids in selective:
+            shared.update(ids)
+
+        # La cota se va estrechando: cuando ya hay suficientes resultados,
+        # solo interesan candidatos tan buenos como el peor de ellos
+        max_dist = max(1, int(len(norm) * 0.4))
+        keep = limit * 2
+        scored = []
+        for term_id, _ in shared.most_common(FUZZY_CANDIDATES):
+            dist = bounded_levenshtein(norm, self._terms[term_id], max_dist)
+            if dist is not None:
+                scored.append((dist, term_id))
+                if len(scored) >= keep:
+                    scored.sort()
+                    del scored[keep:]
+                    max_dist = scored[-1][0]
+        scored.sort()
+        return [term_id for _, term_id in scored]
+
+    def heroes_for(self, term_ids: Iterable[int], limit: int, taken: set) -> List[Hero]:
+        """Convierte términos en héroes únicos, respetando el orden y `limit`."""
+        result = []
+        for term_id in term_ids:
+            if len(taken) >= limit:
+                break
+            pos = self._owner[term_id]
+            if pos not in taken:
+                taken.add(pos)
+                result.append(self.heroes[pos])
+        return result
+
+    # --- API PÚBLICA ---
+    @metrics.timed("search_seconds", kind="search")
+    def search(self, query: str, limit: int = 5) -> List[Hero]:
+        """
+        Prioridad:
+        1. Coincidencia exacta (nombre, alias o nombre real).
+        2. Coincidencia parcial: primero por prefijo, después substring.
+        3. Coincidencia difusa para errores tipográficos.
+        """
+        norm = normalize_name(query)
+        if not norm or limit <= 0:
+            return []
+
+        # 1. Match Exacto (Rápido)
+        exact = self.exact(norm)
+        if exact:
+            return self.heroes_for(exact, limit, set())
+
+        # 2. Match Parcial (Contiene el texto)
+        taken: set = set()
+        partials = self.heroes_for(self.prefix(norm, limit * 4), limit, taken)
+        if len(partials) < limit:
+            partials += self.heroes_for(self.substring(norm), limit, taken)
+        if partials:
+            return partials
+
+        # 3. Sugerencias / Fuzzy Match (Si escribió mal el nombre)
+        return self.heroes_for(self.fuzzy(norm, limit), limit, set())
+
+
+class HeroSearcher:
+    """
+    API de búsqueda mientras se escribe, pensada para la UI.
+
+    - suggest(): coincidencias por prefijo y substring. Si la consulta
+      extiende la anterior (se ha tecleado una letra más), filtra los
+      candidatos de la tecla previa en lugar de consultar el índice.
+    - LRU con los resultados de las últimas consultas.
+    - Acceso O(1) a un héroe por ID o por nombre exacto.
+    """
+
+    def __init__(self, index: HeroNameIndex, cache_size: int = QUERY_CACHE_SIZE):
+        self.index = index
+        self.by_id: Dict[int, Hero] = {h.id: h for h in index.heroes}
+        self.by_name: Dict[str, Hero] = {h.name: h for h in index.heroes}
+        self._cache: "OrderedDict[tuple, List[Hero]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._last_query: Optional[str] = None
+        self._last_candidates: Optional[List[int]] = None
+
+    def get(self, hero_id: int) -> Optional[Hero]:
+        return self.by_id.get(hero_id)
+
+    def get_by_name(self, name: str) -> Optional[Hero]:
+        return self.by_name.get(name)
+
+    def _candidates(self, norm: str) -> Iterable[int]:
+        """Términos que contienen `norm`, reutilizando los de la tecla anterior."""
+        previous = self._last_query
+        if previous is not None and self._last_candidates is not None and norm.startswith(previous):
+            candidates = [t for t in self._last_candidates if norm in self.index.term(t)]
+        else:
+            candidates = None
+            if len(norm) >= 3:
+                smallest = self.index.shortest_posting(norm)
+                if len(smallest) <= MAX_REUSED_CANDIDATES:
+                    candidates = [t for t in smallest if norm in self.index.term(t)]
+
+        self._last_query = norm
+        self._last_candidates = candidates
+        # Sin candidatos reutilizables (consulta muy corta o muy común): generador perezoso
+        return candidates if candidates is not None else self.index.substring(norm)
+
+    @metrics.timed("search_seconds", kind="suggest")
+    def suggest(self, query: str, limit: int = 10) -> List[Hero]:
+        """Héroes cuyo nombre, alias o nombre real empieza por / contiene la consulta."""
+        norm = normalize_name(query)
+        if not norm or limit <= 0:
+            return []
+
+        key = (norm, limit)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            # Copia: el llamador puede modificar la lista sin tocar la caché
+            return list(cached)
+
+        taken: set = set()
+        results = self.index.heroes_for(self.index.prefix(norm, limit * 4), limit, taken)
+        if len(results) < limit:
+            results += self.index.heroes_for(self._candidates(norm), limit, taken)
+        if not results:
+            # Nada coincide literalmente: sugerimos por parecido
+            results = self.index.heroes_for(self.index.fuzzy(norm, limit), limit, taken)
+
+        self._cache[key] = results
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return list(results)
+
+
+def search_hero(heroes: Union[Sequence[Hero], HeroNameIndex], query: str, limit: int = 5) -> List[Hero]:
     """
     Busca héroes por nombre.
     Prioridad:
     1. Coincidencia exacta.
     2. Coincidencia parcial (substring).
     3. Coincidencia difusa (fuzzy search) para errores tipográficos.
+
+    Acepta un HeroNameIndex ya construido (o cualquier objeto con
+    `name_index`, como HeroDataset); con una lista lo construye al vuelo.
     """
-    # Creamos un diccionario para búsqueda rápida: {nombre_minuscula: objeto_heroe}
-    names_map = {h.name.lower(): h for h in heroes}
-    query = query.lower().strip()
-
-    # 1. Match Exacto (Rápido)
-    if query in names_map:
-        return [names_map[query]]
-
-    # 2. Match Parcial (Contiene el texto)
-    partials = [
-        h for h in heroes
-        if query in h.name.lower()
-    ]
-    
-    if partials:
-        # Devolvemos los parciales, limitando la cantidad
-        return partials[:limit]
-
-    # 3. Sugerencias / Fuzzy Match (Si escribió mal el nombre)
-    # cutoff=0.6 significa que debe parecerse al menos un 60%
-    suggestions = get_close_matches(
-        query,
-        names_map.keys(),
-        n=limit,
-        cutoff=0.6
-    )
-
-    # Recuperamos los objetos Hero basados en los nombres sugeridos
-    return [names_map[name] for name in suggestions]
\ No newline at end of file
+    if isinstance(heroes, HeroNameIndex):
+        index = heroes
+    elif hasattr(heroes, "name_index"):
+        index = heroes.name_index
+    else:
+        index = HeroNameIndex(heroes)
+    return index.search(query, limit)
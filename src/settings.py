@@ -0,0 +1,89 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping, Optional
+
+# Raíz del proyecto: el .env se busca aquí sin importar desde dónde se ejecute
+BASE_DIR = Path(__file__).resolve().parent.parent
+ENV_PATH = BASE_DIR / ".env"
+
+SUPERHERO_API_URL = "https://superheroapi.com/api"
+DEFAULT_IMAGE_ENDPOINT = "https://iebs-resource.cognitiveservices.azure.com/openai/deployments/dall-e-3/images/generations?api-version=2024-02-01"
+
+
+def _bool(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "si", "sí")
+
+
+def _path(value: str) -> str:
+    """Rutas relativas del .env respecto a la raíz del proyecto, no al directorio actual."""
+    return str(BASE_DIR / os.path.expanduser(value))
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Configuración de la aplicación, resuelta una sola vez desde el entorno
+    (y el .env). Los módulos no leen variables de entorno al importarse:
+    piden get_settings() cuando las necesitan.
+    """
+    # SuperHero API y almacén local
+    superhero_token: Optional[str] = None
+    cache_ttl: float = 7 * 24 * 3600
+    cache_warm: bool = False
+    # Dataset compartido y pre-renderizado
+    refresh_interval: float = 0.0
+    radar_workers: int = 2
+    radar_dir: str = str(BASE_DIR / "data" / "radars")
+    # Procesos para simular torneos (0 = en el propio proceso)
+    battle_workers: int = 0
+    # Generación de imágenes IA
+    openai_api_key: Optional[str] = None
+    image_endpoint: str = DEFAULT_IMAGE_ENDPOINT
+    image_timeout: float = 90.0
+    image_dir: str = str(BASE_DIR / "data" / "ai_images")
+    # Métricas (ver src/metrics.py)
+    metrics: str = ""
+    metrics_interval: float = 15.0
+
+    @property
+    def superhero_base_url(self) -> str:
+        return f"{SUPERHERO_API_URL}/{self.superhero_token}"
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "Settings":
+        defaults = cls()
+        return cls(
+            superhero_token=env.get("SUPERHERO_TOKEN") or None,
+            cache_ttl=float(env.get("SUPERHERO_CACHE_TTL", defaults.cache_ttl)),
+            cache_warm=_bool(env.get("SUPERHERO_CACHE_WARM")),
+            refresh_interval=float(env.get("SUPERHERO_REFRESH_INTERVAL", defaults.refresh_interval)),
+            radar_workers=int(env.get("SUPERHERO_RADAR_WORKERS", defaults.radar_workers)),
+            radar_dir=_path(env.get("SUPERHERO_RADAR_DIR", defaults.radar_dir)),
+            battle_workers=int(env.get("SUPERHERO_BATTLE_WORKERS", defaults.battle_workers)),
+            openai_api_key=env.get("OPENAI_API_KEY") or None,
+            image_endpoint=env.get("OPENAI_IMAGE_ENDPOINT", defaults.image_endpoint),
+            image_timeout=float(env.get("OPENAI_IMAGE_TIMEOUT", defaults.image_timeout)),
+            image_dir=_path(env.get("OPENAI_IMAGE_DIR", defaults.image_dir)),
+            metrics=env.get("SUPERHERO_METRICS", defaults.metrics),
+            metrics_interval=float(env.get("SUPERHERO_METRICS_INTERVAL", defaults.metrics_interval)),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Settings del proceso. La primera llamada carga el .env de la raíz del
+    proyecto (sin pisar variables ya definidas en el entorno).
+    """
+    if ENV_PATH.exists():
+        # Import diferido: python-dotenv solo se carga si hay .env que leer
+        from dotenv import load_dotenv
+        load_dotenv(dotenv_path=ENV_PATH, override=False)
+    return Settings.from_env(os.environ)
+
+
+def reset_settings():
+    """Olvida la configuración resuelta (p. ej. tras cambiar el entorno)."""
+    get_settings.cache_clear()
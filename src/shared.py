@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero
+    from src.dataset import HeroDataset
+except ImportError:
+    from models import Hero
+    from dataset import HeroDataset
+
+# Reintentos de la carga mientras el dataset compartido está vacío (segundos)
+EMPTY_RETRY_INTERVAL = 30.0
+EMPTY_RETRY_MAX = 600.0
+
+
+class SharedDataset:
+    """
+    Dataset compartido por todo el proceso (todas las sesiones de Streamlit).
+
+    - `get()` devuelve el HeroDataset vigente sin bloqueos ni copias: es una
+      sola lectura de atributo. Las sesiones lo tratan como solo lectura.
+    - `refresh()` construye un dataset nuevo completo (incluidas la tabla
+      columnar y el índice de nombres) y solo entonces sustituye la
+      referencia: una petición ve el dataset anterior o el nuevo, nunca uno
+      a medio construir.
+    - `start(interval)` refresca periódicamente en un hilo en segundo plano
+      (y reintenta la carga mientras el dataset esté vacío).
+    - `on_publish(dataset)` se llama con cada dataset publicado (el inicial
+      incluido), p. ej. para pre-renderizar gráficas.
+    """
+
+    def __init__(self, load: Callable[[], Iterable[Hero]],
+                 on_publish: Optional[Callable[[HeroDataset], None]] = None):
+        self._load = load
+        self._on_publish = on_publish
+        self._refresh_lock = threading.Lock()
+        self._stop: Optional[threading.Event] = None
+        self._current = self._build()
+        self.loaded_at = time.time()
+        self.generation = 0
+        self._publish(self._current)
+
+    def _build(self) -> HeroDataset:
+        dataset = HeroDataset(self._load())
+        # Estructuras perezosas construidas aquí, fuera de las peticiones
+        dataset.table
+        dataset.name_index
+        return dataset
+
+    def _publish(self, dataset: HeroDataset):
+        if self._on_publish is not None:
+            try:
+                self._on_publish(dataset)
+            except Exception as e:
+                print(f"⚠️ Error en on_publish: {e}")
+
+    def get(self) -> HeroDataset:
+        return self._current
+
+    def refresh(self) -> bool:
+        """
+        Recarga y publica el dataset nuevo. Si ya hay un refresco en curso
+        no hace nada; si la carga falla o no devuelve héroes, se conserva el
+        dataset actual. Devuelve True si se publicó uno nuevo.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            dataset = self._build()
+            if not dataset:
+                print("⚠️ Refresco sin héroes válidos: se mantiene el dataset actual.")
+                return False
+            # Intercambio atómico: asignar una referencia es una sola operación
+            self._current = dataset
+            self.loaded_at = time.time()
+            self.generation += 1
+            print(f"🔄 Dataset compartido actualizado ({len(dataset)} héroes).")
+            self._publish(dataset)
+            return True
+        except Exception as e:
+            print(f"⚠️ Error refrescando el dataset compartido: {e}")
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_async(self) -> threading.Thread:
+        """Lanza refresh() en un hilo y vuelve enseguida."""
+        thread = threading.Thread(target=self.refresh, name="dataset-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def start(self, interval: float) -> Optional[threading.Event]:
+        """
+        Refresca cada `interval` segundos (0 o negativo: desactivado).
+        Mientras el dataset esté vacío (sin token, sin red...) reintenta la
+        carga con backoff (EMPTY_RETRY_INTERVAL, hasta EMPTY_RETRY_MAX)
+        aunque el refresco periódico esté desactivado; en ese caso el hilo
+        termina en cuanto se publica un dataset con héroes.
+        """
+        if self._stop is not None or (interval <= 0 and self._current):
+            return self._stop
+        self._stop = threading.Event()
+
+        def loop(stop: threading.Event):
+            retry = EMPTY_RETRY_INTERVAL
+            while True:
+                wait = interval
+                if not self._current:
+                    wait = min(retry, interval) if interval > 0 else retry
+                    retry = min(retry * 2, EMPTY_RETRY_MAX)
+                if stop.wait(wait):
+                    return
+                self.refresh()
+                if self._current:
+                    retry = EMPTY_RETRY_INTERVAL
+                    if interval <= 0:
+                        return
+
+        threading.Thread(target=loop, args=(self._stop,), name="dataset-refresher", daemon=True).start()
+        return self._stop
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
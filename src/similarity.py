@@ -0,0 +1,292 @@
+import collections
+import heapq
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero, STAT_FIELDS
+    from src.table import top_k_rows
+    from src import metrics
+except ImportError:
+    from models import Hero, STAT_FIELDS
+    from table import top_k_rows
+    import metrics
+
+METRICS = ("euclidean", "cosine")
+
+# Hasta este tamaño se compara contra toda la matriz de una vez (NumPy);
+# por encima se construye un KD-tree
+BRUTE_FORCE_MAX = 4096
+
+# Versiones de dataset cuyos índices se conservan
+MAX_CACHED_VERSIONS = 4
+
+
+def stats_matrix(stats: np.ndarray, metric: str = "euclidean") -> np.ndarray:
+    """
+    Matriz (N, 6) float64 normalizada para comparar héroes:
+    - euclidean: stats / 100 (todas las stats comparten la escala 0-100).
+    - cosine: cada fila con norma 1; así la distancia euclídea entre filas
+      es monótona con la distancia coseno (|a - b|² = 2 (1 - cos)) y sirve
+      el mismo KD-tree. Las filas a cero se quedan a cero.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Métrica desconocida: {metric!r} (opciones: {', '.join(METRICS)})")
+    matrix = np.ascontiguousarray(stats, dtype=np.float64) / 100.0
+    if metric == "cosine":
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class KDTree:
+    """
+    KD-tree estático sobre una matriz (N, D), guardado en arrays planos:
+    cada nodo cubre un tramo contiguo de `order` y las hojas (<= leaf_size
+    puntos) se evalúan con NumPy de una vez. Se divide por la dimensión de
+    mayor rango en la mediana (argpartition, O(n) por nivel).
+
+    Las consultas devuelven distancias euclídeas AL CUADRADO; los empates
+    se resuelven por fila, igual que la fuerza bruta.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 64):
+        self.points = points
+        self.leaf_size = leaf_size
+        n = len(points)
+        self.order = np.arange(n)
+        # Nodos: tramo [start, end), dimensión y valor de corte, hijos (-1 = hoja)
+        self._start: List[int] = []
+        self._end: List[int] = []
+        self._dim: List[int] = []
+        self._split: List[float] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        if n:
+            self._build()
+
+    def _add_node(self, start: int, end: int) -> int:
+        self._start.append(start)
+        self._end.append(end)
+        self._dim.append(-1)
+        self._split.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        return len(self._start) - 1
+
+    def _build(self):
+        stack = [self._add_node(0, len(self.points))]
+        while stack:
+            node = stack.pop()
+            start, end = self._start[node], self._end[node]
+            if end - start <= self.leaf_size:
+                continue
+            rows = self.order[start:end]
+            block = self.points[rows]
+            spread = block.max(axis=0) - block.min(axis=0)
+            dim = int(np.argmax(spread))
+            if spread[dim] == 0:
+                continue  # todos los puntos iguales: hoja
+            mid = (end - start) // 2
+            part = np.argpartition(block[:, dim], mid)
+            self.order[start:end] = rows[part]
+            self._dim[node] = dim
+            self._split[node] = float(block[part[mid], dim])
+            self._left[node] = self._add_node(start, start + mid)
+            self._right[node] = self._add_node(start + mid, end)
+            stack.extend((self._left[node], self._right[node]))
+
+    def _leaf(self, node: int, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows = self.order[self._start[node]:self._end[node]]
+        diff = self.points[rows] - x
+        return rows, np.einsum("ij,ij->i", diff, diff)
+
+    def query(self, x: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(filas, distancias²) de los k puntos más cercanos a `x`, ordenados."""
+        if k <= 0 or not self._start:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        x_list = x.tolist()
+        best: List[Tuple[float, int]] = []  # montículo de máximos: (-dist², -fila)
+        bound = np.inf
+        # (nodo, cota inferior de la distancia², desplazamiento por eje hasta su caja)
+        stack = [(0, 0.0, [0.0] * len(x_list))]
+        while stack:
+            node, lower, offsets = stack.pop()
+            if lower > bound:
+                continue
+            if self._left[node] < 0:
+                rows, dists = self._leaf(node, x)
+                if len(best) == k:
+                    # Solo los candidatos que pueden entrar en el top-k pasan a Python
+                    keep = dists <= bound
+                    rows, dists = rows[keep], dists[keep]
+                for row, dist in zip(rows.tolist(), dists.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist, -row))
+                    elif (dist, row) < (-best[0][0], -best[0][1]):
+                        heapq.heapreplace(best, (-dist, -row))
+                if len(best) == k:
+                    bound = -best[0][0]
+                continue
+            dim = self._dim[node]
+            diff = x_list[dim] - self._split[node]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            # Cota del lejano: se sustituye el desplazamiento previo en `dim` por
+            # la distancia al plano de corte (distancia incremental de Arya-Mount)
+            far_offsets = offsets.copy()
+            far_offsets[dim] = diff
+            far_lower = lower - offsets[dim] * offsets[dim] + diff * diff
+            # El lejano se apila primero: se visita después, con la cota ya ajustada
+            stack.append((far, far_lower, far_offsets))
+            stack.append((near, lower, offsets))
+        best.sort(key=lambda item: (-item[0], -item[1]))
+        return (np.array([-row for _, row in best], dtype=np.intp),
+                np.array([-dist for dist, _ in best]))
+
+    def query_radius(self, x: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(filas, distancias²) de los puntos a distancia <= radius, ordenados."""
+        if not self._start:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        x_list = x.tolist()
+        bound = radius * radius
+        found_rows, found_dists = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._left[node] < 0:
+                rows, dists = self._leaf(node, x)
+                mask = dists <= bound
+                found_rows.append(rows[mask])
+                found_dists.append(dists[mask])
+                continue
+            diff = x_list[self._dim[node]] - self._split[node]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            stack.append(near)
+            if diff * diff <= bound:
+                stack.append(far)
+        rows = np.concatenate(found_rows)
+        dists = np.concatenate(found_dists)
+        order = np.lexsort((rows, dists))
+        return rows[order], dists[order]
+
+
+class SimilarityIndex:
+    """
+    Búsqueda de héroes parecidos por sus 6 powerstats, construida una vez
+    por versión del dataset (ver get_similarity_index):
+    - hasta `brute_force_max` héroes: distancia exacta contra toda la matriz
+      en una operación NumPy;
+    - por encima: KD-tree (misma respuesta, sin recorrer todo el roster).
+
+    Distancias devueltas: euclídea sobre stats / 100 (0 a √6) o distancia
+    coseno (1 - cos, 0 a 1) según `metric`. Los empates se resuelven por
+    orden de fila.
+    """
+
+    def __init__(self, table, metric: str = "euclidean", brute_force_max: int = BRUTE_FORCE_MAX,
+                 leaf_size: int = 64):
+        self.table = table
+        self.metric = metric
+        self.matrix = stats_matrix(table.stats, metric)
+        self._rows = {int(hero_id): row for row, hero_id in enumerate(table.ids.tolist())}
+        self.tree: Optional[KDTree] = None
+        if len(self.matrix) > brute_force_max:
+            self.tree = KDTree(self.matrix, leaf_size)
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def vector(self, hero: Hero) -> np.ndarray:
+        """Vector normalizado del héroe (su fila si está en el dataset)."""
+        row = self._rows.get(hero.id)
+        if row is not None:
+            return self.matrix[row]
+        ps = hero.powerstats
+        values = [getattr(ps, stat, 0) if ps else 0 for stat in STAT_FIELDS]
+        return stats_matrix(np.array([values]), self.metric)[0]
+
+    def _distance(self, sq_dists: np.ndarray) -> np.ndarray:
+        if self.metric == "cosine":
+            return sq_dists / 2.0
+        return np.sqrt(sq_dists)
+
+    def _threshold(self, distance: float) -> float:
+        """Distancia de la métrica -> distancia euclídea sobre la matriz."""
+        if self.metric == "cosine":
+            return float(np.sqrt(2.0 * distance))
+        return distance
+
+    # --- CONSULTAS POR FILA ---
+    def knn_rows(self, x: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(filas, distancias) de los k vectores más cercanos a `x`."""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        if self.tree is not None:
+            rows, sq = self.tree.query(x, k)
+        else:
+            diff = self.matrix - x
+            sq_all = np.einsum("ij,ij->i", diff, diff)
+            rows = top_k_rows(sq_all, k)
+            sq = sq_all[rows]
+        return rows, self._distance(sq)
+
+    def radius_rows(self, x: np.ndarray, distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(filas, distancias) de los vectores a `distance` o menos de `x`, ordenados."""
+        radius = self._threshold(distance)
+        if self.tree is not None:
+            rows, sq = self.tree.query_radius(x, radius)
+        else:
+            diff = self.matrix - x
+            sq_all = np.einsum("ij,ij->i", diff, diff)
+            rows = np.flatnonzero(sq_all <= radius * radius)
+            rows = rows[np.argsort(sq_all[rows], kind="stable")]  # empates por fila
+            sq = sq_all[rows]
+        return rows, self._distance(sq)
+
+    # --- CONSULTAS POR HÉROE ---
+    def _results(self, hero: Hero, rows: np.ndarray, dists: np.ndarray,
+                 limit: Optional[int] = None) -> List[Tuple[Hero, float]]:
+        own = self._rows.get(hero.id)
+        results = [(self.table.heroes[row], dist) for row, dist in zip(rows.tolist(), dists.tolist())
+                   if row != own]
+        return results[:limit] if limit is not None else results
+
+    def neighbors(self, hero: Hero, k: int = 5) -> List[Tuple[Hero, float]]:
+        """Los k héroes más parecidos (sin el propio héroe), con su distancia."""
+        with metrics.timer("similarity_seconds", kind="knn"):
+            rows, dists = self.knn_rows(self.vector(hero), k + 1)
+            return self._results(hero, rows, dists, k)
+
+    def within(self, hero: Hero, distance: float) -> List[Tuple[Hero, float]]:
+        """Héroes a `distance` o menos (sin el propio héroe), del más al menos parecido."""
+        with metrics.timer("similarity_seconds", kind="radius"):
+            rows, dists = self.radius_rows(self.vector(hero), distance)
+            return self._results(hero, rows, dists)
+
+
+# --- CACHÉ POR VERSIÓN ---
+_cache: "collections.OrderedDict[Tuple[int, str], SimilarityIndex]" = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_similarity_index(dataset, metric: str = "euclidean") -> SimilarityIndex:
+    """
+    Índice de la versión actual del dataset, compartido por todas las
+    sesiones; solo se reconstruye cuando cambia `dataset.version`.
+    """
+    key = (dataset.version, metric)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+    index = SimilarityIndex(dataset.table, metric)
+    with _cache_lock:
+        index = _cache.setdefault(key, index)
+        while len(_cache) > MAX_CACHED_VERSIONS * len(METRICS):
+            _cache.popitem(last=False)
+    return index
@@ -0,0 +1,295 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero, PowerStats, Appearance, Biography, STAT_FIELDS
+    from src.indexes import SortedStatIndex
+except ImportError:
+    from models import Hero, PowerStats, Appearance, Biography, STAT_FIELDS
+    from indexes import SortedStatIndex
+
+# Formato (little-endian):
+#   MAGIC | versión u32 | tamaño cabecera u32 | cabecera JSON | secciones
+# Cada sección empieza alineada a 8 bytes; la cabecera guarda su posición,
+# tipo y forma, las huellas de origen y de reglas, y el CRC32 de las secciones.
+MAGIC = b"HEROSNAP"
+FORMAT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snap"
+_PREFIX = struct.Struct("<8sII")
+_ALIGN = 8
+
+# Campos de texto guardados como referencia (int32) a la tabla de cadenas; -1 = None
+TEXT_FIELDS = (
+    "name", "slug", "fullName", "alterEgos", "placeOfBirth", "firstAppearance",
+    "publisher", "alignment", "gender", "race", "eyeColor", "hairColor",
+)
+# Campos compuestos (listas / diccionarios de texto): se guardan como una
+# cadena con separadores (o como JSON si no son solo texto)
+JSON_FIELDS = ("aliases", "height", "weight", "images")
+_FIELDS = TEXT_FIELDS + JSON_FIELDS
+_NONE = -1
+_LIST_MARK, _DICT_MARK, _SEP = "\x1e", "\x1d", "\x1f"
+
+
+def _is_plain(values) -> bool:
+    return all(isinstance(v, str) and _SEP not in v for v in values)
+
+
+def _encode_compound(value) -> str:
+    """Lista / dict de cadenas -> texto con separadores; otros valores -> JSON."""
+    if isinstance(value, list) and _is_plain(value):
+        return _LIST_MARK + _SEP.join(value)
+    if isinstance(value, dict) and _is_plain(value) and _is_plain(value.values()):
+        return _DICT_MARK + _SEP.join(part for item in value.items() for part in item)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _decode_compound(text: str):
+    """Inversa de _encode_compound (siempre devuelve un objeto nuevo)."""
+    mark, body = text[:1], text[1:]
+    if mark == _LIST_MARK:
+        return body.split(_SEP) if body else []
+    if mark == _DICT_MARK:
+        parts = body.split(_SEP) if body else []
+        return dict(zip(parts[::2], parts[1::2]))
+    return json.loads(text)
+
+
+class SnapshotError(ValueError):
+    """Snapshot ilegible, corrupto o de otra versión del formato."""
+
+
+def file_fingerprint(path: str) -> str:
+    """Huella barata de un fichero de origen: ruta, tamaño y fecha de modificación."""
+    st = os.stat(path)
+    return fingerprint(os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def fingerprint(*parts) -> str:
+    """Huella corta y estable de varios valores (p. ej. huella de fichero + IDs)."""
+    text = "|".join(str(part) for part in parts)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _hero_fields(hero: Hero) -> Tuple:
+    bio, app = hero.biography, hero.appearance
+    return (
+        hero.name, hero.slug, bio.fullName, bio.alterEgos, bio.placeOfBirth, bio.firstAppearance,
+        bio.publisher, bio.alignment, app.gender, app.race, app.eyeColor, app.hairColor,
+        bio.aliases, app.height, app.weight, hero.images,
+    )
+
+
+# --- ESCRITURA ---
+def write_snapshot(path: str, heroes: Sequence[Hero], source: str, rules: str,
+                   report: Optional[Dict] = None, index_orders: Optional[Dict[str, Sequence[int]]] = None):
+    """
+    Escribe el dataset validado en `path` (de forma atómica: fichero temporal
+    + os.replace). `source` y `rules` son las huellas que lo invalidan;
+    `report` (resumen de descartes) e `index_orders` (órdenes precalculados,
+    ver SortedStatIndex.orders) son opcionales.
+    """
+    lookup: Dict[str, int] = {}
+    refs: List[int] = []
+    stats: List[int] = []
+
+    for hero in heroes:
+        ps = hero.powerstats
+        stats += (ps.intelligence, ps.strength, ps.speed, ps.durability, ps.power, ps.combat)
+        for col, value in enumerate(_hero_fields(hero)):
+            if col >= len(TEXT_FIELDS):
+                value = _encode_compound(value)
+            elif value is None:
+                refs.append(_NONE)
+                continue
+            elif not isinstance(value, str):
+                raise SnapshotError(f"Campo {_FIELDS[col]!r} no es texto en el héroe {hero.id}")
+            ref = lookup.get(value)
+            if ref is None:
+                ref = lookup[value] = len(lookup)
+            refs.append(ref)
+
+    ids = np.array([hero.id for hero in heroes], dtype=np.int64)
+    stats = np.array(stats, dtype=np.int16).reshape(-1, len(STAT_FIELDS))
+    refs = np.array(refs, dtype=np.int32).reshape(-1, len(_FIELDS))
+
+    encoded = [s.encode("utf-8") for s in lookup]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    sections = [("ids", ids), ("stats", stats), ("refs", refs), ("string_offsets", offsets),
+                ("strings", np.frombuffer(b"".join(encoded), dtype=np.uint8))]
+    for key, order in (index_orders or {}).items():
+        sections.append((f"order:{key}", np.asarray(order, dtype=np.int32)))
+
+    # Posiciones relativas al inicio de la zona de secciones
+    layout, body, position = {}, [], 0
+    crc = 0
+    for name, array in sections:
+        data = np.ascontiguousarray(array).tobytes()
+        padding = b"\0" * (-len(data) % _ALIGN)
+        layout[name] = {"offset": position, "dtype": array.dtype.str, "shape": list(array.shape)}
+        body += [data, padding]
+        crc = zlib.crc32(padding, zlib.crc32(data, crc))
+        position += len(data) + len(padding)
+
+    header = json.dumps({
+        "count": len(heroes), "source": source, "rules": rules, "report": report or {},
+        "sections": layout, "checksum": crc,
+    }).encode("utf-8")
+    header += b" " * (-(_PREFIX.size + len(header)) % _ALIGN)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for chunk in body:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+# --- LECTURA ---
+class Snapshot:
+    """
+    Snapshot abierto con mmap. Las columnas numéricas (`ids`, `stats`,
+    órdenes) son arrays NumPy de solo lectura sobre el propio mmap, sin
+    copia; los héroes se materializan desde la tabla de cadenas bajo demanda.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotError("Snapshot vacío") from None
+
+        if len(self._mm) < _PREFIX.size:
+            raise SnapshotError("Snapshot truncado")
+        magic, version, header_size = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise SnapshotError("No es un snapshot de héroes")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Versión de formato {version} (se esperaba {FORMAT_VERSION})")
+        try:
+            self.header = json.loads(self._mm[_PREFIX.size:_PREFIX.size + header_size])
+        except ValueError:
+            raise SnapshotError("Cabecera ilegible") from None
+        self._base = _PREFIX.size + header_size
+
+        if verify and zlib.crc32(memoryview(self._mm)[self._base:]) != self.header["checksum"]:
+            raise SnapshotError("Checksum incorrecto")
+
+        self.count: int = self.header["count"]
+        self.source: str = self.header["source"]
+        self.rules: str = self.header["rules"]
+        self.report: Dict = self.header["report"]
+        self.ids = self._section("ids")
+        self.stats = self._section("stats")
+        self._refs = self._section("refs")
+        self._offsets = self._section("string_offsets")
+        self._strings = memoryview(self._mm)[self._base + self.header["sections"]["strings"]["offset"]:]
+
+    def _section(self, name: str) -> np.ndarray:
+        meta = self.header["sections"][name]
+        count = int(np.prod(meta["shape"], dtype=np.int64))
+        array = np.frombuffer(self._mm, dtype=np.dtype(meta["dtype"]), count=count,
+                              offset=self._base + meta["offset"])
+        return array.reshape(meta["shape"])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def index_orders(self) -> Dict[str, np.ndarray]:
+        """Órdenes precalculados guardados en el snapshot (clave 'stat:kind')."""
+        prefix = "order:"
+        return {name[len(prefix):]: self._section(name)
+                for name in self.header["sections"] if name.startswith(prefix)}
+
+    def _string_table(self) -> List[Optional[str]]:
+        """Todas las cadenas decodificadas, más None al final (para la referencia -1)."""
+        offsets = self._offsets.tolist()
+        blob = bytes(self._strings[:offsets[-1]])
+        table: List[Optional[str]] = [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+        table.append(None)
+        return table
+
+    def heroes(self) -> List[Hero]:
+        """Materializa los héroes: cada cadena se decodifica una sola vez y por columnas."""
+        table = self._string_table()
+        columns = []
+        for col in range(len(_FIELDS)):
+            values = [table[ref] for ref in self._refs[:, col].tolist()]
+            if col >= len(TEXT_FIELDS):
+                # Listas / dicts: un objeto nuevo por héroe (son mutables)
+                values = [_decode_compound(v) for v in values]
+            columns.append(values)
+
+        heroes = []
+        for hero_id, stats, fields in zip(self.ids.tolist(), self.stats.tolist(), zip(*columns)):
+            (name, slug, full_name, alter_egos, place, first, publisher, alignment,
+             gender, race, eye, hair, aliases, height, weight, images) = fields
+            heroes.append(Hero(
+                id=hero_id, name=name, slug=slug,
+                powerstats=PowerStats(*stats),
+                appearance=Appearance(gender, race, height, weight, eye, hair),
+                biography=Biography(full_name, alter_egos, aliases, place, first, publisher, alignment),
+                images=images,
+            ))
+        return heroes
+
+
+class SnapshotHeroes(list):
+    """
+    Lista de héroes cargada desde un snapshot. Conserva el Snapshot para que
+    HeroDataset reutilice sus columnas (stats sin copia) y órdenes precalculados.
+    """
+
+    def __init__(self, heroes: Iterable[Hero], snapshot: Snapshot):
+        super().__init__(heroes)
+        self.snapshot = snapshot
+
+
+def open_snapshot(path: str, source: str, rules: str) -> Optional[Snapshot]:
+    """
+    El snapshot de `path` si existe, está íntegro y corresponde a las huellas
+    indicadas; None en cualquier otro caso (hay que regenerarlo).
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, SnapshotError, KeyError) as e:
+        print(f"⚠️ Snapshot descartado ({path}): {e}")
+        return None
+    if snapshot.source != source or snapshot.rules != rules:
+        return None
+    return snapshot
+
+
+def load_snapshot_heroes(path: str, source: str, rules: str) -> Optional[SnapshotHeroes]:
+    snapshot = open_snapshot(path, source, rules)
+    if snapshot is None:
+        return None
+    return SnapshotHeroes(snapshot.heroes(), snapshot)
+
+
+def save_snapshot(path: str, heroes: Sequence[Hero], source: str, rules: str,
+                  report: Optional[Dict] = None, with_indexes: bool = True):
+    """
+    write_snapshot() con los órdenes de SortedStatIndex ya calculados. Un
+    fallo al escribir no es grave (la carga normal sigue funcionando).
+    """
+    try:
+        orders = SortedStatIndex(heroes).orders() if with_indexes else None
+        write_snapshot(path, heroes, source, rules, report, orders)
+    except (OSError, OverflowError, SnapshotError) as e:
+        print(f"⚠️ No se pudo guardar el snapshot ({path}): {e}")
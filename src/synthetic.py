@@ -0,0 +1,130 @@
+import json
+import random
+from typing import Any, Dict, Iterator, List
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import STAT_FIELDS
+except ImportError:
+    from models import STAT_FIELDS
+
+# Distribuciones aproximadas a las observadas en data/superheros.json
+PUBLISHERS = [
+    ("Marvel Comics", 0.35), ("DC Comics", 0.31), ("NBC - Heroes", 0.05),
+    ("Dark Horse Comics", 0.03), ("Image Comics", 0.02), ("George Lucas", 0.03),
+    ("SyFy", 0.02), ("null", 0.03), ("Shueisha", 0.03), ("Star Trek", 0.02),
+    ("Icon Comics", 0.02), ("IDW Publishing", 0.02), ("Team Epic TV", 0.02),
+    ("Wildstorm", 0.03), ("HarperCollins", 0.02),
+]
+RACES = [
+    ("null", 0.45), ("Human", 0.33), ("Mutant", 0.05), ("God / Eternal", 0.03),
+    ("Human / Radiation", 0.03), ("Alien", 0.03), ("Android", 0.02),
+    ("Cyborg", 0.02), ("Asgardian", 0.02), ("Symbiote", 0.02),
+]
+ALIGNMENTS = [("good", 0.68), ("bad", 0.28), ("neutral", 0.04)]
+GENDERS = [("Male", 0.7), ("Female", 0.27), ("-", 0.03)]
+COLORS = ["Blue", "Brown", "Green", "Red", "Black", "White", "Yellow", "-"]
+
+_SYLLABLES = ["an", "ar", "bel", "cap", "da", "dra", "el", "fal", "gor", "ha", "is",
+              "jon", "ka", "lo", "mar", "nov", "or", "pha", "quin", "ra", "sta",
+              "tor", "ul", "vex", "wan", "xa", "yo", "zor"]
+_SUFFIXES = ["Man", "Woman", "Girl", "Boy", "", "", "", "X", "Prime", "II"]
+
+
+def _pick(rng: random.Random, weighted) -> str:
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def _stat(rng: random.Random) -> str:
+    """Valor de stat como lo envía la API: texto, con 'null' y picos en 100/10/50."""
+    roll = rng.random()
+    if roll < 0.25:
+        return "null"
+    if roll < 0.33:
+        return "100"
+    if roll < 0.38:
+        return rng.choice(["10", "50", "75"])
+    return str(int(min(100, max(1, rng.gauss(55, 22)))))
+
+
+def _name(rng: random.Random) -> str:
+    word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    suffix = rng.choice(_SUFFIXES)
+    return f"{word} {suffix}".strip()
+
+
+def generate_hero(hero_id: int, rng: random.Random) -> Dict[str, Any]:
+    """Un registro con la misma forma que la respuesta de SuperHero API."""
+    name = _name(rng)
+    full_name = f"{_name(rng).split()[0]} {_name(rng).split()[0]}"
+    height_cm = rng.randint(120, 250)
+    weight_kg = rng.randint(40, 300)
+    return {
+        "response": "success",
+        "id": str(hero_id),
+        "name": name,
+        "powerstats": {stat: _stat(rng) for stat in STAT_FIELDS},
+        "biography": {
+            "full-name": full_name,
+            "alter-egos": "No alter egos found.",
+            "aliases": [_name(rng) for _ in range(rng.randint(0, 3))] or ["-"],
+            "place-of-birth": "-",
+            "first-appearance": f"Issue #{rng.randint(1, 500)} ({rng.randint(1940, 2020)})",
+            "publisher": _pick(rng, PUBLISHERS),
+            "alignment": _pick(rng, ALIGNMENTS),
+        },
+        "appearance": {
+            "gender": _pick(rng, GENDERS),
+            "race": _pick(rng, RACES),
+            "height": [f"{height_cm // 30}'{height_cm % 30 // 3}", f"{height_cm} cm"],
+            "weight": [f"{int(weight_kg * 2.2)} lb", f"{weight_kg} kg"],
+            "eye-color": rng.choice(COLORS),
+            "hair-color": rng.choice(COLORS),
+        },
+        "work": {"occupation": "-", "base": "-"},
+        "connections": {"group-affiliation": "-", "relatives": "-"},
+        "image": {"url": f"https://example.invalid/heroes/{hero_id}.jpg"},
+    }
+
+
+def iter_payloads(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Genera `count` registros de forma determinista (misma semilla, mismos datos)."""
+    rng = random.Random(seed)
+    for hero_id in range(1, count + 1):
+        yield generate_hero(hero_id, rng)
+
+
+def generate_payloads(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    return list(iter_payloads(count, seed))
+
+
+# Tamaños de referencia de los benchmarks (benchmarks/run_benchmarks.py)
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000, '2500' -> 2500."""
+    text = text.strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def write_dump(path: str, count: int, seed: int = 0) -> str:
+    """
+    Escribe `count` registros en `path` con la forma de data/superheros.json
+    ({"response": ..., "results-for": ..., "results": [...]}), registro a
+    registro: generar 1M de héroes no exige tenerlos todos en memoria.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"response": "success", "results-for": "synthetic", "results": [')
+        for i, payload in enumerate(iter_payloads(count, seed)):
+            if i:
+                f.write(", ")
+            json.dump(payload, f, ensure_ascii=False)
+        f.write("]}")
+    return path
@@ -0,0 +1,120 @@
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Bloque de importación seguro para evitar errores de ruta
+try:
+    from src.models import Hero, STAT_FIELDS
+except ImportError:
+    from models import Hero, STAT_FIELDS
+
+STAT_COLUMN = {name: i for i, name in enumerate(STAT_FIELDS)}
+
+# Columnas categóricas (codificadas como diccionario) usadas en los pre-filtros
+CATEGORY_FIELDS = ("publisher", "alignment", "race")
+
+
+def _encode(values: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+    """Codificación diccionario: (códigos int32, categorías)."""
+    lookup = {}
+    codes = [lookup.setdefault(v, len(lookup)) for v in values]
+    return np.array(codes, dtype=np.int32), list(lookup)
+
+
+class HeroTable:
+    """
+    Vista columnar del dataset para rankings vectorizados.
+
+    - stats: matriz contigua int16 de forma (N, 6), columnas según STAT_FIELDS.
+    - ids / names: arrays paralelos a las filas.
+    - averages: promedio de las 6 stats por héroe (precalculado).
+    - categories: publisher / alignment / race como (códigos, categorías).
+    - heroes: la lista original, para devolver objetos Hero a la UI.
+
+    Se construye una sola vez al cargar los datos y no se modifica.
+    """
+
+    def __init__(self, heroes: Sequence[Hero], stats: Optional[np.ndarray] = None):
+        self.heroes: List[Hero] = list(heroes)
+        n = len(self.heroes)
+
+        if stats is not None:
+            # Columnas ya construidas (p. ej. un snapshot con mmap): sin copia
+            self.stats = stats
+        else:
+            self.stats = np.zeros((n, len(STAT_FIELDS)), dtype=np.int16)
+            for row, hero in enumerate(self.heroes):
+                if hero.powerstats:
+                    ps = hero.powerstats
+                    self.stats[row] = (ps.intelligence, ps.strength, ps.speed,
+                                       ps.durability, ps.power, ps.combat)
+
+        self.ids = np.fromiter((h.id for h in self.heroes), dtype=np.int64, count=n)
+        self.names = np.array([h.name for h in self.heroes], dtype=object)
+        # Promedio de las 6 stats: sum(stats) / len(stats), suma entera y una sola división
+        self.averages = self.stats.sum(axis=1, dtype=np.int64) / len(STAT_FIELDS)
+
+        self.categories = {
+            "publisher": _encode((h.biography.publisher or "").strip() for h in self.heroes),
+            "alignment": _encode(h.biography.alignment or "" for h in self.heroes),
+            "race": _encode(h.appearance.race or "" for h in self.heroes),
+        }
+        self._name_rank: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_heroes(cls, heroes: Sequence[Hero]) -> "HeroTable":
+        return cls(heroes)
+
+    def __len__(self) -> int:
+        return len(self.heroes)
+
+    def column(self, stat: str) -> np.ndarray:
+        """Columna de una estadística; ceros si el nombre no existe."""
+        col = STAT_COLUMN.get(stat)
+        if col is None:
+            return np.zeros(len(self), dtype=np.int16)
+        return self.stats[:, col]
+
+    def category_mask(self, field: str, values: Union[str, Iterable[str]]) -> np.ndarray:
+        """Filas cuya columna categórica `field` está en `values`."""
+        codes, categories = self.categories[field]
+        wanted_values = {values} if isinstance(values, str) else set(values)
+        wanted = [i for i, c in enumerate(categories) if c in wanted_values]
+        return np.isin(codes, wanted)
+
+    @property
+    def name_rank(self) -> np.ndarray:
+        """Posición alfabética de cada nombre (para desempates por nombre)."""
+        if self._name_rank is None:
+            order = np.argsort(self.names.astype(str), kind="stable")
+            self._name_rank = np.empty(len(order), dtype=np.int64)
+            self._name_rank[order] = np.arange(len(order))
+        return self._name_rank
+
+    def take(self, rows: np.ndarray) -> List[Hero]:
+        """Convierte índices de fila en objetos Hero."""
+        return [self.heroes[i] for i in rows]
+
+
+def top_k_rows(keys: np.ndarray, k: int, tie: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Índices de las k filas con menor `keys`, en orden ascendente.
+    Usa argpartition (O(N)) y solo ordena los candidatos. Los empates se
+    resuelven por `tie` (ascendente) y, a igualdad, por posición, igual
+    que un sorted() estable sobre la lista.
+    """
+    n = len(keys)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        candidates = np.arange(n)
+    else:
+        kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+        candidates = np.flatnonzero(keys <= kth)
+
+    if tie is None:
+        order = np.argsort(keys[candidates], kind="stable")
+    else:
+        # lexsort ordena por la última clave y desempata con las anteriores
+        order = np.lexsort((tie[candidates], keys[candidates]))
+    return candidates[order[:k]]
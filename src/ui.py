@@ -1,20 +1,114 @@
+import time
+
 import streamlit as st
-from src.filters import top_10_highest, top_10_lowest, top_10_balanced
-from src.plots import plot_top_heroes, plot_hero_radar
-from src.image_ai import generate_hero_image  # <--- IMPORTACIÓN NUEVA
+from src.filters import rank_by_criterion, ranking_title
+from src.models import STAT_LABELS
+from src.search import HeroSearcher
+from src.plots import top_heroes_image, hero_radar_image, prerender_top_heroes, prerender_radars as _prerender_radars
+from src.image_ai import get_job_queue
+from src.plots import get_render_cache, radar_comparison_image
+from src.similarity import get_similarity_index
+from src.battle import BattleConfig, cached_tournament, duel, submit_tournament, tournament_job
+from src import metrics
 
 # --- CONFIGURACIÓN VISUAL ---
-TRADUCCIONES = {
-    "intelligence": "Inteligencia", "strength": "Fuerza",
-    "speed": "Velocidad", "durability": "Durabilidad",
-    "power": "Poder", "combat": "Combate"
+TRADUCCIONES = STAT_LABELS
+
+# Columnas de agrupación de la vista de analítica (ver analytics.GROUP_FIELDS)
+GROUP_LABELS = {"alignment": "Bando", "gender": "Género", "race": "Raza", "publisher": "Editorial"}
+AGG_LABELS = {"mean": "media", "median": "mediana", "p90": "p90"}
+
+# Héroes parecidos en la ficha (y cuántos se superponen en el radar)
+SIMILAR_COUNT = 5
+SIMILAR_IN_RADAR = 3
+
+# Arena: reglas de los combates y filas de la clasificación mostradas
+BATTLE_CONFIG = BattleConfig()
+STANDINGS_ROWS = 20
+
+# Segundos entre consultas del estado de una imagen IA en curso
+AI_POLL_SECONDS = 1.0
+# Segundos entre consultas del estado del torneo en segundo plano (tarda más)
+TOURNAMENT_POLL_SECONDS = 2.0
+
+# Opción de la UI -> criterio de filters.RANKING_CRITERIA
+RANKINGS = {
+    "Más fuertes": "highest",
+    "Más débiles": "lowest",
+    "Balanceados": "balanced",
 }
 
+def get_ranking(dataset, stat_key, rtype):
+    """(héroes del ranking, prefijo del título) para una estadística y un criterio."""
+    criterion = RANKINGS[rtype]
+    return rank_by_criterion(dataset, stat_key, criterion), ranking_title(criterion)
+
+def prerender_rankings(dataset, workers: int = 4):
+    """Renderiza por adelantado las 6 x 3 gráficas de ranking (caché de plots.py)."""
+    jobs = []
+    for stat_key, stat_label in TRADUCCIONES.items():
+        for rtype in RANKINGS:
+            ranking, prefix = get_ranking(dataset, stat_key, rtype)
+            jobs.append((ranking, stat_key, prefix, stat_label))
+    return prerender_top_heroes(jobs, workers=workers)
+
+def prerender_radars(dataset, workers: int = 2):
+    """Radares de todo el roster en disco, para que la ficha del héroe no renderice."""
+    done = _prerender_radars(list(dataset), workers=workers)
+    if done:
+        print(f"🎯 {done} radares pre-renderizados.")
+    return done
+
 def init_state():
     if "selected_hero" not in st.session_state:
         st.session_state.selected_hero = None
     if "view" not in st.session_state:
         st.session_state.view = "menu"
+    if "metrics_base" not in st.session_state:
+        # Punto de partida de las métricas "de esta sesión" (None si están desactivadas)
+        st.session_state.metrics_base = metrics.snapshot()
+
+def get_searcher(dataset):
+    """Buscador incremental de la sesión (se reconstruye si cambia o se reemplaza el dataset)."""
+    key = dataset.version
+    if st.session_state.get("searcher_key") != key:
+        st.session_state.searcher = HeroSearcher(dataset.name_index)
+        st.session_state.searcher_key = key
+    return st.session_state.searcher
+
+def _labels(entry) -> str:
+    return ", ".join(f"{k}={v}" for k, v in entry["labels"].items())
+
+def render_metrics_panel():
+    """Panel de depuración en la barra lateral (solo con SUPERHERO_METRICS activado)."""
+    current = metrics.snapshot()
+    if current is None:
+        return
+    with st.sidebar.expander("🛠 Métricas", expanded=False):
+        scope = st.radio("Ámbito", ("Esta sesión", "Todo el proceso"), horizontal=True, key="metrics_scope")
+        base = st.session_state.get("metrics_base")
+        data = metrics.diff(current, base) if scope == "Esta sesión" and base else current
+
+        st.markdown("**⏱️ Latencias**")
+        st.dataframe([{
+            "métrica": h["name"], "etiquetas": _labels(h), "n": h["count"],
+            "media ms": round(h["sum"] / h["count"] * 1000, 3),
+            "p50 ms": round(metrics.quantile(h, data["bounds"], 0.5) * 1000, 3),
+            "p90 ms": round(metrics.quantile(h, data["bounds"], 0.9) * 1000, 3),
+        } for h in data["histograms"]], hide_index=True)
+
+        st.markdown("**🔢 Contadores**")
+        st.dataframe([{"métrica": c["name"], "etiquetas": _labels(c), "valor": c["value"]}
+                      for c in data["counters"]], hide_index=True)
+
+        # Rendimiento del parseo: registros por segundo de CPU dedicada a parsear
+        parse_seconds = sum(h["sum"] for h in data["histograms"] if h["name"] == "parse_seconds")
+        records = sum(c["value"] for c in data["counters"] if c["name"] == "parse_records_total")
+        if parse_seconds:
+            st.caption(f"📥 Parseo: {records / parse_seconds:,.0f} registros/s")
+        cache = get_render_cache()
+        st.caption(f"🖼️ Caché de gráficas (proceso): {cache.hits} aciertos / {cache.misses} fallos")
+        st.button("💾 Exportar ahora", on_click=metrics.flush)
 
 def change_view(view_name, hero=None):
     st.session_state.view = view_name
@@ -33,40 +127,44 @@ def render_header():
         """, unsafe_allow_html=True)
 
 # --- VISTA 1: MENÚ PRINCIPAL ---
-def render_menu(heroes):
+def render_menu(dataset):
+    """`dataset` es el HeroDataset cargado en app.py (rankings precalculados)."""
     st.markdown("### 🔍 Buscar héroe")
-    hero_names = sorted([h.name for h in heroes])
-    
-    selected = st.selectbox("Escribe un nombre:", [""] + hero_names, label_visibility="collapsed")
-    if selected:
-        hero = next(h for h in heroes if h.name == selected)
-        change_view("hero", hero)
-        st.rerun()
+    searcher = get_searcher(dataset)
+
+    # Búsqueda incremental: solo se muestran las coincidencias, no todo el roster
+    query = st.text_input("Escribe un nombre:", placeholder="Nombre, alias o nombre real...",
+                          label_visibility="collapsed")
+    if query:
+        matches = searcher.suggest(query, limit=10)
+        if not matches:
+            st.caption("Sin coincidencias.")
+        for h in matches:
+            st.button(h.name, key=f"s_{h.id}", on_click=change_view, args=("hero", h),
+                      use_container_width=True)
 
     st.divider()
+    c1, c2 = st.columns(2)
+    with c1:
+        st.button("📊 Analítica del roster", on_click=change_view, args=("analytics",), use_container_width=True)
+    with c2:
+        st.button("⚔️ Arena de combate", on_click=change_view, args=("arena",), use_container_width=True)
     
     # Rankings
     c1, c2 = st.columns(2)
     with c1:
         stat_key = st.selectbox("Estadística:", list(TRADUCCIONES.keys()), format_func=lambda x: TRADUCCIONES[x])
     with c2:
-        rtype = st.radio("Criterio:", ["Más fuertes", "Más débiles", "Balanceados"], horizontal=True)
-
-    if rtype == "Más fuertes":
-        ranking = top_10_highest(heroes, stat_key)
-        prefix = "Top 10 Superior"
-    elif rtype == "Más débiles":
-        ranking = top_10_lowest(heroes, stat_key)
-        prefix = "Top 10 Inferior"
-    else:
-        ranking = top_10_balanced(heroes, stat_key)
-        prefix = "Top 10 Balanceado"
+        rtype = st.radio("Criterio:", list(RANKINGS), horizontal=True)
+
+    ranking, prefix = get_ranking(dataset, stat_key, rtype)
 
     stat_label = TRADUCCIONES[stat_key]
     st.subheader(f"🏆 {prefix} - {stat_label}")
     
-    fig = plot_top_heroes(ranking, stat_key, prefix, stat_label)
-    if fig: st.pyplot(fig, use_container_width=True)
+    # PNG ya renderizado (caché compartida, normalmente pre-renderizado al cargar)
+    png = top_heroes_image(ranking, stat_key, prefix, stat_label)
+    if png: st.image(png, use_container_width=True)
 
     st.write("#### Detalle")
     for i, h in enumerate(ranking, 1):
@@ -74,7 +172,7 @@ def render_menu(heroes):
         st.button(f"#{i} {h.name} ({val})", key=f"b_{h.id}", on_click=change_view, args=("hero", h), use_container_width=True)
 
 # --- VISTA 2: DETALLE DEL HÉROE ---
-def render_hero_detail():
+def render_hero_detail(dataset=None):
     h = st.session_state.selected_hero
     st.button("⬅ Volver", on_click=change_view, args=("menu",))
     
@@ -106,6 +204,13 @@ def render_hero_detail():
         for i, (k, l) in enumerate(stats_map):
             with s_cols[i%3]: st.metric(l, getattr(h.powerstats, k, 0))
 
+        # Percentil de cada stat dentro del roster (búsqueda binaria, sin recorrerlo)
+        if dataset is not None:
+            percentiles = load_analytics(dataset).hero_percentiles(h)
+            st.caption("📈 Percentil en el roster: " + " · ".join(
+                f"{l} {percentiles[k]:.0f}" if percentiles[k] is not None else f"{l} —"
+                for k, l in stats_map))
+
         st.divider()
         
         # --- SECCIÓN IA ---
@@ -129,8 +234,30 @@ def render_hero_detail():
         )
 
     with c2:
-        fig = plot_hero_radar(h)
-        if fig: st.pyplot(fig, use_container_width=True)
+        png = hero_radar_image(h)
+        if png: st.image(png, use_container_width=True)
+
+    if dataset is not None:
+        render_similar_heroes(dataset, h)
+
+def render_similar_heroes(dataset, h):
+    """Tira de héroes parecidos (índice por versión del dataset, sin recorrer el roster)."""
+    similar = get_similarity_index(dataset).neighbors(h, SIMILAR_COUNT)
+    if not similar:
+        return
+    st.divider()
+    st.markdown("### 🧬 Héroes similares")
+    cols = st.columns(len(similar))
+    for col, (other, distance) in zip(cols, similar):
+        with col:
+            st.button(other.name, key=f"sim_{other.id}", on_click=change_view, args=("hero", other),
+                      use_container_width=True)
+            st.caption(f"Distancia {distance:.2f}")
+
+    # El radar comparado solo se renderiza si se pide
+    if st.toggle("📡 Comparar radares", key="similar_radar"):
+        png = radar_comparison_image(h, [other for other, _ in similar[:SIMILAR_IN_RADAR]])
+        if png: st.image(png, use_container_width=True)
 
 # --- VISTA 3: LABORATORIO IA (MODIFICADA) ---
 def render_ai_view():
@@ -142,19 +269,36 @@ def render_ai_view():
     st.header(f"🎨 Laboratorio Creativo: {h.name}")
     st.divider()
 
+    # La generación corre en segundo plano (image_ai.ImageJobQueue): esta vista
+    # solo consulta el estado del trabajo, nunca espera a Azure
+    job = get_job_queue().submit(h.name)
+    if job.finished:
+        render_ai_result(h, job)
+    else:
+        poll_ai_job(job)
+
+@st.fragment(run_every=AI_POLL_SECONDS)
+def poll_ai_job(job):
+    """Se re-ejecuta sola cada AI_POLL_SECONDS hasta que el trabajo termina."""
+    if job.finished:
+        # Recarga completa: render_ai_view ya pinta el resultado y deja de sondear
+        st.rerun()
+    st.info(f"🤖 Conectando con DALL·E 3 para imaginar a {job.hero_name} (Estilo Noir)...")
+    st.caption(f"⏳ Generando desde hace {time.time() - job.submitted_at:.0f} s. Puedes volver a la ficha: la imagen se guardará igualmente.")
+
+def retry_ai_job(hero_name):
+    get_job_queue().submit(hero_name, retry=True)
+
+def render_ai_result(h, job):
     # Contenedor principal de la generación
     with st.container():
-        
-        # Spinner mientras se ejecuta la llamada a Azure
-        with st.spinner(f"🤖 Conectando con DALL·E 3 para imaginar a {h.name} (Estilo Noir)..."):
-            image_url = generate_hero_image(h.name)
 
         # Lógica de visualización de resultado
-        if image_url:
-            # ÉXITO
+        if job.image:
+            # ÉXITO (la imagen ya está descargada y guardada en disco)
             st.success("✨ ¡Imagen generada con éxito!")
-            st.image(image_url, caption=f"Versión alternativa de {h.name}", use_container_width=True)
-            st.info("ℹ️ Descárgala pronto, el enlace es temporal.")
+            st.image(job.image, caption=f"Versión alternativa de {h.name}", use_container_width=True)
+            st.download_button("⬇️ Descargar imagen", job.image, file_name=f"{h.slug or h.id}-ai.png", mime="image/png")
         else:
             # ERROR (Filtro de contenido)
             st.error("❌ Error: La solicitud fue rechazada por la API.")
@@ -166,4 +310,119 @@ def render_ai_view():
                 Las políticas de derechos de autor se modificaron recientemente, lo cual no permite la generación de imágenes con personajes "similares" o "parecidos", ya que se bloquean automáticamente.
                 
                 Lo sentimos :(
-            """)
\ No newline at end of file
+            """)
+            st.button("🔁 Reintentar", on_click=retry_ai_job, args=(h.name,))
+
+# --- VISTA 4: ANALÍTICA DEL ROSTER ---
+def load_analytics(dataset):
+    """Analíticas de la versión vigente del dataset (compartidas por el proceso)."""
+    # Import diferido: pandas solo se carga al usar la analítica
+    from src.analytics import get_analytics
+    return get_analytics(dataset)
+
+def render_analytics_view(dataset):
+    st.button("⬅ Volver", on_click=change_view, args=("menu",))
+    st.header("📊 Analítica del roster")
+    analytics = load_analytics(dataset)
+    st.caption(f"{len(analytics)} héroes. Las estadísticas a 0 (sin dato) no cuentan en los agregados.")
+
+    # Agregados por grupo
+    c1, c2 = st.columns(2)
+    with c1:
+        by = st.selectbox("Agrupar por:", list(GROUP_LABELS), format_func=lambda x: GROUP_LABELS[x])
+    with c2:
+        min_count = st.number_input("Mínimo de héroes por grupo:", min_value=1, value=1, step=1)
+    groups = analytics.group_stats(by, min_count=int(min_count))
+    table = groups.copy()
+    table.columns = ["Héroes"] + [f"{TRADUCCIONES[stat]} ({AGG_LABELS[agg]})" for stat, agg in groups.columns[1:]]
+    st.dataframe(table.round(1), use_container_width=True)
+
+    st.divider()
+
+    # Distribución de una stat
+    stat_key = st.selectbox("Distribución de:", list(TRADUCCIONES), format_func=lambda x: TRADUCCIONES[x])
+    counts, edges = analytics.histogram(stat_key)
+    st.bar_chart({"rango": [f"{lo:.0f}-{hi:.0f}" for lo, hi in zip(edges[:-1], edges[1:])],
+                  "héroes": counts.tolist()},
+                 x="rango", y="héroes", x_label=TRADUCCIONES[stat_key], y_label="Héroes", sort=False)
+
+    # Correlación entre las 6 stats
+    st.markdown("#### 🔗 Correlación entre estadísticas")
+    corr = analytics.correlation().rename(index=TRADUCCIONES, columns=TRADUCCIONES)
+    st.dataframe(corr.round(2), use_container_width=True)
+
+# --- VISTA 5: ARENA DE COMBATE ---
+def request_tournament(dataset):
+    submit_tournament(dataset, BATTLE_CONFIG)
+
+def render_arena_view(dataset):
+    st.button("⬅ Volver", on_click=change_view, args=("menu",))
+    st.header("⚔️ Arena de combate")
+    st.caption(f"Cada combate: {BATTLE_CONFIG.rounds} asaltos; en cada uno se sortea una estadística "
+               f"y los dos héroes tiran su valor ±{BATTLE_CONFIG.volatility:.0%}. "
+               f"{BATTLE_CONFIG.trials} combates simulados por enfrentamiento.")
+
+    # Duelo entre dos héroes
+    heroes = sorted(dataset.heroes, key=lambda h: h.name)
+    if len(heroes) < 2:
+        st.info("Se necesitan al menos dos héroes.")
+        return
+    c1, c2 = st.columns(2)
+    with c1:
+        a = st.selectbox("Héroe 1:", heroes, format_func=lambda h: h.name, key="duel_a")
+    with c2:
+        b = st.selectbox("Héroe 2:", heroes, index=1, format_func=lambda h: h.name, key="duel_b")
+    if a.id == b.id:
+        st.caption("Elige dos héroes distintos.")
+    elif st.button("🥊 ¡Luchar!", type="primary", use_container_width=True):
+        rate = duel(a, b, BATTLE_CONFIG)
+        winner, share = (a, rate) if rate >= 0.5 else (b, 1.0 - rate)
+        st.success(f"🏆 {winner.name} gana el {share:.1%} de los combates")
+        st.progress(rate, text=f"{a.name} {rate:.1%} · {1.0 - rate:.1%} {b.name}")
+
+    st.divider()
+
+    # Torneo todos contra todos (compartido por todas las sesiones). Se simula
+    # en segundo plano (battle.submit_tournament): esta vista solo consulta
+    # su estado, nunca espera al cálculo
+    st.markdown("### 🏆 Torneo todos contra todos")
+    result = cached_tournament(dataset, BATTLE_CONFIG)
+    if result is None:
+        job = tournament_job(dataset, BATTLE_CONFIG)
+        if job is not None and not job.done():
+            poll_tournament(job)
+            return
+        if job is not None and not job.cancelled() and job.exception() is not None:
+            st.error(f"⚠️ La simulación del torneo falló: {job.exception()}")
+        pairs = len(dataset) * (len(dataset) - 1) // 2
+        st.caption(f"{pairs:,} enfrentamientos x {BATTLE_CONFIG.trials} combates.")
+        st.button("▶️ Simular torneo", on_click=request_tournament, args=(dataset,))
+        return
+
+    standings = result.standings()
+    st.dataframe([{"#": i, "Héroe": h.name, "Elo": round(rating), "% victorias": round(100 * rate, 1)}
+                  for i, (h, rating, rate) in enumerate(standings[:STANDINGS_ROWS], 1)],
+                 hide_index=True, use_container_width=True)
+
+    # Cara a cara de los 10 primeros (fila gana a columna). Columnas por ID
+    # (dos héroes pueden llamarse igual), con el nombre como etiqueta
+    top = result.order()[:10]
+    top_heroes = [result.heroes[i] for i in top]
+    columns = [str(h.id) for h in top_heroes]
+    st.markdown("#### 🔥 Cara a cara (top 10, % de victorias de la fila)")
+    st.dataframe([{"": top_heroes[r].name,
+                   **{columns[c]: None if r == c else round(100 * result.win_rates[i, j], 1)
+                      for c, j in enumerate(top)}}
+                  for r, i in enumerate(top)], hide_index=True, use_container_width=True,
+                 column_config={column: st.column_config.NumberColumn(h.name)
+                                for column, h in zip(columns, top_heroes)})
+
+@st.fragment(run_every=TOURNAMENT_POLL_SECONDS)
+def poll_tournament(job):
+    """Se re-ejecuta sola cada TOURNAMENT_POLL_SECONDS hasta que el torneo termina."""
+    if job.done():
+        # Recarga completa: render_arena_view ya pinta la clasificación
+        st.rerun()
+    st.info("⏳ Simulando el torneo en segundo plano...")
+    st.caption(f"Desde hace {time.time() - job.started_at:.0f} s. Puedes seguir navegando: "
+               f"el resultado se comparte con todas las sesiones.")
@@ -0,0 +1,153 @@
+"""HeroFetcher contra un servidor HTTP local con respuestas guionizadas por ID."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.api_marvel import FetchConfig, HeroFetcher
+from src.cache import HeroCache
+from src.loader import iter_heroes_remote
+from src.rules import RuleSet
+
+
+def _hero(hero_id: int) -> dict:
+    return {"response": "success", "id": str(hero_id), "name": f"Hero {hero_id}",
+            "powerstats": {"intelligence": "50", "strength": "50", "speed": "50",
+                           "durability": "50", "power": "50", "combat": "50"},
+            "biography": {"publisher": "Marvel Comics"}, "appearance": {}, "images": {}}
+
+
+def ok(hero_id: int):
+    return 200, _hero(hero_id), {}
+
+
+def api_error(message: str):
+    return 200, {"response": "error", "error": message}, {}
+
+
+class StubAPI:
+    """
+    Servidor local: `script[id]` es la lista de respuestas (estado, cuerpo,
+    cabeceras) de las sucesivas peticiones a ese ID; la última se repite.
+    """
+
+    def __init__(self, script: dict):
+        self.script = script
+        self.calls: dict = {}
+        self.times: dict = {}
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                hero_id = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+                with stub._lock:
+                    n = stub.calls.get(hero_id, 0)
+                    stub.calls[hero_id] = n + 1
+                    stub.times.setdefault(hero_id, []).append(time.monotonic())
+                responses = stub.script.get(hero_id, [api_error("invalid id")])
+                status, body, headers = responses[min(n, len(responses) - 1)]
+                raw = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/token"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(script):
+        server = StubAPI(script)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def fetcher_for(api: StubAPI, **config) -> HeroFetcher:
+    config.setdefault("backoff_base", 0.001)
+    config.setdefault("concurrency", 4)
+    return HeroFetcher(FetchConfig(**config), base_url=api.base_url)
+
+
+def test_retries_transient_errors_then_succeeds(stub):
+    api = stub({1: [(503, b"", {}), (500, b"", {}), ok(1)]})
+    result = fetcher_for(api, max_retries=3).fetch([1])
+    assert result.heroes[1]["name"] == "Hero 1"
+    assert result.attempts[1] == 3
+    assert result.retries == 2
+    assert not result.failures
+
+
+def test_retry_after_header_is_honoured(stub):
+    api = stub({1: [(429, b"", {"Retry-After": "0.3"}), ok(1)]})
+    result = fetcher_for(api).fetch([1])
+    assert 1 in result.heroes
+    first, second = api.times[1]
+    assert second - first >= 0.3
+
+
+def test_backoff_is_bounded():
+    fetcher = HeroFetcher(FetchConfig(backoff_base=0.5, backoff_max=2.0), base_url="http://127.0.0.1:9")
+    for attempt in range(6):
+        assert 0 <= fetcher._backoff(attempt) <= min(2.0, 0.5 * 2 ** attempt)
+    assert fetcher._backoff(0, "1.5") == 1.5
+    assert fetcher._backoff(0, "60") == 2.0          # Retry-After acotado por backoff_max
+    assert fetcher._backoff(0, "mañana") <= 0.5      # cabecera ilegible: backoff normal
+
+
+def test_invalid_id_and_404_are_definitive(stub):
+    api = stub({1: [api_error("invalid id")], 2: [(404, b"", {})]})
+    result = fetcher_for(api).fetch([1, 2])
+    assert sorted(result.not_found) == [1, 2]
+    assert result.attempts == {1: 1, 2: 1}
+
+
+def test_other_api_errors_are_not_tombstoned(stub):
+    # Token caducado: la API responde 200 con "access denied" para todos los IDs
+    api = stub({1: [api_error("access denied")], 2: [(200, [1, 2, 3], {})], 3: [(200, b"{no json", {})]})
+    result = fetcher_for(api).fetch([1, 2, 3])
+    assert not result.not_found
+    assert result.failures == {1: "access denied", 2: "respuesta inesperada", 3: "JSON inválido"}
+
+
+def test_failures_are_accounted_per_id(stub):
+    api = stub({1: [ok(1)], 2: [(503, b"", {})], 3: [(400, b"", {})], 4: [(502, b"", {}), ok(4)]})
+    result = fetcher_for(api, max_retries=2).fetch([1, 2, 3, 4])
+    assert sorted(result.heroes) == [1, 4]
+    assert result.failures == {2: "HTTP 503", 3: "HTTP 400"}
+    assert result.attempts == {1: 1, 2: 3, 3: 1, 4: 2}
+    assert api.calls[2] == 3
+    assert not result.not_found
+
+
+def test_only_definitive_misses_are_cached_as_not_found(stub, tmp_path):
+    api = stub({1: [ok(1)], 2: [api_error("invalid id")], 3: [api_error("access denied")]})
+    cache = HeroCache(tmp_path / "cache.jsonl")
+    heroes = list(iter_heroes_remote([1, 2, 3], cache, fetcher=fetcher_for(api), rules=RuleSet(())))
+    assert [h.id for h in heroes] == [1]
+    # 1 y 2 quedan vigentes en el almacén; 3 se vuelve a pedir en la siguiente carga
+    assert cache.stale_ids([1, 2, 3]) == [3]
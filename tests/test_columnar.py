@@ -0,0 +1,130 @@
+"""Parquet / Arrow IPC de src/columnar.py: ida y vuelta, proyecciones y revalidación."""
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src import columnar
+from src.columnar import read_metadata, read_stats, write_columnar
+from src.loader import RejectReport, load_heroes_local
+from src.models import STAT_FIELDS
+from src.rules import DEFAULT_RULES, RuleSet
+
+DATASET = "data/superheros.json"
+SUFFIXES = [".parquet", ".arrow"]
+
+# Sin reglas activas: entran también héroes sin publisher, con stats a 0...
+def _relaxed() -> RuleSet:
+    rules = DEFAULT_RULES
+    for name in DEFAULT_RULES.names():
+        rules = rules.toggle(name, False)
+    return rules
+
+
+RELAXED = _relaxed()
+
+
+@pytest.fixture(scope="module")
+def heroes():
+    return load_heroes_local(DATASET)
+
+
+@pytest.fixture(scope="module")
+def all_heroes():
+    return load_heroes_local(DATASET, rules=RELAXED)
+
+
+def stats_of(hero):
+    return tuple(getattr(hero.powerstats, stat) for stat in STAT_FIELDS)
+
+
+@pytest.mark.parametrize("suffix", SUFFIXES)
+@pytest.mark.parametrize("batch_size", [7, 50_000])
+def test_round_trip_matches_load_heroes_local(tmp_path, heroes, all_heroes, suffix, batch_size):
+    for rules, expected in ((DEFAULT_RULES, heroes), (RELAXED, all_heroes)):
+        path = str(tmp_path / f"heroes{suffix}")
+        assert write_columnar(path, iter(expected), rules, batch_size=batch_size) == len(expected)
+        assert not os.path.exists(path + ".tmp")
+        assert read_metadata(path) == {"format_version": columnar.FORMAT_VERSION, "rules": rules.fingerprint()}
+
+        report = RejectReport()
+        loaded = load_heroes_local(path, report, rules=rules)
+        assert loaded == expected  # dataclasses: campo a campo
+        assert (report.total, report.accepted) == (len(expected), len(expected))
+
+
+@pytest.mark.parametrize("suffix", SUFFIXES)
+def test_stats_projection(tmp_path, heroes, suffix):
+    path = str(tmp_path / f"heroes{suffix}")
+    write_columnar(path, heroes)
+
+    projected = load_heroes_local(path, columns="stats")
+    assert [(h.id, h.name, stats_of(h)) for h in projected] == [(h.id, h.name, stats_of(h)) for h in heroes]
+    # El resto de columnas no se lee: quedan vacías
+    assert all(h.slug == "" and h.images == {} and h.biography.publisher is None
+               and h.biography.aliases == [] and h.appearance.height == [] for h in projected)
+
+    ids, names, stats = read_stats(path)
+    assert ids.tolist() == [h.id for h in heroes]
+    assert names == [h.name for h in heroes]
+    assert [tuple(row) for row in stats.tolist()] == [stats_of(h) for h in heroes]
+
+    with pytest.raises(ValueError, match="desconocidas"):
+        load_heroes_local(path, columns=("id", "nope"))
+
+
+@pytest.mark.parametrize("suffix", SUFFIXES)
+def test_other_rules_fingerprint_revalidates(tmp_path, heroes, all_heroes, suffix):
+    path = str(tmp_path / f"heroes{suffix}")
+    write_columnar(path, all_heroes, RELAXED, batch_size=50)
+
+    # Mismas reglas que al escribir: no se revalida
+    assert load_heroes_local(path, rules=RELAXED) == all_heroes
+    assert load_heroes_local(path, rules=None) == all_heroes
+
+    # Otra huella: se aplican las reglas pedidas, igual que al parsear el JSON
+    report = RejectReport()
+    assert load_heroes_local(path, report) == heroes
+    expected = RejectReport()
+    load_heroes_local(DATASET, expected)
+    assert (report.total, report.accepted) == (len(all_heroes), len(heroes))
+    assert report.by_rule == expected.by_rule
+
+    # También con una proyección que no incluye el publisher
+    projected = load_heroes_local(path, columns="stats")
+    assert [h.id for h in projected] == [h.id for h in heroes]
+
+
+@pytest.mark.parametrize("suffix", SUFFIXES)
+def test_failed_writes_leave_no_temporary_file(tmp_path, heroes, monkeypatch, suffix):
+    path = str(tmp_path / f"heroes{suffix}")
+
+    def broken():
+        yield from heroes[:10]
+        raise RuntimeError("origen roto")
+
+    with pytest.raises(RuntimeError):
+        write_columnar(path, broken(), batch_size=4)
+    assert os.listdir(tmp_path) == []
+
+    # El constructor del writer crea el .tmp antes de fallar
+    pa = columnar._pyarrow()
+
+    def failing_writer(tmp, *args, **kwargs):
+        open(tmp, "wb").close()
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(pa.parquet, "ParquetWriter", failing_writer)
+    monkeypatch.setattr(pa.ipc, "new_file", failing_writer)
+    with pytest.raises(OSError, match="disco lleno"):
+        write_columnar(path, heroes)
+    assert os.listdir(tmp_path) == []
+
+
+def test_empty_dataset_and_unknown_suffix(tmp_path):
+    path = str(tmp_path / "empty.parquet")
+    assert write_columnar(path, []) == 0
+    assert load_heroes_local(path) == []
+    with pytest.raises(ValueError, match="no columnar"):
+        write_columnar(str(tmp_path / "heroes.csv"), [])
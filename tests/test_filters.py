@@ -0,0 +1,116 @@
+"""Rankings de src/filters.py frente a la implementación original con sorted()."""
+import numpy as np
+import pytest
+
+from src.dataset import HeroDataset
+from src.filters import rank_by_criterion, top_10_balanced, top_10_highest, top_10_lowest, top_k
+from src.jsonstream import iter_records
+from src.loader import hero_from_dict
+from src.models import STAT_FIELDS
+from src.synthetic import iter_payloads
+from src.table import HeroTable, top_k_rows
+
+
+# --- Implementación original (antes de HeroTable / top_k), copiada tal cual ---
+def _get_stat_value(hero, stat):
+    if not hero.powerstats:
+        return 0
+    return getattr(hero.powerstats, stat, 0)
+
+
+def _calculate_average(hero):
+    ps = hero.powerstats
+    stats = [ps.intelligence, ps.strength, ps.speed, ps.durability, ps.power, ps.combat]
+    return sum(stats) / len(stats)
+
+
+def baseline_highest(heroes, stat):
+    valid = [h for h in heroes if _get_stat_value(h, stat) > 0]
+    return sorted(valid, key=lambda h: _get_stat_value(h, stat), reverse=True)[:10]
+
+
+def baseline_lowest(heroes, stat):
+    valid = [h for h in heroes if _get_stat_value(h, stat) > 0]
+    return sorted(valid, key=lambda h: _get_stat_value(h, stat))[:10]
+
+
+def baseline_balanced(heroes, stat):
+    valid = [h for h in heroes if _get_stat_value(h, stat) > 0]
+    return sorted(valid, key=lambda h: abs(_get_stat_value(h, stat) - _calculate_average(h)))[:10]
+
+
+CRITERIA = {
+    "highest": (top_10_highest, baseline_highest, {"descending": True}),
+    "lowest": (top_10_lowest, baseline_lowest, {"descending": False}),
+    "balanced": (top_10_balanced, baseline_balanced, {"descending": False, "balanced": True}),
+}
+
+
+@pytest.fixture(scope="module", params=["superheros", "synthetic"])
+def heroes(request):
+    # Sin validar: hay stats a 0 (se excluyen) y muchos empates
+    if request.param == "superheros":
+        return [hero_from_dict(record) for record in iter_records("data/superheros.json")]
+    return [hero_from_dict(record) for record in iter_payloads(3000, seed=7)]
+
+
+@pytest.fixture(scope="module")
+def containers(heroes):
+    return {"list": heroes, "table": HeroTable(heroes), "dataset": HeroDataset(heroes)}
+
+
+def ids(heroes):
+    return [h.id for h in heroes]
+
+
+@pytest.mark.parametrize("stat", STAT_FIELDS)
+@pytest.mark.parametrize("criterion", list(CRITERIA))
+def test_rankings_match_the_sorted_baseline(containers, stat, criterion):
+    ranking, baseline, options = CRITERIA[criterion]
+    heroes = containers["list"]
+    expected = ids(baseline(heroes, stat))
+    assert len(expected) == 10
+
+    for name, data in containers.items():
+        assert ids(ranking(data, stat)) == expected, name
+        assert ids(top_k(data, stat, k=10, **options)) == expected, name
+        assert ids(rank_by_criterion(data, stat, criterion)) == expected, name
+
+    # Con un pre-filtro que no descarta nada, el dataset usa la tabla en vez del índice
+    table = containers["table"]
+    every_publisher = table.categories["publisher"][1]
+    assert ids(top_k(containers["dataset"], stat, k=10, publisher=every_publisher, **options)) == expected
+
+    # HeroTable.top_k_rows directamente sobre las columnas
+    values = table.column(stat)
+    rows = np.flatnonzero(values > 0)
+    keys = values.astype(np.int32)
+    if options.get("balanced"):
+        keys = np.abs(keys - table.averages)
+    elif options["descending"]:
+        keys = -keys
+    assert ids(table.take(rows[top_k_rows(keys[rows], 10)])) == expected
+
+
+@pytest.mark.parametrize("k", [0, 1, 3, 25, 100000])
+def test_top_k_sizes_match_the_baseline(containers, k):
+    heroes = containers["list"]
+    valid = [h for h in heroes if h.powerstats.speed > 0]
+    expected = ids(sorted(valid, key=lambda h: h.powerstats.speed, reverse=True)[:k])
+    for name, data in containers.items():
+        assert ids(top_k(data, "speed", k=k)) == expected, name
+
+
+def test_top_k_rows_resolves_ties_like_a_stable_sort():
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        n = int(rng.integers(1, 200))
+        keys = rng.integers(0, 5, n).astype(np.float64)
+        tie = rng.integers(0, 3, n)
+        for k in (1, 5, n, n + 3):
+            expected = sorted(range(n), key=lambda i: keys[i])[:k]
+            assert top_k_rows(keys, k).tolist() == expected
+            expected = sorted(range(n), key=lambda i: (keys[i], tie[i]))[:k]
+            assert top_k_rows(keys, k, tie).tolist() == expected
+    assert top_k_rows(np.array([]), 3).tolist() == []
+    assert top_k_rows(np.array([1.0, 2.0]), 0).tolist() == []
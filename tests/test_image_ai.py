@@ -0,0 +1,151 @@
+"""ImageJobQueue contra el endpoint falso de src/fake_image_api.py."""
+import concurrent.futures
+import time
+
+import pytest
+import requests
+
+from src import image_ai
+from src.fake_image_api import FakeImageAPI
+from src.image_ai import DONE, FAILED, ImageCache, ImageConfig, ImageJobQueue, download_image
+
+
+@pytest.fixture
+def fake_api():
+    apis = []
+
+    def start(**kwargs) -> FakeImageAPI:
+        api = FakeImageAPI(**kwargs).start()
+        apis.append(api)
+        return api
+
+    yield start
+    for api in apis:
+        api.stop()
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(api: FakeImageAPI, timeout: float = 5.0, **kwargs) -> ImageJobQueue:
+        config = ImageConfig(endpoint=f"{api.url}/generate", api_key="test", timeout=timeout,
+                             download_timeout=5.0, workers=2)
+        queue = ImageJobQueue(config, ImageCache(str(tmp_path / "images")), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown(wait=True)
+
+
+def wait_for(job, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, f"el trabajo sigue en {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+def test_in_flight_jobs_are_deduplicated(fake_api, make_queue):
+    api = fake_api(delay=0.3)
+    queue = make_queue(api)
+    first = queue.submit("Batman")
+    second = queue.submit("Batman")
+    assert second is first
+    wait_for(first)
+    assert first.status == DONE
+    assert queue.submit("Batman") is first
+    assert api.requests == 1
+
+
+def test_cache_hit_by_hero_prompt_and_style_skips_the_post(fake_api, make_queue):
+    api = fake_api()
+    wait_for(make_queue(api).submit("Batman"))
+    assert api.requests == 1
+
+    # Otra cola (p. ej. tras un reinicio) con el mismo directorio: sale del disco
+    job = make_queue(api).submit("Batman")
+    assert job.status == DONE
+    assert job.image == api.image
+    assert api.requests == 1
+
+    # Otro estilo es otra clave: sí se genera
+    wait_for(make_queue(api).submit("Batman", style="manga"))
+    assert api.requests == 2
+
+
+def test_image_is_downloaded_before_the_job_is_done(fake_api, make_queue):
+    api = fake_api()
+    seen = []
+
+    def download(url, config):
+        seen.append(url)
+        time.sleep(0.2)  # descarga lenta: el trabajo no debe marcarse DONE antes
+        return download_image(url, config)
+
+    queue = make_queue(api, download=download)
+    job = queue.submit("Batman")
+    statuses = set()
+    while not job.finished:
+        statuses.add((job.status, job.image is not None))
+        time.sleep(0.005)
+    assert job.status == DONE
+    assert job.image == api.image
+    assert (DONE, False) not in statuses
+    assert seen and seen[0].startswith(f"{api.url}/images/")
+    assert queue.cache.get(job.key) == api.image
+
+
+def test_rejected_request_fails(fake_api, make_queue):
+    api = fake_api(reject=True)
+    queue = make_queue(api)
+    job = wait_for(queue.submit("Batman"))
+    assert job.status == FAILED
+    assert "400" in job.error
+    assert job.image is None
+    assert queue.cache.get(job.key) is None
+    # Un fallo no se repite solo, solo con retry
+    assert queue.submit("Batman") is job
+    assert api.requests == 1
+    wait_for(queue.submit("Batman", retry=True))
+    assert api.requests == 2
+
+
+def test_timeout_fails(fake_api, make_queue):
+    api = fake_api(delay=1.0)
+    job = wait_for(make_queue(api, timeout=0.2).submit("Batman"))
+    assert job.status == FAILED
+    assert job.image is None
+
+
+def test_finished_jobs_are_evicted(fake_api, make_queue, monkeypatch):
+    monkeypatch.setattr(image_ai, "MAX_FINISHED_JOBS", 2)
+    api = fake_api()
+    queue = make_queue(api)
+    for name in ("A", "B", "C", "D"):
+        wait_for(queue.submit(name))
+    queue.submit("E")
+    assert len(queue._jobs) <= 3  # 2 terminados + el nuevo
+    assert queue.get("A") is None and queue.get("D") is not None
+
+    # Pasado el TTL se olvidan todos los terminados
+    monkeypatch.setattr(image_ai, "FINISHED_JOB_TTL", 0)
+    wait_for(queue.get("E"))
+    queue.submit("D")  # sale del disco: vuelve a ser el único trabajo
+    assert list(queue._jobs) == [queue.get("D").key]
+
+
+
+def test_concurrent_requests_are_all_counted(fake_api):
+    api = fake_api(delay=0.05)
+
+    def generate(_):
+        return requests.post(f"{api.url}/generate", json={"prompt": "x"}, timeout=5).json()["data"][0]["url"]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as pool:
+        urls = list(pool.map(generate, range(48)))
+    assert api.requests == 48
+    # Cada generación recibe su propia URL (el contador no se pisa entre hilos)
+    assert len(set(urls)) == 48
@@ -0,0 +1,27 @@
+"""Presupuestos de tiempo de importación de benchmarks/check_import_time.py."""
+import importlib.util
+import os
+
+import pytest
+
+_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "check_import_time.py")
+_spec = importlib.util.spec_from_file_location("check_import_time", _SCRIPT)
+check_import_time = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(check_import_time)
+
+# Igual que --scale del script: margen para máquinas lentas (p. ej. IMPORT_TIME_SCALE=2 en CI)
+SCALE = float(os.environ.get("IMPORT_TIME_SCALE", "1"))
+REPEAT = 3
+
+
+@pytest.mark.parametrize("module", list(check_import_time.BUDGETS))
+def test_entry_point_within_budget(module):
+    budget, extra = check_import_time.BUDGETS[module]
+    forbidden = check_import_time.LAZY_EVERYWHERE + extra
+    best = float("inf")
+    for _ in range(REPEAT):
+        elapsed, loaded = check_import_time.measure(module, forbidden)
+        # Las dependencias diferidas no pueden cargarse en ningún intento
+        assert loaded == [], f"{module} carga {', '.join(loaded)} al importarse"
+        best = min(best, elapsed)
+    assert best <= budget * SCALE, f"{module}: {best:.1f} ms (presupuesto {budget * SCALE:.0f} ms)"
@@ -0,0 +1,61 @@
+"""Mantenimiento incremental de SortedStatIndex (src/indexes.py)."""
+import random
+from dataclasses import replace
+
+import pytest
+
+from src.indexes import ORDER_KINDS, SortedStatIndex
+from src.loader import hero_from_dict
+from src.models import STAT_FIELDS
+from src.synthetic import iter_payloads
+
+
+def snapshot_of(index: SortedStatIndex):
+    """Todos los órdenes del índice (IDs) y algunas consultas por rango."""
+    tops = {(stat, kind): [h.id for h in index.top(stat, len(index) + 1, kind)]
+            for stat in STAT_FIELDS for kind in ORDER_KINDS}
+    ranges = {(stat, low, high): [h.id for h in index.range(stat, low, high)]
+              for stat in STAT_FIELDS for low, high in ((1, 30), (40, 60), (95, 100), (0, 100))}
+    return len(index), tops, ranges
+
+
+def random_stats(rng: random.Random):
+    # Valores pequeños para forzar empates; algunos 0 (no se indexan)
+    return [rng.choice((0, 10, 20, 50, 50, 80, 100)) for _ in STAT_FIELDS]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_upserts_and_removes_match_a_fresh_build(seed):
+    rng = random.Random(seed)
+    pool = [hero_from_dict(payload) for payload in iter_payloads(120, seed=seed)]
+    initial = pool[:60]
+    index = SortedStatIndex(initial)
+    # Modelo: un dict conserva la posición al reasignar y manda al final lo reinsertado,
+    # igual que el orden de llegada del índice (y que HeroDataset)
+    current = {hero.id: hero for hero in initial}
+
+    for step in range(400):
+        action = rng.random()
+        if action < 0.45:
+            hero = rng.choice(pool)
+            if hero.id in current and rng.random() < 0.7:
+                # Refresco del mismo ID con otras stats
+                stats = replace(hero.powerstats, **dict(zip(STAT_FIELDS, random_stats(rng))))
+                hero = replace(current[hero.id], powerstats=stats)
+            index.upsert(hero)
+            current[hero.id] = hero
+        elif action < 0.85 and current:
+            hero_id = rng.choice(list(current))
+            index.remove(hero_id)
+            del current[hero_id]
+        else:
+            index.remove(-1)  # ID desconocido: no hace nada
+
+        if step % 50 == 49:
+            assert snapshot_of(index) == snapshot_of(SortedStatIndex(current.values())), step
+
+    fresh = SortedStatIndex(current.values())
+    assert snapshot_of(index) == snapshot_of(fresh)
+    # Los órdenes exportados reconstruyen el mismo índice sin ordenar
+    rebuilt = SortedStatIndex(current.values(), index.orders())
+    assert snapshot_of(rebuilt) == snapshot_of(fresh)
@@ -0,0 +1,113 @@
+"""Lector incremental de src/jsonstream.py: cortes de bloque, formatos y límites."""
+import gzip
+import io
+import json
+
+import pytest
+
+from src.jsonstream import RecordTooLargeError, iter_json_records, iter_jsonl_records, iter_records
+
+RECORDS = [
+    {"id": "1", "name": "A-Bomb", "powerstats": {"intelligence": "38", "strength": "100"}},
+    {"id": 2, "numbers": [0, -7, 12345678901234567890, 1.5, -0.25, 3e-2, 1.5E+3, 2e10],
+     "flags": [True, False, None]},
+    {"name": "Comillas \"escapadas\", comas, [corchetes] y {llaves}", "unicode": "ñandú é 🦸",
+     "escapes": "tab\tsalto\nbarra\\ A", "empty": {}, "nested": [[], [{}], {"a": [1, [2, [3]]]}]},
+    {"id": "4", "biography": {"publisher": "Marvel Comics", "aliases": ["-"]}},
+]
+
+CHUNK_SIZES = [1, 2, 3, 7, 64, 1 << 16]
+
+
+def stream(text: str) -> io.StringIO:
+    return io.StringIO(text)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("indent", [None, 2])
+def test_values_cut_at_any_chunk_boundary(chunk_size, indent):
+    text = json.dumps({"response": "success", "results": RECORDS}, indent=indent, ensure_ascii=False)
+    assert list(iter_json_records(stream(text), chunk_size=chunk_size)) == RECORDS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+@pytest.mark.parametrize("number", ["0", "-12", "12345", "1.5", "-0.25", "3e-2", "1.5E+3", "6.02e23"])
+def test_numbers_cut_at_every_position(chunk_size, number):
+    for text in (f"[{number}]", f"[{number}, {number}]", f"{{\"n\": {number}}}", number):
+        expected = json.loads(text)
+        records = list(iter_json_records(stream(text), chunk_size=chunk_size))
+        if isinstance(expected, list):
+            assert records == expected
+        elif isinstance(expected, dict):
+            assert records == [expected]
+        else:
+            assert records == []  # un escalar suelto no es un registro
+
+
+def test_results_wrapper_vs_bare_array_vs_single_object():
+    wrapped = json.dumps({"response": "success", "results-for": " ", "results": RECORDS})
+    assert list(iter_json_records(stream(wrapped), chunk_size=5)) == RECORDS
+    # "results" no tiene por qué ser la primera ni la última clave
+    trailing = json.dumps({"results": RECORDS, "response": "success"})
+    assert list(iter_json_records(stream(trailing), chunk_size=5)) == RECORDS
+
+    assert list(iter_json_records(stream(json.dumps(RECORDS)), chunk_size=5)) == RECORDS
+    assert list(iter_json_records(stream("[]"))) == []
+    assert list(iter_json_records(stream("  \n "))) == []
+
+    # Sin "results" (o con un "results" que no es lista) el objeto es un registro
+    single = {"id": "1", "name": "A-Bomb"}
+    assert list(iter_json_records(stream(json.dumps(single)))) == [single]
+    assert list(iter_json_records(stream('{"results": null}'))) == [{"results": None}]
+    # Objetos concatenados (JSON-lines sin la extensión)
+    concatenated = "\n".join(json.dumps(r) for r in RECORDS)
+    assert list(iter_json_records(stream(concatenated), chunk_size=3)) == RECORDS
+
+
+def test_malformed_json_raises():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_records(stream('[{"id": 1} {"id": 2}]'), chunk_size=4))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_records(stream('[{"id": 1}, {"id": '), chunk_size=4))
+
+
+def test_json_lines():
+    text = "\n".join(json.dumps(r) for r in RECORDS[:2]) + "\n\n   \n" + json.dumps(RECORDS[2]) + "\n"
+    assert list(iter_jsonl_records(stream(text))) == RECORDS[:3]
+
+
+@pytest.mark.parametrize("name", ["dump.json", "dump.json.gz", "dump.jsonl", "dump.ndjson.gz", "gzip-sin-extension.json"])
+def test_iter_records_picks_format_and_sniffs_gzip(tmp_path, name):
+    if ".jsonl" in name or ".ndjson" in name:
+        text = "\n".join(json.dumps(r) for r in RECORDS) + "\n"
+    else:
+        text = json.dumps({"response": "success", "results": RECORDS})
+    data = text.encode("utf-8")
+    # gzip se detecta por la cabecera, no por la extensión
+    if name.endswith(".gz") or name.startswith("gzip"):
+        data = gzip.compress(data)
+    path = tmp_path / name
+    path.write_bytes(data)
+    assert list(iter_records(str(path), chunk_size=7)) == RECORDS
+
+
+def test_superheros_dump_streams_like_json_load():
+    with open("data/superheros.json", encoding="utf-8") as f:
+        expected = json.load(f)["results"]
+    assert list(iter_records("data/superheros.json", chunk_size=3)) == expected
+
+
+def test_records_over_the_size_limit_raise():
+    big = {"id": "1", "name": "x" * 500}
+    text = json.dumps([{"id": "0"}, big])
+    with pytest.raises(RecordTooLargeError):
+        list(iter_json_records(stream(text), chunk_size=16, max_record_size=100))
+    # Con margen suficiente se lee igual
+    assert list(iter_json_records(stream(text), chunk_size=16, max_record_size=1000)) == [{"id": "0"}, big]
+
+    lines = json.dumps({"id": "0"}) + "\n" + json.dumps(big) + "\n"
+    reader = iter_jsonl_records(stream(lines), max_record_size=100)
+    assert next(reader) == {"id": "0"}
+    with pytest.raises(RecordTooLargeError):
+        next(reader)
+    assert issubclass(RecordTooLargeError, ValueError)
@@ -0,0 +1,139 @@
+"""Motor de reglas de src/rules.py: configuración, composición y evaluación por lotes."""
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from src.jsonstream import iter_records
+from src.loader import RejectReport, _raw_stats, hero_from_dict, iter_parsed_records
+from src.models import STAT_FIELDS
+from src.rules import (DEFAULT_RULES, MinStatRule, PublisherRule, RuleBatch, RuleSet,
+                       StatRangeRule, ValueCountRule, load_rules)
+
+DATASET = "data/superheros.json"
+
+CONFIG = [
+    {"rule": "publisher", "allowed": ["Marvel Comics", "DC Comics"]},
+    {"rule": "min_stat", "threshold": 10},
+    {"rule": "value_count", "name": "zeros", "value": 0, "limit": 2, "enabled": False},
+    {"rule": "stat_range", "name": "smart", "stat": "intelligence", "low": 50, "high": 95},
+]
+
+
+@pytest.fixture(scope="module")
+def records():
+    return list(iter_records(DATASET))
+
+
+def publisher_of(record):
+    return (record.get("biography") or {}).get("publisher", "Unknown")
+
+
+def test_rules_are_built_from_config(tmp_path):
+    rules = RuleSet.from_config(CONFIG)
+    assert rules.names() == ["publisher", "min_stat", "zeros", "smart"]
+    assert rules.rules[0] == PublisherRule(("Marvel Comics", "DC Comics"))
+    assert rules.rules[3] == StatRangeRule("intelligence", 50, 95, name="smart")
+    assert [r.name for r in rules.active] == ["publisher", "min_stat", "smart"]
+    assert RuleSet.from_config(rules.to_config()) == rules
+
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(CONFIG), encoding="utf-8")
+    assert load_rules(str(path)) == rules
+
+    assert rules.check((60, 50, 50, 50, 50, 50), " DC Comics ") is None
+    assert rules.check((60, 50, 50, 50, 50, 50), "Image Comics") == "publisher"
+    assert rules.check((60, 5, 50, 50, 50, 50), "Marvel Comics") == "min_stat"
+    assert rules.check((99, 50, 50, 50, 50, 50), "Marvel Comics") == "smart"
+
+    with pytest.raises(ValueError):
+        RuleSet.from_config([{"rule": "no_such_rule"}])
+    with pytest.raises(ValueError):
+        RuleSet((MinStatRule(), MinStatRule()))
+
+
+def test_default_profile_matches_the_original_rules():
+    assert DEFAULT_RULES.check((50,) * 6, "Marvel Comics") is None
+    assert DEFAULT_RULES.check((50,) * 6, "DC Comics") == "publisher"
+    assert DEFAULT_RULES.check((50,) * 6, None) == "publisher"
+    assert DEFAULT_RULES.check((50, 50, 50, 50, 50, 15), "Marvel Comics") == "min_stat"
+    assert DEFAULT_RULES.check((100, 100, 100, 50, 50, 50), "Marvel Comics") == "hundreds"
+    assert DEFAULT_RULES.check((100, 100, 50, 50, 50, 50), "Marvel Comics") is None
+
+
+def test_toggling_a_rule_changes_the_result():
+    stats, publisher = (100, 100, 100, 50, 50, 50), "Marvel Comics"
+    assert DEFAULT_RULES.check(stats, publisher) == "hundreds"
+
+    relaxed = DEFAULT_RULES.toggle("hundreds", False)
+    assert relaxed.check(stats, publisher) is None
+    assert relaxed.toggle("hundreds", True) == DEFAULT_RULES
+    assert DEFAULT_RULES.check(stats, publisher) == "hundreds"  # el original no cambia
+
+    batch = RuleBatch.from_columns([stats], [publisher])
+    assert not DEFAULT_RULES.evaluate(batch).mask[0]
+    assert relaxed.evaluate(batch).mask[0]
+
+    assert DEFAULT_RULES.without("hundreds").check(stats, publisher) is None
+    strict = DEFAULT_RULES.with_rule(ValueCountRule(100, 1, name="hundreds"))
+    assert strict.check((100, 50, 50, 50, 50, 50), publisher) == "hundreds"
+    with pytest.raises(KeyError):
+        DEFAULT_RULES.toggle("no_such_rule", False)
+
+
+def test_fingerprints_are_stable_and_differ_between_profiles():
+    same = RuleSet.from_config(DEFAULT_RULES.to_config())
+    assert same.fingerprint() == DEFAULT_RULES.fingerprint()
+    assert pickle.loads(pickle.dumps(DEFAULT_RULES)).fingerprint() == DEFAULT_RULES.fingerprint()
+
+    variants = [
+        DEFAULT_RULES,
+        DEFAULT_RULES.toggle("zeros", False),
+        DEFAULT_RULES.without("zeros"),
+        DEFAULT_RULES.with_rule(MinStatRule(20)),
+        DEFAULT_RULES.with_rule(PublisherRule(("Marvel Comics", "DC Comics"))),
+        RuleSet.from_config(CONFIG),
+    ]
+    assert len({rules.fingerprint() for rules in variants}) == len(variants)
+
+
+@pytest.mark.parametrize("rules", [DEFAULT_RULES, RuleSet.from_config(CONFIG),
+                                   DEFAULT_RULES.toggle("publisher", False)], ids=["default", "config", "no_publisher"])
+def test_evaluate_matches_check_for_every_record(records, rules):
+    stats = [_raw_stats(record) for record in records]
+    publishers = [publisher_of(record) for record in records]
+    result = rules.evaluate(RuleBatch.from_columns(stats, publishers))
+
+    expected = [rules.check(s, p) for s, p in zip(stats, publishers)]
+    assert [result.rejected_rule(row) for row in range(len(records))] == expected
+    assert result.mask.tolist() == [rule is None for rule in expected]
+
+    heroes = [hero_from_dict(record) for record in records]
+    assert [rules.check_hero(hero) for hero in heroes] == expected
+    assert [hero.validate_hero(rules) for hero in heroes] == result.mask.tolist()
+    assert np.array_equal(rules.evaluate(RuleBatch.from_heroes(heroes)).rejected_by, result.rejected_by)
+
+    # Por lotes sin parsear las stats de los que no pasan el publisher
+    lazy, lazy_stats = rules.evaluate_records(publishers, lambda rows: np.array([stats[r] for r in rows]))
+    assert np.array_equal(lazy.rejected_by, result.rejected_by)
+    assert np.array_equal(lazy_stats[lazy.mask], np.array(stats)[result.mask])
+    assert [rules.check_record(p, lambda s=s: s)[0] for s, p in zip(stats, publishers)] == expected
+
+
+def test_loader_batches_account_for_broken_records():
+    valid = {"id": "1", "name": "A", "biography": {"publisher": " Marvel Comics "},
+             "powerstats": dict.fromkeys(STAT_FIELDS, "50")}
+    items = [
+        valid,
+        "no es un diccionario",
+        {"biography": "sin publisher legible"},
+        {"biography": {"publisher": "Marvel Comics"}, "powerstats": ["ilegible"]},
+        {"biography": {"publisher": "Marvel Comics"}, "powerstats": {}},
+        {"biography": {"publisher": "DC Comics"}},
+    ]
+    report = RejectReport()
+    heroes = list(iter_parsed_records(items, report))
+    assert [h.id for h in heroes] == [1]
+    assert report.to_dict() == {"total": 6, "accepted": 1, "by_rule": {"min_stat": 1, "publisher": 1},
+                                "parse_errors": {"TypeError": 1, "AttributeError": 2}}
@@ -0,0 +1,90 @@
+"""Búsqueda incremental de src/search.py frente a una búsqueda en frío."""
+import random
+
+import pytest
+
+from src.jsonstream import iter_records
+from src.loader import hero_from_dict
+from src.search import HeroNameIndex, HeroSearcher, normalize_name
+from src.synthetic import iter_payloads
+
+
+@pytest.fixture(scope="module", params=["superheros", "synthetic"])
+def index(request):
+    if request.param == "superheros":
+        heroes = [hero_from_dict(record) for record in iter_records("data/superheros.json")]
+    else:
+        heroes = [hero_from_dict(record) for record in iter_payloads(3000, seed=11)]
+    return HeroNameIndex(heroes)
+
+
+def ids(heroes):
+    return [h.id for h in heroes]
+
+
+def typed(word: str):
+    """Consultas al teclear `word` letra a letra y borrarlo después."""
+    prefixes = [word[:i] for i in range(1, len(word) + 1)]
+    return prefixes + prefixes[-2::-1]
+
+
+def typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice("qxzjkw") + word[i + 1:]
+
+
+def queries(index: HeroNameIndex, seed: int):
+    rng = random.Random(seed)
+    names = [h.name for h in rng.sample(index.heroes, 15)]
+    sequence = []
+    for name in names:
+        sequence += typed(name)
+        sequence += typed(typo(name, rng))
+    # Sin nada en común con la tecla anterior, y consultas repetidas (caché)
+    sequence += ["man", "x", "Spider-Man", "spider man", "a", "man", "Spider-Man", "zzzz"]
+    return sequence
+
+
+def assert_like_a_cold_search(warm: HeroSearcher, index: HeroNameIndex, query: str, limit: int):
+    result = ids(warm.suggest(query, limit))
+    # Sin caché ni candidatos de la tecla anterior
+    assert result == ids(HeroSearcher(index).suggest(query, limit)), query
+    # HeroNameIndex.search solo difiere cuando hay coincidencia exacta (la antepone a todo)
+    if not index.exact(normalize_name(query)):
+        assert result == ids(index.search(query, limit)), query
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_typing_backspacing_and_typos_match_a_cold_search(index, seed):
+    warm = HeroSearcher(index)
+    for query in queries(index, seed):
+        assert_like_a_cold_search(warm, index, query, 10)
+        assert_like_a_cold_search(warm, index, query, 3)
+
+
+def test_small_cache_evicts_and_still_matches(index):
+    warm = HeroSearcher(index, cache_size=2)
+    for query in queries(index, 5) * 2:
+        assert_like_a_cold_search(warm, index, query, 10)
+        assert len(warm._cache) <= 2
+
+
+def test_cached_results_are_copies(index):
+    searcher = HeroSearcher(index)
+    first = searcher.suggest("man")
+    assert first
+    first.clear()
+    second = searcher.suggest("man")  # acierto de caché
+    assert second == HeroSearcher(index).suggest("man")
+    second.append(None)
+    assert None not in searcher.suggest("man")
+
+
+def test_lookups(index):
+    searcher = HeroSearcher(index)
+    hero = index.heroes[len(index) // 2]
+    assert searcher.get(hero.id) is hero
+    assert searcher.get(-1) is None
+    assert searcher.get_by_name(hero.name).name == hero.name
+    assert searcher.get_by_name("No existe") is None
+    assert searcher.suggest("") == [] and searcher.suggest("man", limit=0) == []
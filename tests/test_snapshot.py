@@ -0,0 +1,134 @@
+"""Snapshot binario de src/snapshot.py: ida y vuelta, integridad e invalidación."""
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from src.indexes import SortedStatIndex
+from src.loader import RejectReport, load_heroes_local
+from src.models import Appearance, Biography, Hero, PowerStats
+from src.rules import DEFAULT_RULES
+from src.snapshot import (SNAPSHOT_SUFFIX, Snapshot, SnapshotError, SnapshotHeroes, file_fingerprint,
+                          open_snapshot, write_snapshot)
+
+DATASET = "data/superheros.json"
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "superheros.json"
+    shutil.copyfile(DATASET, path)
+    return str(path)
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    heroes = load_heroes_local(DATASET)
+    path = str(tmp_path / "heroes.snap")
+    write_snapshot(path, heroes, "origen", "reglas")
+    return path
+
+
+def odd_hero() -> Hero:
+    """Héroe con los casos raros del codificador: None, separadores y JSON que no es texto."""
+    return Hero(
+        id=9001, name="Ñandú é 🦸", slug="", powerstats=PowerStats(100, 0, 16, 50, 99, 17),
+        appearance=Appearance("-", None, [], ["80 kg", "x\x1fy"], "", "Sin pelo"),
+        biography=Biography("", "-", ["Uno", "Dos"], "", "", None, "good"),
+        images={"lg": "http://img/lg.png", "extra": {"nested": [1, 2]}},
+    )
+
+
+def test_round_trip_matches_a_fresh_parse(tmp_path):
+    report = RejectReport()
+    heroes = load_heroes_local(DATASET, report) + [odd_hero()]
+    orders = SortedStatIndex(heroes).orders()
+    path = str(tmp_path / "heroes.snap")
+    write_snapshot(path, heroes, "origen", "reglas", report.to_dict(), orders)
+
+    snapshot = Snapshot(path)
+    assert (len(snapshot), snapshot.source, snapshot.rules) == (len(heroes), "origen", "reglas")
+    assert snapshot.report == report.to_dict()
+    loaded = snapshot.heroes()
+    for original, copy in zip(heroes, loaded):
+        assert copy == original  # dataclasses: compara campo a campo (stats, bio, apariencia, imágenes)
+    assert len(loaded) == len(heroes)
+
+    assert snapshot.ids.tolist() == [h.id for h in heroes]
+    assert snapshot.stats[-1].tolist() == [100, 0, 16, 50, 99, 17]
+    assert not snapshot.stats.flags.writeable  # columnas sobre el mmap, sin copia
+    assert set(snapshot.index_orders()) == set(orders)
+    for key, order in snapshot.index_orders().items():
+        assert np.array_equal(order, orders[key])
+
+    # Los compuestos son objetos nuevos por héroe: mutar uno no afecta a otros
+    loaded[0].biography.aliases.append("mutado")
+    assert "mutado" not in Snapshot(path).heroes()[0].biography.aliases
+
+
+def test_checksum_mismatch_is_rejected(snapshot_path):
+    with open(snapshot_path, "r+b") as f:
+        f.seek(-3, os.SEEK_END)
+        byte = f.read(1)
+        f.seek(-3, os.SEEK_END)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    with pytest.raises(SnapshotError, match="Checksum"):
+        Snapshot(snapshot_path)
+    assert open_snapshot(snapshot_path, "origen", "reglas") is None
+
+
+@pytest.mark.parametrize("keep", [0, 4, 16, 40])
+def test_truncated_header_is_rejected(snapshot_path, keep):
+    with open(snapshot_path, "r+b") as f:
+        f.truncate(keep)
+    with pytest.raises(SnapshotError):
+        Snapshot(snapshot_path)
+    assert open_snapshot(snapshot_path, "origen", "reglas") is None
+
+
+def test_truncated_sections_are_rejected(snapshot_path):
+    size = os.path.getsize(snapshot_path)
+    with open(snapshot_path, "r+b") as f:
+        f.truncate(size - 100)
+    assert open_snapshot(snapshot_path, "origen", "reglas") is None
+
+
+def test_foreign_file_and_fingerprints(snapshot_path, tmp_path):
+    other = tmp_path / "otro.snap"
+    other.write_bytes(b"NOTASNAP" + b"\0" * 64)
+    with pytest.raises(SnapshotError, match="No es un snapshot"):
+        Snapshot(str(other))
+    assert open_snapshot(str(tmp_path / "no-existe.snap"), "origen", "reglas") is None
+    assert open_snapshot(snapshot_path, "origen", "reglas") is not None
+    assert open_snapshot(snapshot_path, "otro origen", "reglas") is None
+    assert open_snapshot(snapshot_path, "origen", "otras reglas") is None
+
+
+def test_rebuilt_when_the_source_or_the_rules_change(dataset):
+    snap = dataset + SNAPSHOT_SUFFIX
+    first = load_heroes_local(dataset, snapshot=True)
+    assert not isinstance(first, SnapshotHeroes) and os.path.exists(snap)
+    assert Snapshot(snap).source == file_fingerprint(dataset)
+
+    report = RejectReport()
+    cached = load_heroes_local(dataset, report, snapshot=True)
+    assert isinstance(cached, SnapshotHeroes)
+    assert cached == first
+    assert report.total == 317 and report.accepted == len(first)  # el resumen viaja en el snapshot
+
+    # Otra fecha de modificación del origen: se vuelve a parsear y se regenera
+    st = os.stat(dataset)
+    os.utime(dataset, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    rebuilt = load_heroes_local(dataset, snapshot=True)
+    assert not isinstance(rebuilt, SnapshotHeroes) and rebuilt == first
+    assert Snapshot(snap).source == file_fingerprint(dataset)
+    assert isinstance(load_heroes_local(dataset, snapshot=True), SnapshotHeroes)
+
+    # Otras reglas: otra huella, se revalida con ellas
+    relaxed = DEFAULT_RULES.toggle("hundreds", False)
+    heroes = load_heroes_local(dataset, rules=relaxed, snapshot=True)
+    assert not isinstance(heroes, SnapshotHeroes) and len(heroes) > len(first)
+    assert Snapshot(snap).rules == relaxed.fingerprint()
+    assert load_heroes_local(dataset, rules=relaxed, snapshot=True) == heroes
+    assert not isinstance(load_heroes_local(dataset, snapshot=True), SnapshotHeroes)